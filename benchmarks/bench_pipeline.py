@@ -0,0 +1,316 @@
+"""
+Benchmarks for the pose pipeline and exercise evaluation hot paths.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--video clip.mp4] [--frames 200]
+                                        [--output bench_results.json]
+                                        [--compare previous.json]
+
+Each case reports throughput, p50/p99 latency and the average peak of
+Python/NumPy memory allocated while handling one frame (via tracemalloc).
+Results are saved as JSON; --compare prints the change against an earlier run.
+
+Without --video, PoseEngine cases run on synthetic noise frames, where
+MediaPipe finds no pose; use a real clip to time the full detection path.
+The startup suite times fresh interpreters importing the replay/analysis
+modules (which must not load MediaPipe or OpenCV) and building an engine.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import numpy as np
+
+# Adjust path to find src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.analytics import RepAnalytics
+from src.exercises import EXERCISES
+from src.geometry import calculate_angle, joint_angles
+from src.hud import HudRenderer
+from src.landmarks import LandmarkFrame
+from src.multiplex import MultiExerciseEvaluator
+from src.synthetic import synthetic_session
+
+RESOLUTIONS = [(640, 480), (1280, 720)]
+COMPLEXITIES = [0, 1, 2]
+
+def measure(func, items, alloc_samples=50):
+    """
+    Calls func(item) for every item. Returns a stats dict.
+    """
+    # Warm up caches and lazy initialisation outside the timed loop
+    for item in items[:min(5, len(items))]:
+        func(item)
+
+    latencies = np.empty(len(items))
+    start = time.perf_counter()
+    for i, item in enumerate(items):
+        t0 = time.perf_counter()
+        func(item)
+        latencies[i] = time.perf_counter() - t0
+    total = time.perf_counter() - start
+
+    # Allocation pass runs separately so tracing doesn't skew the timings
+    peaks = []
+    tracemalloc.start()
+    for item in items[:alloc_samples]:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        func(item)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+
+    return {
+        "n": len(items),
+        "throughput_per_s": len(items) / total if total > 0 else 0.0,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000.0),
+        "p99_ms": float(np.percentile(latencies, 99) * 1000.0),
+        "alloc_bytes_per_frame": float(np.mean(peaks)) if peaks else 0.0,
+    }
+
+def latency_stats(latencies):
+    """
+    Stats dict for one-off timings that measure() can't repeat cheaply.
+    """
+    latencies = np.array(latencies)
+    return {
+        "n": len(latencies),
+        "throughput_per_s": 1.0 / latencies.mean(),
+        "p50_ms": float(np.percentile(latencies, 50) * 1000.0),
+        "p99_ms": float(np.percentile(latencies, 99) * 1000.0),
+        "alloc_bytes_per_frame": 0.0,
+    }
+
+def load_video_frames(path, n_frames, size):
+    import cv2
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < n_frames:
+        ret, frame = cap.read()
+        if not ret:
+            if not frames:
+                raise IOError(f"Cannot read frames from {path}")
+            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            continue
+        frames.append(cv2.resize(frame, size))
+    cap.release()
+    return frames
+
+def synthetic_frames(n_frames, size, seed=0):
+    rng = np.random.default_rng(seed)
+    w, h = size
+    return [rng.integers(0, 256, (h, w, 3), dtype=np.uint8) for _ in range(n_frames)]
+
+def bench_engine(args, results):
+    from src.pose_engine import PoseEngine, PoseEnginePool
+    from src.roi import RoiTracker
+
+    for size in RESOLUTIONS:
+        if args.video:
+            frames = load_video_frames(args.video, args.frames, size)
+        else:
+            frames = synthetic_frames(min(args.frames, 50), size)
+        for complexity in COMPLEXITIES:
+            name = f"process_frame[c={complexity},{size[0]}x{size[1]}]"
+            try:
+                engine = PoseEngine(static_image_mode=False, model_complexity=complexity)
+            except Exception as e:
+                # MediaPipe downloads the lite/heavy models on first use
+                print(f"{name:<40} skipped: {e}")
+                continue
+            results[name] = measure(engine.process_frame, frames)
+            print_case(name, results[name])
+            if complexity == 1:
+                # Same frames cropped around the previous pose (needs --video to engage)
+                engine.reset()
+                engine.attach(roi=RoiTracker())
+                name = f"process_frame[c={complexity},roi,{size[0]}x{size[1]}]"
+                results[name] = measure(engine.process_frame, frames)
+                print_case(name, results[name])
+            engine.close()
+
+    # Session start (engine ready + first frame): new engine vs warmed pool
+    image = synthetic_frames(1, RESOLUTIONS[0])[0]
+    with PoseEnginePool() as pool:
+        pool.prewarm()
+        for name in ("session_start[cold]", "session_start[pooled]"):
+            latencies = []
+            for _ in range(5):
+                t0 = time.perf_counter()
+                cold = name.endswith("[cold]")
+                engine = PoseEngine() if cold else pool.checkout()
+                engine.process_frame(image)
+                latencies.append(time.perf_counter() - t0)
+                # Release outside the timed region
+                if cold:
+                    engine.close()
+                else:
+                    pool.checkin(engine)
+            results[name] = latency_stats(latencies)
+            print_case(name, results[name])
+
+def bench_drawing(args, results):
+    from mediapipe.framework.formats import landmark_pb2
+    from src.pose_engine import PoseEngine
+
+    _, landmarks = synthetic_session("heel_slide", duration=1.0)
+    proto = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z, v in landmarks[0]:
+        proto.landmark.add(x=x, y=y, z=z, visibility=v)
+    pose_results = SimpleNamespace(pose_landmarks=proto)
+
+    engine = PoseEngine()
+    image = np.zeros((720, 1280, 3), dtype=np.uint8)
+    results["draw_landmarks[1280x720]"] = measure(
+        lambda _: engine.draw_landmarks(image, pose_results), range(args.frames))
+    print_case("draw_landmarks[1280x720]", results["draw_landmarks[1280x720]"])
+
+    results["landmark_frame_from_results"] = measure(
+        lambda _: LandmarkFrame.from_results(pose_results), range(args.frames))
+    print_case("landmark_frame_from_results", results["landmark_frame_from_results"])
+    engine.close()
+
+    # Demo overlay; the countdown changes the feedback label once a second
+    hud = HudRenderer()
+    snapshots = [("HOLD", f"Holding... {5 - i // 30}", 3, 171.0, "RIGHT", False)
+                 for i in range(args.frames)]
+    results["hud[1280x720]"] = measure(
+        lambda snapshot: hud.draw_exercise(image, "Quadriceps Set", snapshot), snapshots)
+    print_case("hud[1280x720]", results["hud[1280x720]"])
+
+def bench_geometry(args, results):
+    _, landmarks = synthetic_session("heel_slide", duration=args.frames / 30.0)
+    frames = list(landmarks)
+
+    results["calculate_angle"] = measure(
+        lambda lm: calculate_angle(lm[24, :3], lm[26, :3], lm[28, :3]), frames)
+    print_case("calculate_angle", results["calculate_angle"])
+
+    results["joint_angles[frame]"] = measure(joint_angles, frames)
+    print_case("joint_angles[frame]", results["joint_angles[frame]"])
+
+    # One call over the whole session; report per-frame figures
+    stats = measure(joint_angles, [landmarks] * 20, alloc_samples=5)
+    stats["throughput_per_s"] *= len(landmarks)
+    stats["alloc_bytes_per_frame"] /= len(landmarks)
+    results["joint_angles[batch]"] = stats
+    print_case("joint_angles[batch]", stats)
+
+def bench_exercises(args, results):
+    for name, exercise_class in EXERCISES.items():
+        timestamps, landmarks = synthetic_session(name, duration=max(args.frames / 30.0, 30.0))
+        items = [(float(t), LandmarkFrame(lm)) for t, lm in zip(timestamps, landmarks)]
+        exercise = exercise_class()
+        case = f"update[{exercise_class.__name__}]"
+        results[case] = measure(lambda item: exercise.update(item[1], item[0]), items)
+        print_case(case, results[case])
+
+    # All exercises on one stream: separately vs sharing one angle pass
+    timestamps, landmarks = synthetic_session("heel_slide", duration=max(args.frames / 30.0, 30.0))
+    items = [(float(t), LandmarkFrame(lm)) for t, lm in zip(timestamps, landmarks)]
+    separate = [cls() for cls in EXERCISES.values()]
+    results["update[all, separate]"] = measure(
+        lambda item: [ex.update(item[1], item[0]) for ex in separate], items)
+    print_case("update[all, separate]", results["update[all, separate]"])
+
+    evaluator = MultiExerciseEvaluator([cls() for cls in EXERCISES.values()])
+    results["update[all, multiplexed]"] = measure(
+        lambda item: evaluator.update(item[1], item[0]), items)
+    print_case("update[all, multiplexed]", results["update[all, multiplexed]"])
+
+    # Per-frame cost of the streaming rep analytics
+    exercise = EXERCISES["heel_slide"](analytics=RepAnalytics())
+    results["update[HeelSlide, analytics]"] = measure(
+        lambda item: exercise.update(item[1], item[0]), items)
+    print_case("update[HeelSlide, analytics]", results["update[HeelSlide, analytics]"])
+
+# Cold-start cases: code run in a fresh interpreter after the imports
+STARTUP_CASES = {
+    "startup[replay]": "import src.offline, src.recording",
+    "startup[batch+server]": "import src.batch, src.server",
+    "startup[engine]": "from src.pose_engine import PoseEngine; PoseEngine().close()",
+}
+
+def bench_startup(args, results):
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    for name, code in STARTUP_CASES.items():
+        latencies = []
+        for _ in range(5):
+            t0 = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], cwd=root, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            latencies.append(time.perf_counter() - t0)
+        results[name] = latency_stats(latencies)
+        print_case(name, results[name])
+
+def print_case(name, stats):
+    print(f"{name:<40} {stats['throughput_per_s']:>12.0f}/s  p50={stats['p50_ms']:.4f}ms  "
+          f"p99={stats['p99_ms']:.4f}ms  alloc={stats['alloc_bytes_per_frame']:.0f}B")
+
+def compare(results, previous):
+    print("\nChange vs previous run (p50 latency):")
+    for name, stats in results.items():
+        old = previous.get(name)
+        if not old or not old["p50_ms"]:
+            continue
+        change = (stats["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100.0
+        print(f"{name:<40} {old['p50_ms']:.4f}ms -> {stats['p50_ms']:.4f}ms ({change:+.1f}%)")
+
+def environment():
+    info = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    try:
+        import cv2
+        import mediapipe
+        info["opencv"] = cv2.__version__
+        info["mediapipe"] = mediapipe.__version__
+    except ImportError:
+        pass
+    return info
+
+SUITES = {
+    "engine": bench_engine,
+    "drawing": bench_drawing,
+    "geometry": bench_geometry,
+    "exercises": bench_exercises,
+    "startup": bench_startup,
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pose pipeline hot paths.")
+    parser.add_argument("--video", help="Video clip for PoseEngine benchmarks")
+    parser.add_argument("--frames", type=int, default=200, help="Frames per case")
+    parser.add_argument("--suites", nargs="+", choices=sorted(SUITES), default=list(SUITES))
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)["results"]
+
+    results = {}
+    for suite in args.suites:
+        SUITES[suite](args, results)
+
+    with open(args.output, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2)
+    print(f"\nSaved results to {args.output}")
+
+    if previous is not None:
+        compare(results, previous)
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,14 @@
 import cv2
 import sys
 import time
-from src.pose_engine import PoseEngine
+from src.pose_engine import PoseEnginePool
+from src.hud import HudRenderer
+from src.roi import RoiTracker
 from src.exercises import QuadricepsSet, StraightLegRaise, HeelSlide, WallSquat, KneeExtensionROM
+from src.landmarks import LandmarkFrame
+from src.pipeline import PipelinedRunner, format_report
+from src.multicam import CameraView, MultiCameraRunner
+from src.analytics import RepAnalytics
 
 def display_menu():
     print("\n=== Physio Monitor ===")
@@ -14,101 +20,148 @@ def display_menu():
     print("q. Quit")
     print("======================")
 
-def run_exercise(exercise_class):
-    exercise = exercise_class()
-    engine = PoseEngine()
-    cap = cv2.VideoCapture(0)
+def run_exercise(exercise_class, pool, cameras=None):
+    if cameras and len(cameras) > 1:
+        run_multi_session(exercise_class, pool, cameras)
+        return
+    # Inference runs on a crop around the patient once they are found
+    with pool.engine(roi=RoiTracker()) as engine:
+        run_session(exercise_class, engine, cameras[0] if cameras else 0)
+
+def run_multi_session(exercise_class, pool, cameras):
+    """
+    Same session with several cameras: one engine per view, landmarks fused
+    before they reach the exercise.
+    """
+    analytics = RepAnalytics()
+    exercise = exercise_class(analytics=analytics)
+    views = [CameraView.open(camera) for camera in cameras]
+    engines = [pool.checkout(roi=RoiTracker()) for _ in views]
+
+    def evaluate(frames, results, fused, reference):
+        if fused is None:
+            return None
+        # Set timestamp rather than the wall clock, so file views time holds correctly
+        state, feedback, reps = exercise.update(fused, reference)
+        return state, feedback, reps, exercise.current_angle, exercise.side, exercise.auto_side
+
+    runner = MultiCameraRunner(engines, views, process=evaluate)
+    hud = HudRenderer()
+
+    print(f"\nStarting {exercise.name} with {len(views)} cameras...")
+    print("Press 'q' to end session.")
+    print("Press 's' to toggle side (Left/Right) during Setup.")
+
+    try:
+        for frames, results, snapshot in runner:
+            overlay = True
+            for i, (frame, result) in enumerate(zip(frames, results)):
+                if frame is None:
+                    continue
+                engines[i].draw_landmarks(frame, result)
+                if overlay:
+                    hud.draw_exercise(frame, exercise.name, snapshot)
+                    overlay = False
+                cv2.imshow(f'Physio Monitor {i + 1}', frame)
+
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord('q'):
+                break
+            elif key == ord('s'):
+                with runner.lock:
+                    if exercise.state == "SETUP":
+                        exercise.toggle_side()
+                        print(f"Side toggled to {exercise.side}")
+    finally:
+        runner.stop()
+        for view in views:
+            view.release()
+        for engine in engines:
+            pool.checkin(engine)
+        cv2.destroyAllWindows()
+    print(f"Session Ended. Total Reps: {exercise.reps}")
+    print_rep_summaries(analytics)
+    print(format_report(runner.report()))
+
+def print_rep_summaries(analytics):
+    for row in analytics.summaries.values():
+        print(f"Rep {row['rep']}: range {row['min']:.0f}-{row['max']:.0f} deg, "
+              f"{row['duration']:.1f}s, hold wobble {row['hold_std']:.1f} deg")
+
+def run_session(exercise_class, engine, source=0):
+    """
+    source: camera index or video path for cv2.VideoCapture.
+    """
+    analytics = RepAnalytics()
+    exercise = exercise_class(analytics=analytics)
+    cap = cv2.VideoCapture(source)
     
-    start_time = time.time()
+    def evaluate(frame, results):
+        # Runs on the inference thread; returns a snapshot for the render stage
+        landmarks = LandmarkFrame.from_results(results)
+        if landmarks is None:
+            return None
+        state, feedback, reps = exercise.update(landmarks)
+        return state, feedback, reps, exercise.current_angle, exercise.side, exercise.auto_side
+
+    runner = PipelinedRunner(engine, cap, process=evaluate)
+    hud = HudRenderer()
     
     print(f"\nStarting {exercise.name}...")
     print("Press 'q' to end session.")
     print("Press 's' to toggle side (Left/Right) during Setup.")
     
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-            
-        results = engine.process_frame(frame)
-        engine.draw_landmarks(frame, results)
-        
-        # Get frame dimensions
-        h, w, _ = frame.shape
-        
-        if results.pose_landmarks:
-            state, feedback, reps = exercise.update(results.pose_landmarks)
-            
-            # Helper to draw text with background for readability
-            def draw_text(text, y_pos, color=(0,0,0), scale=0.7):
-                cv2.putText(frame, text, (10, y_pos), 
-                            cv2.FONT_HERSHEY_SIMPLEX, scale, (255, 255, 255), 4, cv2.LINE_AA)
-                cv2.putText(frame, text, (10, y_pos), 
-                            cv2.FONT_HERSHEY_SIMPLEX, scale, color, 2, cv2.LINE_AA)
-
-            # Header
-            cv2.rectangle(frame, (0, 0), (w, 80), (245, 117, 16), -1)
-            cv2.putText(frame, f"{exercise.name}", (10, 30), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255,255,255), 2, cv2.LINE_AA)
-            cv2.putText(frame, f"Reps: {reps}", (w-120, 50), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 1, (255,255,255), 2, cv2.LINE_AA)
-
-            # State & Angle
-            draw_text(f"State: {state}", 110, (0, 255, 0) if state != "SETUP" else (0, 165, 255))
-            draw_text(f"Angle: {int(exercise.current_angle)}", 140, (255, 255, 0))
-            
-            # Side Info
-            side_color = (0, 255, 255) if exercise.auto_side else (0, 0, 255)
-            mode_str = "Auto" if exercise.auto_side else "Manual"
-            draw_text(f"Side: {exercise.side} ({mode_str})", 170, side_color)
-
-            # Feedback (Large and Central if Setup)
-            if state == "SETUP":
-                 cv2.putText(frame, f"{feedback}", (20, h//2), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2, cv2.LINE_AA)
-                 cv2.putText(frame, "Press 's' to swap side", (20, h-30), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (200, 200, 200), 2, cv2.LINE_AA)
-            else:
-                 draw_text(f"{feedback}", 210, (255, 0, 0))
-
-        else:
-            cv2.putText(frame, "No Pose Detected", (10, 50), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-
-        cv2.imshow('Physio Monitor', frame)
-        
-        key = cv2.waitKey(10) & 0xFF
-        if key == ord('q'):
-            break
-        elif key == ord('s'):
-            if exercise.state == "SETUP":
-                exercise.toggle_side()
-                print(f"Side toggled to {exercise.side}")
-            
-    cap.release()
-    cv2.destroyAllWindows()
+    try:
+        for frame, results, snapshot in runner:
+            engine.draw_landmarks(frame, results)
+
+            # Labels are cached patches, re-rendered only when their text changes
+            hud.draw_exercise(frame, exercise.name, snapshot)
+
+            cv2.imshow('Physio Monitor', frame)
+
+            # Frames are paced by the capture thread, so only poll the keyboard here
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord('q'):
+                break
+            elif key == ord('s'):
+                with runner.lock:
+                    if exercise.state == "SETUP":
+                        exercise.toggle_side()
+                        print(f"Side toggled to {exercise.side}")
+    finally:
+        runner.stop()
+        cap.release()
+        cv2.destroyAllWindows()
     print(f"Session Ended. Total Reps: {exercise.reps}")
+    print_rep_summaries(analytics)
+    print(format_report(runner.report()))
 
 def main():
-    while True:
-        display_menu()
-        choice = input("Select Exercise: ").strip()
-        
-        if choice == '1':
-            run_exercise(QuadricepsSet)
-        elif choice == '2':
-            run_exercise(StraightLegRaise)
-        elif choice == '3':
-            run_exercise(HeelSlide)
-        elif choice == '4':
-            run_exercise(WallSquat)
-        elif choice == '5':
-            run_exercise(KneeExtensionROM)
-        elif choice.lower() == 'q':
-            print("Exiting...")
-            break
-        else:
-            print("Invalid choice. Please try again.")
+    # Optional camera indices or video paths, e.g. `python demo.py 0 2`
+    cameras = [int(arg) if arg.isdigit() else arg for arg in sys.argv[1:]]
+    # One warmed graph per camera is reused for every exercise and closed on exit
+    with PoseEnginePool(max_idle=max(2, len(cameras))) as pool:
+        pool.prewarm(count=max(1, len(cameras)))
+        while True:
+            display_menu()
+            choice = input("Select Exercise: ").strip()
+            
+            if choice == '1':
+                run_exercise(QuadricepsSet, pool, cameras)
+            elif choice == '2':
+                run_exercise(StraightLegRaise, pool, cameras)
+            elif choice == '3':
+                run_exercise(HeelSlide, pool, cameras)
+            elif choice == '4':
+                run_exercise(WallSquat, pool, cameras)
+            elif choice == '5':
+                run_exercise(KneeExtensionROM, pool, cameras)
+            elif choice.lower() == 'q':
+                print("Exiting...")
+                break
+            else:
+                print("Invalid choice. Please try again.")
 
 if __name__ == "__main__":
     main()
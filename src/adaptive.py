@@ -0,0 +1,111 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (model_complexity, input scale) from cheapest to most expensive
+DEFAULT_LEVELS = [
+    (0, 0.5),
+    (0, 0.75),
+    (0, 1.0),
+    (1, 0.75),
+    (1, 1.0),
+    (2, 1.0),
+]
+
+class AdaptiveController:
+    """
+    Chooses model complexity and input scale for PoseEngine so that
+    per-frame inference latency stays within the target frame budget.
+
+    Latency is tracked as an exponential moving average. At most once every
+    `window` frames the controller steps one level down when the average
+    exceeds the budget, or one level up when it is below `headroom` times
+    the budget, skipping levels whose complexity the engine failed to
+    load. Every switch is logged.
+    """
+    def __init__(self, target_fps=30.0, levels=None, level=None, window=30,
+                 alpha=0.1, headroom=0.6):
+        self.levels = list(levels or DEFAULT_LEVELS)
+        self.budget = 1.0 / target_fps
+        self.window = window
+        self.alpha = alpha
+        self.headroom = headroom
+        self.level = len(self.levels) - 1 if level is None else level
+        self.latency = None
+        self.switches = 0
+        self.unavailable = set()  # complexities the engine could not build
+        self._frames = 0
+        self._previous = None
+
+    @property
+    def complexity(self):
+        return self.levels[self.level][0]
+
+    @property
+    def scale(self):
+        return self.levels[self.level][1]
+
+    def start_at(self, complexity, scale=1.0):
+        """
+        Starts from the level matching an engine's configured complexity.
+        """
+        if (complexity, scale) in self.levels:
+            self.level = self.levels.index((complexity, scale))
+
+    def observe(self, seconds):
+        """
+        Records one frame's inference latency.
+        Returns True if the level changed.
+        """
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency += self.alpha * (seconds - self.latency)
+
+        self._frames += 1
+        if self._frames < self.window:
+            return False
+
+        if self.latency > self.budget:
+            new_level = self._next_level(-1)
+        elif self.latency < self.headroom * self.budget:
+            new_level = self._next_level(1)
+        else:
+            new_level = None
+        if new_level is None:
+            return False
+
+        old = self.levels[self.level]
+        self._previous = self.level
+        self.level = new_level
+        self.switches += 1
+        self._frames = 0
+        logger.info("Adaptive pose: %.1f ms avg vs %.1f ms budget, complexity %d scale %.2f"
+                    " -> complexity %d scale %.2f",
+                    self.latency * 1000.0, self.budget * 1000.0,
+                    old[0], old[1], self.complexity, self.scale)
+        # The average measured the old level
+        self.latency = None
+        return True
+
+    def _next_level(self, step):
+        level = self.level + step
+        while 0 <= level < len(self.levels):
+            if self.levels[level][0] not in self.unavailable:
+                return level
+            level += step
+        return None
+
+    def fail(self, error=None):
+        """
+        Called when the engine could not switch to the current level's
+        complexity (e.g. its model could not be downloaded): returns to the
+        previous level and skips that complexity from then on.
+        """
+        complexity = self.complexity
+        self.unavailable.add(complexity)
+        if self._previous is not None:
+            self.level = self._previous
+            self._previous = None
+        logger.warning("Adaptive pose: complexity %d unavailable (%s), staying at"
+                       " complexity %d scale %.2f", complexity, error, self.complexity, self.scale)
@@ -0,0 +1,259 @@
+"""
+Streaming rep and range-of-motion analytics with constant memory.
+
+    analytics = RepAnalytics()
+    exercise = HeelSlide(analytics=analytics)
+    ...
+    exercise.update(landmarks, timestamp)   # feeds analytics.observe()
+    analytics.last                          # summary of the latest rep
+
+Every statistic is kept incrementally: Welford running mean/variance,
+running extremes per rep and per hold, sliding-window min/max through
+monotonic deques, and preallocated ring buffers for the recent angle trace
+and the last `history` rep summaries. Nothing grows with session length.
+"""
+import math
+from collections import deque
+
+import numpy as np
+
+# One row per completed rep
+REP_DTYPE = np.dtype([
+    ("rep", "<i4"),
+    ("start", "<f8"),        # time the rep began (previous rep or session start)
+    ("end", "<f8"),          # time it was counted
+    ("duration", "<f4"),     # tempo, seconds
+    ("min", "<f4"),          # angle extremes, e.g. peak knee flexion
+    ("max", "<f4"),
+    ("mean", "<f4"),
+    ("std", "<f4"),
+    ("hold_time", "<f4"),    # seconds spent in HOLD
+    ("hold_std", "<f4"),     # angle wobble while holding (NaN without a hold)
+])
+
+TRACE_DTYPE = np.dtype([("t", "<f8"), ("angle", "<f4")])
+
+class RingBuffer:
+    """
+    Fixed-capacity FIFO over a preallocated array; when full, each append
+    overwrites the oldest entry.
+    """
+    def __init__(self, capacity, dtype=np.float64):
+        self.capacity = capacity
+        self.data = np.zeros(capacity, dtype=dtype)
+        self._next = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, value):
+        self.data[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def last(self):
+        if not self._size:
+            raise IndexError("ring buffer is empty")
+        return self.data[self._next - 1]
+
+    def values(self):
+        """
+        Entries oldest first (a copy once the buffer has wrapped).
+        """
+        if self._size < self.capacity:
+            return self.data[:self._size]
+        return np.concatenate((self.data[self._next:], self.data[:self._next]))
+
+    def clear(self):
+        self._next = 0
+        self._size = 0
+
+class RunningStats:
+    """
+    Welford mean/variance plus min/max over a stream; NaNs are ignored.
+    """
+    __slots__ = ("count", "mean", "_m2", "min", "max")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        if value != value:  # NaN
+            return
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def variance(self):
+        """Population variance (NaN when empty)."""
+        return self._m2 / self.count if self.count else math.nan
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance) if self.count else math.nan
+
+    def summary(self):
+        if not self.count:
+            return {"count": 0, "mean": None, "std": None, "min": None, "max": None}
+        return {"count": self.count, "mean": self.mean, "std": self.std,
+                "min": self.min, "max": self.max}
+
+class WindowExtremes:
+    """
+    Min and max over the last `seconds` of a timestamped stream, O(1)
+    amortised per sample via monotonic deques. capacity bounds each deque;
+    it only matters if more than `capacity` samples in one window are
+    strictly monotonic.
+    """
+    def __init__(self, seconds, capacity=1024):
+        self.seconds = seconds
+        self._min = deque(maxlen=capacity)
+        self._max = deque(maxlen=capacity)
+
+    def reset(self):
+        self._min.clear()
+        self._max.clear()
+
+    def add(self, timestamp, value):
+        if value != value:
+            return
+        lows, highs = self._min, self._max
+        while lows and lows[-1][1] >= value:
+            lows.pop()
+        lows.append((timestamp, value))
+        while highs and highs[-1][1] <= value:
+            highs.pop()
+        highs.append((timestamp, value))
+
+        cutoff = timestamp - self.seconds
+        while lows[0][0] < cutoff:
+            lows.popleft()
+        while highs[0][0] < cutoff:
+            highs.popleft()
+
+    @property
+    def min(self):
+        return self._min[0][1] if self._min else math.nan
+
+    @property
+    def max(self):
+        return self._max[0][1] if self._max else math.nan
+
+class RepAnalytics:
+    """
+    Per-rep and session quality metrics for one Exercise, updated on every
+    Exercise.update() (pass analytics=... to the exercise).
+
+    A rep runs from the previous rep (or leaving SETUP) to the frame where
+    the rep count goes up. observe() returns that rep's REP_DTYPE row when
+    one completes; the last `history` rows stay in `summaries`.
+    window: seconds covered by window_min/window_max (live range of motion).
+    trace: samples kept in `recent` (timestamp, angle) for plotting.
+    """
+    def __init__(self, window=2.0, history=64, trace=300):
+        self.extremes = WindowExtremes(window)
+        self.summaries = RingBuffer(history, REP_DTYPE)
+        self.recent = RingBuffer(trace, TRACE_DTYPE)
+        self.angle = RunningStats()    # whole session, after SETUP
+        self.rom = RunningStats()      # per-rep range of motion (max - min)
+        self.tempo = RunningStats()    # per-rep duration
+        self._rep = RunningStats()
+        self._hold = RunningStats()
+        self.reset()
+
+    def reset(self):
+        for stats in (self.angle, self.rom, self.tempo, self._rep, self._hold):
+            stats.reset()
+        self.extremes.reset()
+        self.summaries.clear()
+        self.recent.clear()
+        self.reps = 0
+        self._rep_start = None
+        self._hold_time = 0.0
+        self._state = None
+        self._last_time = None
+
+    def observe(self, timestamp, state, reps, angle):
+        """
+        Records one frame of an exercise. Returns the completed rep's row,
+        or None.
+        """
+        angle = float(angle)
+        self.recent.append((timestamp, angle))
+        self.extremes.add(timestamp, angle)
+
+        previous, last_time = self._state, self._last_time
+        self._state, self._last_time = state, timestamp
+        if self._rep_start is None:
+            if state == "SETUP":
+                return None
+            self._rep_start = timestamp
+
+        self.angle.add(angle)
+        self._rep.add(angle)
+        if previous == "HOLD":
+            self._hold_time += timestamp - last_time
+        if state == "HOLD":
+            self._hold.add(angle)
+
+        if reps <= self.reps:
+            return None
+        return self._complete(timestamp, reps)
+
+    def _complete(self, timestamp, reps):
+        rep, hold = self._rep, self._hold
+        duration = timestamp - self._rep_start
+        row = (reps, self._rep_start, timestamp, duration,
+               rep.min if rep.count else math.nan, rep.max if rep.count else math.nan,
+               rep.mean if rep.count else math.nan, rep.std,
+               self._hold_time, hold.std)
+        self.summaries.append(row)
+        if rep.count:
+            self.rom.add(rep.max - rep.min)
+        self.tempo.add(duration)
+
+        self.reps = reps
+        self._rep_start = timestamp
+        self._hold_time = 0.0
+        rep.reset()
+        hold.reset()
+        return self.summaries.last().copy()
+
+    @property
+    def last(self):
+        """Row of the most recent rep, or None."""
+        return self.summaries.last().copy() if len(self.summaries) else None
+
+    @property
+    def window_min(self):
+        return self.extremes.min
+
+    @property
+    def window_max(self):
+        return self.extremes.max
+
+    def summary(self):
+        """
+        Session metrics as a JSON-friendly dict.
+        """
+        return {
+            "reps": self.reps,
+            "angle": self.angle.summary(),
+            "range_of_motion": self.rom.summary(),
+            "rep_duration": self.tempo.summary(),
+        }
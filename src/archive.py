@@ -0,0 +1,491 @@
+"""
+Columnar, compressed archive of scored sessions for clinician analytics.
+
+    archive = SessionArchive("archive/")
+    with archive.writer("patient-7", "heel_slide", side="RIGHT") as writer:
+        for timestamp, landmarks in frames:
+            exercise.update(landmarks, timestamp)
+            writer.record(exercise, timestamp)
+
+    # Smallest knee angle (deepest flexion) per heel slide session this month
+    archive.aggregate("knee", "min", exercise="heel_slide", since=month_start)
+
+Layout:
+
+    index.jsonl          one JSON line per finished session
+    <session id>/<column>.z
+                         zlib-compressed chunks of one column, back to back
+
+Each session stores per-frame columns: timestamp (float64), state (uint8
+code into the session's state list), reps (uint16, running count) and one
+float32 column per angle (NaN where no pose was scored). Rows are written in
+chunks of `chunk_rows`. The index line records the patient, exercise, side,
+recording time, time range, rep summaries and, for every chunk, the byte
+ranges of its columns plus a zone map (min, max, sum, non-NaN count per
+column).
+
+Queries filter sessions on the index alone, skip chunks whose zone maps
+rule them out, decompress only the requested columns of the remaining
+chunks, and answer min/max/sum/count/mean over whole chunks from the zone
+maps without touching the data files. A session becomes visible when its
+writer closes; an interrupted one leaves unindexed files and no index line.
+"""
+import json
+import os
+import time
+import uuid
+import zlib
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: O_APPEND alone
+    fcntl = None
+
+from .exercises import EXERCISES
+
+INDEX = "index.jsonl"
+CHUNK_ROWS = 4096
+BASE_COLUMNS = {"timestamp": "<f8", "state": "|u1", "reps": "<u2"}
+ANGLE_DTYPE = "<f4"
+AGGREGATES = ("min", "max", "sum", "count", "mean")
+
+def _zone(values):
+    if values.dtype.kind == "f":
+        count = int(np.count_nonzero(~np.isnan(values)))
+        if count == 0:
+            return [None, None, 0.0, 0]
+        return [float(np.nanmin(values)), float(np.nanmax(values)),
+                float(np.nansum(values, dtype=np.float64)), count]
+    if len(values) == 0:
+        return [None, None, 0.0, 0]
+    return [float(values.min()), float(values.max()), float(values.sum(dtype=np.float64)),
+            len(values)]
+
+def _combine(how, parts):
+    """
+    Merges per-chunk [min, max, sum, count] partials into one aggregate.
+    """
+    parts = [p for p in parts if p[3]]
+    if not parts:
+        return 0 if how == "count" else None
+    if how == "min":
+        return min(p[0] for p in parts)
+    if how == "max":
+        return max(p[1] for p in parts)
+    total = sum(p[2] for p in parts)
+    count = sum(p[3] for p in parts)
+    if how == "sum":
+        return total
+    if how == "count":
+        return count
+    return total / count
+
+class SessionWriter:
+    """
+    Buffers one session's rows and writes them as compressed column chunks.
+    Use SessionArchive.writer() to create one. close() (or leaving a with
+    block normally) flushes the last chunk and adds the session to the
+    index; leaving it with an exception writes the chunk but no index line.
+    """
+    def __init__(self, archive, patient, exercise, side=None, angles=None, states=None,
+                 recorded_at=None, **metadata):
+        protocol = EXERCISES[exercise].compile() if exercise in EXERCISES else None
+        if angles is None:
+            angles = (protocol.angles[protocol.primary],) if protocol else ("angle",)
+        if states is None:
+            states = ["SETUP"] + list(protocol.states) if protocol else ["SETUP"]
+
+        self.archive = archive
+        self.id = uuid.uuid4().hex
+        self.angles = tuple(angles)
+        self.entry = {
+            "id": self.id,
+            "patient": patient,
+            "exercise": exercise,
+            "side": side,
+            "recorded_at": time.time() if recorded_at is None else recorded_at,
+            "states": list(states),
+            "columns": dict(BASE_COLUMNS, **{name: ANGLE_DTYPE for name in self.angles}),
+            "metadata": metadata,
+            "chunks": [],
+        }
+        self._codes = {name: i for i, name in enumerate(states)}
+        self.rows = 0
+        self.closed = False
+
+        n = archive.chunk_rows
+        self._buffers = {name: np.empty(n, dtype=dtype)
+                         for name, dtype in self.entry["columns"].items()}
+        self._angle_buffers = [self._buffers[name] for name in self.angles]
+        self._count = 0
+        self._offsets = {name: 0 for name in self._buffers}
+
+        # Rep tracking across chunks: running extremes of the first angle
+        self._reps = 0
+        self._rep_start = None
+        self._rep_min = np.inf
+        self._rep_max = -np.inf
+        self._rep_summaries = []
+
+        self._dir = os.path.join(archive.root, self.id)
+        os.makedirs(self._dir)
+        self._files = {name: open(os.path.join(self._dir, f"{name}.z"), "wb")
+                       for name in self._buffers}
+
+    def _code(self, state):
+        code = self._codes.get(state)
+        if code is None:
+            code = self._codes[state] = len(self.entry["states"])
+            self.entry["states"].append(state)
+        return code
+
+    def append(self, timestamp, state, reps, angles):
+        """
+        Adds one row. angles: one value per angle column (a scalar when
+        there is a single column).
+        """
+        i = self._count
+        buffers = self._buffers
+        buffers["timestamp"][i] = timestamp
+        buffers["state"][i] = self._code(state)
+        buffers["reps"][i] = reps
+        if len(self._angle_buffers) == 1 and np.ndim(angles) == 0:
+            self._angle_buffers[0][i] = angles
+        else:
+            for buffer, value in zip(self._angle_buffers, angles):
+                buffer[i] = value
+        self._count = i + 1
+        if self._count == len(buffers["timestamp"]):
+            self.flush()
+
+    def record(self, exercise, timestamp, pose=True):
+        """
+        Adds the row for an Exercise just updated at timestamp. pose=False
+        stores a NaN angle (no pose was scored on this frame). Only for
+        writers with a single angle column; use append() otherwise.
+        """
+        if len(self.angles) != 1:
+            raise ValueError(f"record() needs a single angle column, writer has {self.angles}")
+        angle = exercise.current_angle if pose else np.nan
+        self.append(timestamp, exercise.state, exercise.reps, angle)
+
+    def extend(self, timestamps, states, reps, angles):
+        """
+        Adds many rows at once. states: names or codes; angles: dict of
+        (T,) arrays keyed by angle column name.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        states = np.asarray(states)
+        if states.dtype.kind in "OUS":
+            names, inverse = np.unique(states, return_inverse=True)
+            lut = np.array([self._code(str(name)) for name in names], dtype=np.uint8)
+            states = lut[inverse]
+        columns = {"timestamp": timestamps, "state": states, "reps": np.asarray(reps)}
+        for name in self.angles:
+            columns[name] = np.asarray(angles[name])
+
+        n = self.archive.chunk_rows
+        done = 0
+        while done < len(timestamps):
+            take = min(n - self._count, len(timestamps) - done)
+            for name, buffer in self._buffers.items():
+                buffer[self._count:self._count + take] = columns[name][done:done + take]
+            self._count += take
+            done += take
+            if self._count == n:
+                self.flush()
+
+    def flush(self):
+        """
+        Compresses and writes the buffered rows as a chunk.
+        """
+        n = self._count
+        if n == 0:
+            return
+        chunk = {"rows": n, "offsets": {}, "zone": {}}
+        for name, buffer in self._buffers.items():
+            values = buffer[:n]
+            blob = zlib.compress(values.tobytes())
+            self._files[name].write(blob)
+            chunk["offsets"][name] = [self._offsets[name], len(blob)]
+            self._offsets[name] += len(blob)
+            chunk["zone"][name] = _zone(values)
+        chunk["start"], chunk["end"] = chunk["zone"]["timestamp"][:2]
+        self._summarise_reps(n)
+        self.entry["chunks"].append(chunk)
+        self.rows += n
+        self._count = 0
+
+    def _summarise_reps(self, n):
+        timestamps = self._buffers["timestamp"][:n]
+        reps = self._buffers["reps"][:n]
+        angle = self._angle_buffers[0][:n] if self._angle_buffers else np.full(n, np.nan)
+        if self._rep_start is None:
+            self._rep_start = float(timestamps[0])
+
+        ends = np.flatnonzero(np.diff(reps, prepend=reps.dtype.type(self._reps)))
+        start = 0
+        # Few reps per chunk, so a loop over rep boundaries is cheap
+        for end in ends:
+            segment = angle[start:end + 1]
+            if np.any(~np.isnan(segment)):
+                self._rep_min = min(self._rep_min, float(np.nanmin(segment)))
+                self._rep_max = max(self._rep_max, float(np.nanmax(segment)))
+            if reps[end] > self._reps:
+                self._rep_summaries.append({
+                    "rep": int(reps[end]),
+                    "start": self._rep_start,
+                    "time": float(timestamps[end]),
+                    "min": self._rep_min if np.isfinite(self._rep_min) else None,
+                    "max": self._rep_max if np.isfinite(self._rep_max) else None,
+                })
+            self._reps = int(reps[end])
+            self._rep_start = float(timestamps[end])
+            self._rep_min, self._rep_max = np.inf, -np.inf
+            start = end + 1
+
+        segment = angle[start:]
+        if np.any(~np.isnan(segment)):
+            self._rep_min = min(self._rep_min, float(np.nanmin(segment)))
+            self._rep_max = max(self._rep_max, float(np.nanmax(segment)))
+
+    def close(self):
+        """
+        Finishes the session and adds it to the index. Returns the entry.
+        """
+        if self.closed:
+            return self.entry
+        self._finish()
+        chunks = self.entry["chunks"]
+        self.entry.update({
+            "frames": self.rows,
+            "start": chunks[0]["start"] if chunks else None,
+            "end": chunks[-1]["end"] if chunks else None,
+            "reps": self._reps,
+            "rep_summaries": self._rep_summaries,
+        })
+        self.archive._append_index(self.entry)
+        return self.entry
+
+    def _finish(self):
+        self.flush()
+        for f in self._files.values():
+            f.close()
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        elif not self.closed:
+            # An interrupted session keeps its files but is not indexed
+            self._finish()
+
+class SessionArchive:
+    """
+    Directory of archived sessions (see the module docstring for the layout).
+    """
+    def __init__(self, root, chunk_rows=CHUNK_ROWS):
+        self.root = root
+        self.chunk_rows = chunk_rows
+        os.makedirs(root, exist_ok=True)
+        self._index_path = os.path.join(root, INDEX)
+        self._entries = []
+        self._by_id = {}
+        self._index_offset = 0
+
+    def writer(self, patient, exercise, side=None, angles=None, **metadata):
+        """
+        Starts a session. exercise is an EXERCISES key; angles default to
+        its primary angle. Extra keyword arguments (e.g. video=...) are kept
+        in the index entry's metadata.
+        """
+        return SessionWriter(self, patient, exercise, side, angles, **metadata)
+
+    def add(self, patient, exercise, timestamps, states, reps, angles, side=None, **metadata):
+        """
+        Archives a whole session from (T,) arrays. angles: dict of (T,)
+        arrays. Returns the index entry.
+        """
+        with SessionWriter(self, patient, exercise, side, tuple(angles), **metadata) as writer:
+            writer.extend(timestamps, states, reps, angles)
+        return writer.entry
+
+    def add_result(self, patient, exercise, result, angles, side=None, **metadata):
+        """
+        Archives a src.offline.evaluate() result with the angle traces it
+        was computed from.
+        """
+        frames = np.arange(len(result.timestamps))
+        reps = np.searchsorted(result.rep_frames, frames, side="right")
+        return self.add(patient, exercise, result.timestamps, result.states(), reps, angles,
+                        side, **metadata)
+
+    def _append_index(self, entry):
+        line = (json.dumps(entry, separators=(",", ":")) + "\n").encode()
+        # Writers in other processes (e.g. batch workers) append to the same
+        # file: one unbuffered O_APPEND write under an exclusive lock, so a
+        # long line is never split or interleaved with another
+        fd = os.open(self._index_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            written = os.write(fd, line)
+            if written != len(line):
+                raise OSError(f"short write to {self._index_path}: {written} of {len(line)} bytes")
+        finally:
+            os.close(fd)  # also releases the lock
+
+    def _refresh(self):
+        # The index is append-only: read only what was added since last time
+        if not os.path.exists(self._index_path):
+            return
+        with open(self._index_path) as f:
+            f.seek(self._index_offset)
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # a line still being written
+                entry = json.loads(line)
+                self._entries.append(entry)
+                self._by_id[entry["id"]] = entry
+                self._index_offset += len(line.encode())
+
+    def sessions(self, patient=None, exercise=None, side=None, since=None, until=None):
+        """
+        Index entries matching every given filter; since/until bound the
+        recording time (seconds since the epoch).
+        """
+        self._refresh()
+        matches = []
+        for entry in self._entries:
+            if patient is not None and entry["patient"] != patient:
+                continue
+            if exercise is not None and entry["exercise"] != exercise:
+                continue
+            if side is not None and entry["side"] != side:
+                continue
+            if since is not None and entry["recorded_at"] < since:
+                continue
+            if until is not None and entry["recorded_at"] >= until:
+                continue
+            matches.append(entry)
+        return matches
+
+    def session(self, session_id):
+        self._refresh()
+        return self._by_id[session_id]
+
+    def _entry(self, session):
+        return session if isinstance(session, dict) else self.session(session)
+
+    def _column(self, entry, chunk, name):
+        offset, length = chunk["offsets"][name]
+        with open(os.path.join(self.root, entry["id"], f"{name}.z"), "rb") as f:
+            f.seek(offset)
+            data = zlib.decompress(f.read(length))
+        return np.frombuffer(data, dtype=entry["columns"][name])
+
+    def _chunks(self, entry, start, end, where):
+        """
+        Yields (chunk, fully inside the time range) for chunks the zone
+        maps can't rule out.
+        """
+        for chunk in entry["chunks"]:
+            if start is not None and chunk["end"] < start:
+                continue
+            if end is not None and chunk["start"] > end:
+                continue
+            if where is not None:
+                name, low, high = where
+                lo, hi = chunk["zone"][name][:2]
+                if lo is None or (high is not None and lo > high) or (low is not None and hi < low):
+                    continue
+            inside = (start is None or chunk["start"] >= start) and \
+                (end is None or chunk["end"] <= end)
+            yield chunk, inside
+
+    def _decoded(self, entry, chunk, name, decoded):
+        # Column of one chunk, decompressed at most once per query
+        values = decoded.get(name)
+        if values is None:
+            values = decoded[name] = self._column(entry, chunk, name)
+        return values
+
+    def _rows(self, entry, chunk, inside, start, end, where, decoded):
+        # Row mask within one chunk, or None when every row qualifies.
+        # Columns it reads are left in `decoded` for the caller.
+        mask = None
+        if not inside:
+            timestamps = self._decoded(entry, chunk, "timestamp", decoded)
+            mask = np.ones(len(timestamps), dtype=bool)
+            if start is not None:
+                mask &= timestamps >= start
+            if end is not None:
+                mask &= timestamps <= end
+        if where is not None:
+            name, low, high = where
+            lo, hi, _, count = chunk["zone"][name]
+            # NaN rows never satisfy a value range
+            if count < chunk["rows"] or (low is not None and lo < low) or \
+                    (high is not None and hi > high):
+                values = self._decoded(entry, chunk, name, decoded)
+                keep = np.ones(len(values), dtype=bool)
+                if low is not None:
+                    keep &= values >= low
+                if high is not None:
+                    keep &= values <= high
+                mask = keep if mask is None else mask & keep
+        return mask
+
+    def read(self, session, columns=None, start=None, end=None, where=None):
+        """
+        Rows of one session as a dict of arrays, reading only the requested
+        columns of chunks that can contain matching rows.
+        start, end: timestamp range (inclusive).
+        where: (column, low, high) value range; None bounds are open. Rows
+        where that column is NaN never match. Without where, NaN angles
+        (frames with no pose) are returned as stored.
+        State codes decode through entry["states"].
+        """
+        entry = self._entry(session)
+        columns = list(entry["columns"]) if columns is None else list(columns)
+        parts = {name: [] for name in columns}
+        for chunk, inside in self._chunks(entry, start, end, where):
+            decoded = {}
+            mask = self._rows(entry, chunk, inside, start, end, where, decoded)
+            for name in columns:
+                values = self._decoded(entry, chunk, name, decoded)
+                parts[name].append(values if mask is None else values[mask])
+        return {name: np.concatenate(arrays) if arrays
+                else np.empty(0, dtype=entry["columns"][name])
+                for name, arrays in parts.items()}
+
+    def aggregate(self, column, how="max", start=None, end=None, where=None, **filters):
+        """
+        Aggregates a column per session: {session id: value}. how is one of
+        min, max, sum, count, mean (NaNs ignored; None when no rows).
+        filters are passed to sessions(); start, end and where restrict
+        rows as in read(). Chunks entirely within the range are answered
+        from their zone maps.
+        """
+        if how not in AGGREGATES:
+            raise ValueError(f"unknown aggregate {how!r}, expected one of {AGGREGATES}")
+        results = {}
+        for entry in self.sessions(**filters):
+            if column not in entry["columns"]:
+                continue
+            parts = []
+            for chunk, inside in self._chunks(entry, start, end, where):
+                decoded = {}
+                mask = self._rows(entry, chunk, inside, start, end, where, decoded)
+                if mask is None:
+                    parts.append(chunk["zone"][column])
+                else:
+                    values = self._decoded(entry, chunk, column, decoded)[mask]
+                    parts.append(_zone(values))
+            results[entry["id"]] = _combine(how, parts)
+        return results
@@ -0,0 +1,283 @@
+"""
+Headless batch analysis of recorded exercise videos.
+
+Usage:
+    python -m src.batch VIDEO_DIR --exercise heel_slide --out results/ [--workers N]
+                       [--fps 15] [--start 30] [--end 95] [--archive archive/]
+
+Each video is analysed by one worker process that owns its own MediaPipe
+graph. For every video the tool writes <name>.json (rep count, final state,
+timings, per-rep range of motion and tempo) and <name>_trace.csv (per-frame
+angle, state and reps), plus a combined summary.json. With --record the
+landmark stream is also saved as <name>.lmk so the video can be re-scored
+later without re-running MediaPipe (see src.recording). --smooth runs the
+landmarks through a src.filters filter before scoring; recordings keep the raw
+landmarks. --fps analyses frames at a reduced rate (skipped frames are not
+decoded) and --start/--end restrict analysis to a time range (see src.video).
+--archive adds each scored session to a src.archive.SessionArchive, with the
+output name as the patient id. Videos sharing a file stem (e.g. s1.mp4 and
+s1.avi) get names derived from their paths, see output_names().
+"""
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .analytics import RepAnalytics
+from .archive import SessionArchive
+from .exercises import EXERCISES
+from .filters import FILTERS
+from .landmarks import LandmarkFrame
+from .recording import SessionRecorder
+from .video import VideoSource
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm")
+
+# One engine per worker process, built by _init_worker
+_engine = None
+
+def _init_worker(model_complexity):
+    global _engine
+    import cv2
+    from .pose_engine import PoseEngine
+
+    # Parallelism comes from the process pool; keep OpenCV single-threaded
+    # so workers don't oversubscribe the cores.
+    cv2.setNumThreads(1)
+    _engine = PoseEngine(static_image_mode=False, model_complexity=model_complexity)
+
+def find_videos(directory):
+    """
+    Returns the sorted video file paths in a directory.
+    """
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(VIDEO_EXTENSIONS)
+    )
+
+def output_names(videos):
+    """
+    Output base name (and archive patient id) per video path: the file
+    stem, or for stems shared by several videos (e.g. a/s1.mp4 and
+    b/s1.avi) the path below their common directory with separators and
+    dots replaced by underscores (a_s1_mp4, b_s1_avi). A name that is
+    still taken gets a _2, _3, ... suffix.
+    """
+    stems = [os.path.splitext(os.path.basename(path))[0] for path in videos]
+    shared = [stems.count(stem) > 1 for stem in stems]
+    if any(shared):
+        root = os.path.commonpath([os.path.abspath(os.path.dirname(p))
+                                   for p, clash in zip(videos, shared) if clash])
+        for i, path in enumerate(videos):
+            if shared[i]:
+                relative = os.path.relpath(os.path.abspath(path), root)
+                stems[i] = relative.replace(os.sep, "_").replace(".", "_")
+
+    names = []
+    taken = set(stems)
+    for i, name in enumerate(stems):
+        if name in stems[:i]:
+            n = 2
+            while f"{name}_{n}" in taken:
+                n += 1
+            name = f"{name}_{n}"
+            taken.add(name)
+        names.append(name)
+    return names
+
+def analyze_video(path, exercise_name, engine, recorder=None, smoothing=None,
+                  fps=None, start=None, end=None):
+    """
+    Runs one video through the engine and a fresh exercise instance.
+    Frames with a detected pose are appended to recorder if given.
+    smoothing: optional name from src.filters.FILTERS.
+    fps, start, end: analysis rate and time range, see src.video.VideoSource.
+    Returns (summary dict, trace rows).
+    """
+    analytics = RepAnalytics()
+    exercise = EXERCISES[exercise_name](analytics=analytics)
+    smoother = FILTERS[smoothing]() if smoothing else None
+    engine.reset()
+
+    # Frames are processed before the next is decoded, so one buffer will do
+    source = VideoSource(path, fps, start, end, reuse=True)
+    frames_iter = iter(source)
+
+    trace = []
+    decode_time = inference_time = exercise_time = 0.0
+    frames = detected = 0
+    state = exercise.state
+    started = time.perf_counter()
+
+    try:
+        while True:
+            t0 = time.perf_counter()
+            item = next(frames_iter, None)
+            t1 = time.perf_counter()
+            if item is None:
+                break
+            timestamp, frame = item
+
+            results = engine.process_frame(frame)
+            t2 = time.perf_counter()
+
+            landmarks = LandmarkFrame.from_results(results)
+            if landmarks is not None:
+                if recorder is not None:
+                    recorder.append(timestamp, landmarks)
+                if smoother is not None:
+                    landmarks = smoother(landmarks, timestamp)
+                # Video timestamps drive the hold/relax timers, so analysis
+                # runs at inference speed rather than real time.
+                state, _, _ = exercise.update(landmarks, timestamp)
+                detected += 1
+            t3 = time.perf_counter()
+
+            trace.append((source.position, timestamp, landmarks is not None,
+                          float(exercise.current_angle), state, exercise.reps))
+            frames += 1
+            decode_time += t1 - t0
+            inference_time += t2 - t1
+            exercise_time += t3 - t2
+    finally:
+        source.close()
+
+    total = time.perf_counter() - started
+    summary = {
+        "video": os.path.basename(path),
+        "exercise": exercise_name,
+        "side": exercise.side,
+        "smoothing": smoothing,
+        "reps": exercise.reps,
+        "final_state": exercise.state,
+        "analytics": analytics.summary(),
+        "analysis_fps": fps,
+        "start_s": start,
+        "end_s": end,
+        "frames": frames,
+        "frames_grabbed": source.grabbed,
+        "frames_with_pose": detected,
+        "timings": {
+            "decode_s": decode_time,
+            "inference_s": inference_time,
+            "exercise_s": exercise_time,
+            "total_s": total,
+            "fps": frames / total if total > 0 else 0.0,
+        },
+    }
+    return summary, trace
+
+def write_trace(path, trace):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["frame", "timestamp", "pose", "angle", "state", "reps"])
+        for frame, timestamp, pose, angle, state, reps in trace:
+            writer.writerow([frame, f"{timestamp:.3f}", int(pose), f"{angle:.2f}", state, reps])
+
+def archive_trace(root, patient, summary, trace, recorded_at=None):
+    """
+    Adds an analysed video to the session archive at root. Frames without
+    a pose get a NaN angle. Returns the session id.
+    """
+    archive = SessionArchive(root)
+    with archive.writer(patient, summary["exercise"], side=summary["side"],
+                        recorded_at=recorded_at, video=summary["video"]) as writer:
+        if trace:
+            _, timestamps, pose, angle, states, reps = zip(*trace)
+            angle = np.where(pose, angle, np.nan)
+            writer.extend(timestamps, states, reps, {writer.angles[0]: angle})
+    return writer.id
+
+def process_video(path, exercise_name, out_dir, record=False, smoothing=None,
+                  fps=None, start=None, end=None, archive=None, name=None):
+    """
+    Worker entry point: analyses one video and writes its outputs as
+    <name>.json etc. (default name: the file stem, see output_names).
+    Returns the summary dict.
+    """
+    options = {"smoothing": smoothing, "fps": fps, "start": start, "end": end}
+    stem = name or os.path.splitext(os.path.basename(path))[0]
+    if record:
+        with SessionRecorder(os.path.join(out_dir, f"{stem}.lmk")) as recorder:
+            summary, trace = analyze_video(path, exercise_name, _engine, recorder, **options)
+    else:
+        summary, trace = analyze_video(path, exercise_name, _engine, **options)
+
+    summary["name"] = stem
+    if archive:
+        summary["archive_id"] = archive_trace(archive, stem, summary, trace,
+                                              recorded_at=os.path.getmtime(path))
+    write_trace(os.path.join(out_dir, f"{stem}_trace.csv"), trace)
+    with open(os.path.join(out_dir, f"{stem}.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+def run_batch(videos, exercise_name, out_dir, workers=None, model_complexity=1, record=False,
+              smoothing=None, fps=None, start=None, end=None, archive=None):
+    """
+    Analyses videos across a process pool. Returns the list of summaries
+    (failed videos get an "error" entry instead of results). Outputs are
+    named by output_names(), so videos sharing a stem don't overwrite
+    each other.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    summaries = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(model_complexity,)) as pool:
+        futures = {pool.submit(process_video, path, exercise_name, out_dir, record, smoothing,
+                               fps, start, end, archive, name): path
+                   for path, name in zip(videos, output_names(videos))}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                summary = future.result()
+                print(f"{summary['video']}: {summary['reps']} reps "
+                      f"({summary['frames']} frames, {summary['timings']['fps']:.1f} fps)")
+            except Exception as e:
+                summary = {"video": os.path.basename(path), "exercise": exercise_name, "error": str(e)}
+                print(f"{summary['video']}: failed: {e}")
+            summaries.append(summary)
+
+    summaries.sort(key=lambda s: s["video"])
+    return summaries
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse a directory of exercise videos.")
+    parser.add_argument("video_dir", help="Directory containing recorded videos")
+    parser.add_argument("--exercise", required=True, choices=sorted(EXERCISES))
+    parser.add_argument("--out", default="batch_results", help="Output directory")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Worker processes (default: all cores)")
+    parser.add_argument("--model-complexity", type=int, default=1, choices=[0, 1, 2])
+    parser.add_argument("--record", action="store_true",
+                        help="Also save each landmark stream as <name>.lmk")
+    parser.add_argument("--smooth", choices=sorted(FILTERS),
+                        help="Smooth landmarks before scoring")
+    parser.add_argument("--fps", type=float,
+                        help="Analysis rate; frames in between are skipped without decoding")
+    parser.add_argument("--start", type=float, help="Start of the segment to analyse (seconds)")
+    parser.add_argument("--end", type=float, help="End of the segment to analyse (seconds)")
+    parser.add_argument("--archive", help="Also add each session to this archive directory")
+    args = parser.parse_args(argv)
+
+    videos = find_videos(args.video_dir)
+    if not videos:
+        parser.error(f"No videos found in {args.video_dir}")
+
+    start = time.perf_counter()
+    summaries = run_batch(videos, args.exercise, args.out, args.workers,
+                          args.model_complexity, args.record, args.smooth,
+                          args.fps, args.start, args.end, args.archive)
+    elapsed = time.perf_counter() - start
+
+    with open(os.path.join(args.out, "summary.json"), "w") as f:
+        json.dump({"exercise": args.exercise, "workers": args.workers,
+                   "elapsed_s": elapsed, "videos": summaries}, f, indent=2)
+    print(f"Analysed {len(videos)} videos in {elapsed:.1f}s with {args.workers} workers.")
+
+if __name__ == "__main__":
+    main()
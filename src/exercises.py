@@ -1,10 +1,25 @@
-from datetime import datetime
-import numpy as np
-from .geometry import calculate_angle, get_landmark_coords, get_landmark_visibility
+import time
+from .geometry import batch_angles
+from .landmarks import as_landmark_frame
+from .protocol import SETUP_FAIL_FEEDBACK, SETUP_HOLD_FEEDBACK, SIDE_LANDMARKS, Protocol
+
+# (hip, knee, ankle) landmark indices per side
+LEG_LANDMARKS = {"LEFT": (23, 25, 27), "RIGHT": (24, 26, 28)}
+SHOULDER_LANDMARK = {"LEFT": 11, "RIGHT": 12}
 
 class Exercise:
-    def __init__(self, name):
+    def __init__(self, name, clock=None, metrics=None, analytics=None):
+        """
+        clock: zero-argument callable returning seconds (default: time.monotonic).
+        Timers use per-frame timestamps passed to update() when given,
+        and fall back to the clock otherwise.
+        metrics: optional src.metrics.Metrics for per-stage update timings.
+        analytics: optional src.analytics.RepAnalytics fed after every update.
+        """
         self.name = name
+        self.clock = clock if clock is not None else time.monotonic
+        self.metrics = metrics
+        self.analytics = analytics
         self.state = "SETUP" # SETUP, START, MOVEMENT, HOLD, REST/RELAX
         self.reps = 0
         self.hold_start_time = None
@@ -14,6 +29,8 @@ class Exercise:
         self.current_angle = 0.0
         self.side = "RIGHT" 
         self.auto_side = True # Enable auto-detection by default
+        # (left, right) leg visibility shared by MultiExerciseEvaluator for this step
+        self._leg_visibility = None
 
     def toggle_side(self):
         """
@@ -31,24 +48,36 @@ class Exercise:
         if not self.auto_side:
             return self.side
 
-        # Left: 23, 25, 27. Right: 24, 26, 28
-        left_vis = sum([get_landmark_visibility(landmarks, i) for i in [23, 25, 27]])
-        right_vis = sum([get_landmark_visibility(landmarks, i) for i in [24, 26, 28]])
+        if self._leg_visibility is not None:
+            left_vis, right_vis = self._leg_visibility
+        else:
+            vis = as_landmark_frame(landmarks).visibility
+            left_vis = vis[23] + vis[25] + vis[27]
+            right_vis = vis[24] + vis[26] + vis[28]
         
         return "LEFT" if left_vis > right_vis else "RIGHT"
 
     def get_leg_landmarks(self, landmarks):
         """
-        Returns (hip, knee, ankle) coordinates for the active side.
+        Returns (hip, knee, ankle) coordinates for the active side
+        as views into the landmark frame.
         """
-        if self.side == "LEFT":
-            return (get_landmark_coords(landmarks, 23),
-                    get_landmark_coords(landmarks, 25),
-                    get_landmark_coords(landmarks, 27))
-        else:
-            return (get_landmark_coords(landmarks, 24),
-                    get_landmark_coords(landmarks, 26),
-                    get_landmark_coords(landmarks, 28))
+        frame = as_landmark_frame(landmarks)
+        hip, knee, ankle = LEG_LANDMARKS[self.side]
+        return frame.coords(hip), frame.coords(knee), frame.coords(ankle)
+
+    def leg_missing(self, landmarks):
+        """
+        True if any of the active side's hip, knee or ankle is missing.
+        """
+        frame = as_landmark_frame(landmarks)
+        return any(frame.is_missing(i) for i in LEG_LANDMARKS[self.side])
+
+    def now(self, timestamp=None):
+        """
+        Returns the time (seconds) used for timers on this update.
+        """
+        return self.clock() if timestamp is None else timestamp
 
     def check_setup(self, landmarks):
         """
@@ -57,368 +86,341 @@ class Exercise:
         """
         return True, "Ready"
 
-    def update(self, landmarks):
+    def measure(self, landmarks):
         """
-        Input: landmarks (MediaPipe)
-        Returns: current_state, feedback, reps
+        Computes the joint angle(s) the exercise needs from a LandmarkFrame.
         """
         raise NotImplementedError
 
-class QuadricepsSet(Exercise):
-    def __init__(self):
-        super().__init__("Quadriceps Set")
-        self.hold_duration = 5.0 
-        self.relax_duration = 3.0
-        self.setup_duration = 3.0
-        self.target_knee_angle = 170.0 
+    def step(self, landmarks, angles, now):
+        """
+        Advances the state machine given the output of measure().
+        """
+        raise NotImplementedError
 
-    def check_setup(self, landmarks):
-        self.side = self.detect_active_side(landmarks)
-        hip, knee, ankle = self.get_leg_landmarks(landmarks)
-        
-        if hip == [0,0,0] or knee == [0,0,0] or ankle == [0,0,0]:
-            return False, f"Ensure full {self.side} leg is visible."
-            
-        angle = calculate_angle(hip, knee, ankle)
-        if angle < 140:
-             return False, f"Straighten {self.side} leg on floor/bed."
-             
-        return True, f"Hold {self.side} leg still..."
-
-    def update(self, landmarks):
-        hip, knee, ankle = self.get_leg_landmarks(landmarks)
-        
-        angle = calculate_angle(hip, knee, ankle)
-        self.current_angle = angle
-        
-        if self.state == "SETUP":
-            is_valid, msg = self.check_setup(landmarks)
-            if is_valid:
-                if self.setup_start_time is None:
-                    self.setup_start_time = datetime.now()
-                
-                elapsed = (datetime.now() - self.setup_start_time).total_seconds()
-                if elapsed >= self.setup_duration:
-                    self.state = "START"
-                    self.feedback = f"Started! Straighten {self.side} leg."
-                    self.auto_side = False # Lock side when starting
-                else:
-                    self.feedback = f"Hold {self.side}... {int(self.setup_duration - elapsed)}"
-            else:
-                self.setup_start_time = None
-                self.feedback = f"Setup ({self.side}): {msg}"
-        
-        elif self.state == "START":
-            if angle > self.target_knee_angle:
-                self.state = "HOLD"
-                self.hold_start_time = datetime.now()
-                self.feedback = "Hold it! Tighten quads!"
-            else:
-                self.feedback = "Straighten your leg completely."
-        
-        elif self.state == "HOLD":
-            if angle < (self.target_knee_angle - 10):
-                self.state = "START" 
-                self.feedback = "Knee bent! Restart rep."
-                self.hold_start_time = None
-            else:
-                elapsed = (datetime.now() - self.hold_start_time).total_seconds()
-                if elapsed >= self.hold_duration:
-                    self.reps += 1
-                    self.state = "RELAX"
-                    self.relax_start_time = datetime.now()
-                    self.feedback = "Relax leg."
-                else:
-                    self.feedback = f"Holding... {int(self.hold_duration - elapsed)}"
+    def update(self, landmarks, timestamp=None):
+        """
+        Input: landmarks (LandmarkFrame or MediaPipe landmark list),
+               optional frame timestamp in seconds (e.g. video position)
+        Returns: current_state, feedback, reps
+        """
+        metrics = self.metrics
+        if metrics is None:
+            now = self.now(timestamp)
+            landmarks = as_landmark_frame(landmarks)
+            return self.advance(landmarks, self.measure(landmarks), now)
 
-        elif self.state == "RELAX":
-            elapsed = (datetime.now() - self.relax_start_time).total_seconds()
-            if elapsed >= self.relax_duration:
-                self.state = "START"
-                self.feedback = "Ready for next rep."
-            else:
-                self.feedback = f"Relaxing... {int(self.relax_duration - elapsed)}"
+        t0 = time.perf_counter()
+        now = self.now(timestamp)
+        landmarks = as_landmark_frame(landmarks)
+        t1 = time.perf_counter()
+        angles = self.measure(landmarks)
+        t2 = time.perf_counter()
+        metrics.observe("exercise.extract", t1 - t0)
+        metrics.observe("exercise.angles", t2 - t1)
+        return self.advance(landmarks, angles, now)
 
+    def advance(self, landmarks, angles, now, leg_visibility=None):
+        """
+        Steps the state machine on already computed features, then runs
+        after_step(). update() and MultiExerciseEvaluator both go through
+        here. leg_visibility: optional (left, right) summed hip, knee and
+        ankle visibility, used instead of reading it from landmarks.
+        Returns: current_state, feedback, reps
+        """
+        metrics = self.metrics
+        if metrics is not None:
+            t0 = time.perf_counter()
+        self._leg_visibility = leg_visibility
+        try:
+            self.step(landmarks, angles, now)
+        finally:
+            self._leg_visibility = None
+        if metrics is not None:
+            metrics.observe("exercise.transitions", time.perf_counter() - t0)
+        self.after_step(now)
         return self.state, self.feedback, self.reps
 
-class StraightLegRaise(Exercise):
-    def __init__(self):
-        super().__init__("Straight Leg Raise")
-        self.hold_duration = 3.0
-        self.relax_duration = 3.0
-        self.setup_duration = 3.0
-        self.min_hip_flexion = 15.0
-        self.relax_start_time = None
+    def after_step(self, now):
+        """
+        Called once per frame after the state machine has stepped; feeds
+        analytics.
+        """
+        if self.analytics is not None:
+            self.analytics.observe(now, self.state, self.reps, self.current_angle)
 
-    def check_setup(self, landmarks):
+class ProtocolExercise(Exercise):
+    """
+    Exercise driven by a declarative spec (see src/protocol.py).
+    Subclasses set `spec`; keyword arguments override spec["params"],
+    e.g. QuadricepsSet(hold_duration=10.0).
+    """
+    spec = None
+    _compiled = {}
+
+    def __init__(self, clock=None, metrics=None, analytics=None, **params):
+        super().__init__(self.spec["name"], clock, metrics, analytics)
+        self.protocol = self.compile(**params)
+        self.params = self.protocol.params
+        self.setup_duration = self.protocol.setup_duration
+        self.state_start_time = None
+        self._feedback_key = None
+
+    @classmethod
+    def compile(cls, **params):
+        """
+        Returns the Protocol for this spec and params, compiled once per process.
+        """
+        merged = dict(cls.spec["params"])
+        unknown = set(params) - set(merged)
+        if unknown:
+            raise TypeError(f"unknown parameters for {cls.spec['name']}: {sorted(unknown)}")
+        merged.update(params)
+        for name, (base, offset) in cls.spec.get("derived", {}).items():
+            if merged[name] is None:
+                merged[name] = merged[base] + offset
+        key = (cls.spec["name"], tuple(sorted(merged.items())))
+        protocol = ProtocolExercise._compiled.get(key)
+        if protocol is None:
+            protocol = ProtocolExercise._compiled[key] = Protocol(cls.spec, merged)
+        return protocol
+
+    def check_setup(self, landmarks, angles=None):
+        """
+        Detects the active side and validates the starting pose.
+        Returns: True/False, feedback_string
+        """
+        landmarks = as_landmark_frame(landmarks)
+        side = self.side
         self.side = self.detect_active_side(landmarks)
-        # Need Shoulder, Hip, Knee, Ankle
-        shoulder_idx = 11 if self.side == "LEFT" else 12
-        if get_landmark_coords(landmarks, shoulder_idx) == [0,0,0]:
-             return False, "Show upper body."
-        
-        shoulder = get_landmark_coords(landmarks, shoulder_idx)
-        hip, knee, ankle = self.get_leg_landmarks(landmarks)
-        
-        hip_angle = calculate_angle(shoulder, hip, knee)
-        
-        if hip_angle < 150:
-             return False, "Lie flat on back."
-        
-        return True, f"Hold {self.side} leg still..."
+        if angles is None or self.side != side:
+            angles = self.measure(landmarks)
+
+        for check, test, message in self.protocol.setup:
+            if test is None:
+                index = SIDE_LANDMARKS[self.side]
+                if any(landmarks.is_missing(index[name]) for name in check[1]):
+                    return False, message.format(side=self.side)
+            elif not test(angles, 0.0):
+                return False, message.format(side=self.side)
+        return True, "Ready"
+
+    def measure(self, landmarks):
+        return batch_angles(landmarks.data[self.protocol.joint_index[self.side], :2])
+
+    def _set_feedback(self, template, key, **values):
+        # Only format when the displayed values change
+        if key != self._feedback_key:
+            self._feedback_key = key
+            self.feedback = template.format(side=self.side, **values)
+
+    def _enter(self, state, now):
+        self.state = state
+        self.state_start_time = now
+        if state == "HOLD":
+            self.hold_start_time = now
+        elif state == "RELAX":
+            self.relax_start_time = now
+
+    def step(self, landmarks, angles, now):
+        protocol = self.protocol
+        self.current_angle = angles[protocol.primary]
 
-    def update(self, landmarks):
-        shoulder_idx = 11 if self.side == "LEFT" else 12
-        shoulder = get_landmark_coords(landmarks, shoulder_idx)
-        hip, knee, ankle = self.get_leg_landmarks(landmarks)
-        
-        hip_angle = calculate_angle(shoulder, hip, knee)
-        knee_angle = calculate_angle(hip, knee, ankle)
-        
-        self.current_angle = hip_angle
-        
         if self.state == "SETUP":
-             is_valid, msg = self.check_setup(landmarks)
-             if is_valid:
+            is_valid, msg = self.check_setup(landmarks, angles)
+            if is_valid:
                 if self.setup_start_time is None:
-                    self.setup_start_time = datetime.now()
-                elapsed = (datetime.now() - self.setup_start_time).total_seconds()
-                if elapsed >= self.setup_duration:
-                    self.state = "START"
-                    self.feedback = f"Start! Lift {self.side} leg."
-                    self.auto_side = False # Lock side
-                else:
-                    self.feedback = f"Hold {self.side}... {int(self.setup_duration - elapsed)}"
-             else:
-                self.setup_start_time = None
-                self.feedback = f"Setup ({self.side}): {msg}"
-
-        elif self.state == "START":
-            if knee_angle > 170 and hip_angle < (180 - self.min_hip_flexion):
-                self.state = "HOLD"
-                self.hold_start_time = datetime.now()
-                self.feedback = "Hold!"
-            elif knee_angle < 160:
-                self.feedback = "Keep knee straight."
-            else:
-                self.feedback = "Lift your leg."
-
-        elif self.state == "HOLD":
-            elapsed = (datetime.now() - self.hold_start_time).total_seconds()
-            if hip_angle > (180 - self.min_hip_flexion + 5) or knee_angle < 160:
-                 self.state = "START"
-                 self.feedback = "Leg dropped or knee bent."
-            elif elapsed >= self.hold_duration:
-                self.reps += 1
-                self.state = "RELAX"
-                self.relax_start_time = datetime.now()
-                self.feedback = "Lower leg slowly."
-            else:
-                self.feedback = f"Holding... {int(self.hold_duration - elapsed)}"
-
-        elif self.state == "RELAX":
-            elapsed = (datetime.now() - self.relax_start_time).total_seconds()
-            if elapsed >= self.relax_duration:
-                if hip_angle > 170:
-                    self.state = "START"
-                    self.feedback = "Ready."
+                    self.setup_start_time = now
+                elapsed = now - self.setup_start_time
+                if elapsed >= protocol.setup_duration:
+                    self._enter("START", now)
+                    self._set_feedback(protocol.start_feedback, ("start", self.side))
+                    self.auto_side = False # Lock side when starting
                 else:
-                    self.feedback = "Lower leg completely."
+                    remaining = int(protocol.setup_duration - elapsed)
+                    self._set_feedback(SETUP_HOLD_FEEDBACK, ("hold", self.side, remaining),
+                                       remaining=remaining)
             else:
-                 self.feedback = f"Relaxing... {int(self.relax_duration - elapsed)}"
+                self.setup_start_time = None
+                self._set_feedback(SETUP_FAIL_FEEDBACK, ("fail", self.side, msg), message=msg)
+            return
 
-        return self.state, self.feedback, self.reps
-    
-class HeelSlide(Exercise):
-    def __init__(self):
-        super().__init__("Heel Slide")
-        self.min_knee_flexion = 45.0
-        self.setup_duration = 3.0
-        self.setup_start_time = None
-    
-    def check_setup(self, landmarks):
-         self.side = self.detect_active_side(landmarks)
-         hip, knee, ankle = self.get_leg_landmarks(landmarks)
-         
-         if knee == [0,0,0]: return False, f"Show {self.side} leg"
-         
-         angle = calculate_angle(hip, knee, ankle)
-         if angle < 140: return False, "Lie down, leg straight."
-         return True, f"Hold {self.side} leg still..."
-
-    def update(self, landmarks):
-        hip, knee, ankle = self.get_leg_landmarks(landmarks)
-        
-        knee_angle = calculate_angle(hip, knee, ankle)
-        self.current_angle = knee_angle
-        
-        if self.state == "SETUP":
-             is_valid, msg = self.check_setup(landmarks)
-             if is_valid:
-                if self.setup_start_time is None:
-                    self.setup_start_time = datetime.now()
-                elapsed = (datetime.now() - self.setup_start_time).total_seconds()
-                if elapsed >= self.setup_duration:
-                    self.state = "START"
-                    self.feedback = "Go: Slide heel."
-                    self.auto_side = False # Lock side
+        state = protocol.states[self.state]
+        elapsed = 0.0 if self.state_start_time is None else now - self.state_start_time
+        for rule in state.rules:
+            if not rule.test(angles, elapsed):
+                continue
+            if rule.target is not None:
+                self.reps += rule.reps
+                self._enter(rule.target, now)
+            if rule.feedback is not None:
+                if rule.fields:
+                    remaining = int(state.duration - elapsed) if "remaining" in rule.fields else None
+                    shown = int(elapsed) if "elapsed" in rule.fields else None
+                    self._set_feedback(rule.feedback, (rule, remaining, shown),
+                                       remaining=remaining, elapsed=shown)
                 else:
-                    self.feedback = f"Hold {self.side}... {int(self.setup_duration - elapsed)}"
-             else:
-                self.setup_start_time = None
-                self.feedback = f"Setup ({self.side}): {msg}"
-        
-        elif self.state == "START":
-            if knee_angle > 160:
-                self.feedback = "Slide heel towards hip."
-            elif knee_angle < 150:
-                 self.state = "MOVEMENT"
-                 self.feedback = "Keep sliding."
-            else:
-                self.feedback = "Ready."
-
-        elif self.state == "MOVEMENT":
-            if knee_angle < self.min_knee_flexion: 
-                 self.state = "HOLD" 
-                 self.feedback = "Good bend! Return."
-            elif knee_angle > 160:
-                 self.state = "START"
-                 self.feedback = "Try to bend more next time." 
-
-        elif self.state == "HOLD":
-             self.state = "RETURN"
-             self.feedback = "Slide back."
-
-        elif self.state == "RETURN":
-            if knee_angle > 170:
-                self.reps += 1
-                self.state = "START"
-                self.feedback = "Rep complete."
-        
-        return self.state, self.feedback, self.reps
+                    self.feedback = rule.feedback
+                    self._feedback_key = None
+            break
 
-class WallSquat(Exercise):
-    def __init__(self):
-        super().__init__("Wall Squat")
-        self.hold_duration = 5.0
-        self.setup_duration = 3.0
-        self.target_knee_angle = 90.0 
-        self.setup_start_time = None
-        
-    def check_setup(self, landmarks):
-        self.side = self.detect_active_side(landmarks)
-        hip, knee, ankle = self.get_leg_landmarks(landmarks)
-        
-        angle = calculate_angle(hip, knee, ankle)
-        
-        if angle < 160: return False, "Stand up straight."
-        return True, "Hold still..."
+ALWAYS = ("always",)
+TIMER = ("timer",)
 
-    def update(self, landmarks):
-        hip, knee, ankle = self.get_leg_landmarks(landmarks)
-        
-        knee_angle = calculate_angle(hip, knee, ankle)
-        self.current_angle = knee_angle
-        
-        if self.state == "SETUP":
-             is_valid, msg = self.check_setup(landmarks)
-             if is_valid:
-                if self.setup_start_time is None:
-                    self.setup_start_time = datetime.now()
-                elapsed = (datetime.now() - self.setup_start_time).total_seconds()
-                if elapsed >= self.setup_duration:
-                    self.state = "START"
-                    self.feedback = "Go: Lean & Squat."
-                    self.auto_side = False 
-                else:
-                    self.feedback = f"Hold {self.side}... {int(self.setup_duration - elapsed)}"
-             else:
-                self.setup_start_time = None
-                self.feedback = f"Setup ({self.side}): {msg}"
+class QuadricepsSet(ProtocolExercise):
+    spec = {
+        "name": "Quadriceps Set",
+        "angles": ("knee",),
+        "params": {"hold_duration": 5.0, "relax_duration": 3.0, "setup_duration": 3.0,
+                   "target_knee_angle": 170.0, "bent_knee_angle": None},
+        # A rep restarts once the knee bends 10 degrees short of the target
+        "derived": {"bent_knee_angle": ("target_knee_angle", -10.0)},
+        "setup": [
+            (("visible", ("hip", "knee", "ankle")), "Ensure full {side} leg is visible."),
+            (("knee", ">=", 140.0), "Straighten {side} leg on floor/bed."),
+        ],
+        "setup_duration": "setup_duration",
+        "start_feedback": "Started! Straighten {side} leg.",
+        "states": {
+            "START": {"rules": [
+                (("knee", ">", "target_knee_angle"), "HOLD", 0, "Hold it! Tighten quads!"),
+                (ALWAYS, None, 0, "Straighten your leg completely."),
+            ]},
+            "HOLD": {"duration": "hold_duration", "rules": [
+                (("knee", "<", "bent_knee_angle"), "START", 0, "Knee bent! Restart rep."),
+                (TIMER, "RELAX", 1, "Relax leg."),
+                (ALWAYS, None, 0, "Holding... {remaining}"),
+            ]},
+            "RELAX": {"duration": "relax_duration", "rules": [
+                (TIMER, "START", 0, "Ready for next rep."),
+                (ALWAYS, None, 0, "Relaxing... {remaining}"),
+            ]},
+        },
+    }
 
-        elif self.state == "START":
-            if knee_angle < 170:
-                self.state = "MOVEMENT"
-                self.feedback = "Lower down."
-            else:
-                self.feedback = "Lean against wall."
-                
-        elif self.state == "MOVEMENT":
-            if knee_angle <= 100: 
-                self.state = "HOLD"
-                self.hold_start_time = datetime.now()
-                self.feedback = "Hold!"
-            elif knee_angle > 175:
-                self.state = "START"
-                
-        elif self.state == "HOLD":
-             elapsed = (datetime.now() - self.hold_start_time).total_seconds()
-             if knee_angle > 130: 
-                 self.state = "START"
-                 self.feedback = "Stood up too soon."
-             elif elapsed >= self.hold_duration:
-                 self.state = "RETURN"
-                 self.feedback = "Stand up."
-             else:
-                 self.feedback = f"Holding... {int(elapsed)}"
-                 
-        elif self.state == "RETURN":
-            if knee_angle > 170:
-                self.reps += 1
-                self.state = "START"
-                self.feedback = "Rep complete."
+class StraightLegRaise(ProtocolExercise):
+    spec = {
+        "name": "Straight Leg Raise",
+        "angles": ("hip", "knee"),
+        "primary": "hip",
+        # Lifted below 180 - 15 degrees of hip flexion, dropped above 170
+        "params": {"hold_duration": 3.0, "relax_duration": 3.0, "setup_duration": 3.0,
+                   "lifted_hip_angle": 165.0, "dropped_hip_angle": 170.0,
+                   "straight_knee_angle": 170.0, "bent_knee_angle": 160.0},
+        "setup": [
+            (("visible", ("shoulder",)), "Show upper body."),
+            (("hip", ">=", 150.0), "Lie flat on back."),
+        ],
+        "setup_duration": "setup_duration",
+        "start_feedback": "Start! Lift {side} leg.",
+        "states": {
+            "START": {"rules": [
+                (("all", ("knee", ">", "straight_knee_angle"), ("hip", "<", "lifted_hip_angle")),
+                 "HOLD", 0, "Hold!"),
+                (("knee", "<", "bent_knee_angle"), None, 0, "Keep knee straight."),
+                (ALWAYS, None, 0, "Lift your leg."),
+            ]},
+            "HOLD": {"duration": "hold_duration", "rules": [
+                (("any", ("hip", ">", "dropped_hip_angle"), ("knee", "<", "bent_knee_angle")),
+                 "START", 0, "Leg dropped or knee bent."),
+                (TIMER, "RELAX", 1, "Lower leg slowly."),
+                (ALWAYS, None, 0, "Holding... {remaining}"),
+            ]},
+            "RELAX": {"duration": "relax_duration", "rules": [
+                (("all", TIMER, ("hip", ">", 170.0)), "START", 0, "Ready."),
+                (TIMER, None, 0, "Lower leg completely."),
+                (ALWAYS, None, 0, "Relaxing... {remaining}"),
+            ]},
+        },
+    }
 
-        return self.state, self.feedback, self.reps
+class HeelSlide(ProtocolExercise):
+    spec = {
+        "name": "Heel Slide",
+        "angles": ("knee",),
+        "params": {"setup_duration": 3.0, "min_knee_flexion": 45.0},
+        "setup": [
+            (("visible", ("knee",)), "Show {side} leg"),
+            (("knee", ">=", 140.0), "Lie down, leg straight."),
+        ],
+        "setup_duration": "setup_duration",
+        "start_feedback": "Go: Slide heel.",
+        "states": {
+            "START": {"rules": [
+                (("knee", ">", 160.0), None, 0, "Slide heel towards hip."),
+                (("knee", "<", 150.0), "MOVEMENT", 0, "Keep sliding."),
+                (ALWAYS, None, 0, "Ready."),
+            ]},
+            "MOVEMENT": {"rules": [
+                (("knee", "<", "min_knee_flexion"), "HOLD", 0, "Good bend! Return."),
+                (("knee", ">", 160.0), "START", 0, "Try to bend more next time."),
+            ]},
+            "HOLD": {"rules": [
+                (ALWAYS, "RETURN", 0, "Slide back."),
+            ]},
+            "RETURN": {"rules": [
+                (("knee", ">", 170.0), "START", 1, "Rep complete."),
+            ]},
+        },
+    }
 
-class KneeExtensionROM(Exercise):
-    def __init__(self):
-        super().__init__("Knee Extension ROM")
-        self.target_angle = 180.0
-        self.setup_start_time = None
-        self.setup_duration = 3.0
+class WallSquat(ProtocolExercise):
+    spec = {
+        "name": "Wall Squat",
+        "angles": ("knee",),
+        "params": {"hold_duration": 5.0, "setup_duration": 3.0, "squat_knee_angle": 100.0},
+        "setup": [
+            (("knee", ">=", 160.0), "Stand up straight."),
+        ],
+        "setup_duration": "setup_duration",
+        "start_feedback": "Go: Lean & Squat.",
+        "states": {
+            "START": {"rules": [
+                (("knee", "<", 170.0), "MOVEMENT", 0, "Lower down."),
+                (ALWAYS, None, 0, "Lean against wall."),
+            ]},
+            "MOVEMENT": {"rules": [
+                (("knee", "<=", "squat_knee_angle"), "HOLD", 0, "Hold!"),
+                (("knee", ">", 175.0), "START", 0, None),
+            ]},
+            "HOLD": {"duration": "hold_duration", "rules": [
+                (("knee", ">", 130.0), "START", 0, "Stood up too soon."),
+                (TIMER, "RETURN", 0, "Stand up."),
+                (ALWAYS, None, 0, "Holding... {elapsed}"),
+            ]},
+            "RETURN": {"rules": [
+                (("knee", ">", 170.0), "START", 1, "Rep complete."),
+            ]},
+        },
+    }
 
-    def check_setup(self, landmarks):
-         # Knee bent to start (e.g. sitting or heel slide pos)
-        self.side = self.detect_active_side(landmarks)
-        hip, knee, ankle = self.get_leg_landmarks(landmarks)
-        
-        angle = calculate_angle(hip, knee, ankle)
-        if angle > 160: return False, "Sit down, knee bent."
-        return True, f"Hold {self.side} leg still..."
-        
-    def update(self, landmarks):
-        hip, knee, ankle = self.get_leg_landmarks(landmarks)
-        
-        angle = calculate_angle(hip, knee, ankle)
-        self.current_angle = angle
-        
-        if self.state == "SETUP":
-             is_valid, msg = self.check_setup(landmarks)
-             if is_valid:
-                if self.setup_start_time is None:
-                    self.setup_start_time = datetime.now()
-                elapsed = (datetime.now() - self.setup_start_time).total_seconds()
-                if elapsed >= self.setup_duration:
-                    self.state = "START"
-                    self.feedback = "Go: Straighten knee."
-                    self.auto_side = False
-                else:
-                    self.feedback = f"Hold {self.side}... {int(self.setup_duration - elapsed)}"
-             else:
-                self.setup_start_time = None
-                self.feedback = f"Setup ({self.side}): {msg}"
+class KneeExtensionROM(ProtocolExercise):
+    spec = {
+        "name": "Knee Extension ROM",
+        "angles": ("knee",),
+        "params": {"setup_duration": 3.0, "extended_knee_angle": 175.0},
+        "setup": [
+            # Knee bent to start (e.g. sitting or heel slide pos)
+            (("knee", "<=", 160.0), "Sit down, knee bent."),
+        ],
+        "setup_duration": "setup_duration",
+        "start_feedback": "Go: Straighten knee.",
+        "states": {
+            "START": {"rules": [
+                (("knee", "<", 140.0), "MOVEMENT", 0, "Straighten your knee."),
+                (ALWAYS, None, 0, "Bend knee to start."),
+            ]},
+            "MOVEMENT": {"rules": [
+                (("knee", ">", "extended_knee_angle"), "START", 1, "Fully extended! Relax."),
+            ]},
+        },
+    }
 
-        elif self.state == "START":
-            if angle < 140:
-                self.state = "MOVEMENT"
-                self.feedback = "Straighten your knee."
-            else:
-                 self.feedback = "Bend knee to start."
-
-        elif self.state == "MOVEMENT":
-            if angle > 175:
-                self.reps += 1
-                self.state = "START" 
-                self.feedback = "Fully extended! Relax."
-                
-        return self.state, self.feedback, self.reps
+# Exercise classes by command-line name
+EXERCISES = {
+    "quadriceps_set": QuadricepsSet,
+    "straight_leg_raise": StraightLegRaise,
+    "heel_slide": HeelSlide,
+    "wall_squat": WallSquat,
+    "knee_extension_rom": KneeExtensionROM,
+}
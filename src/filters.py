@@ -0,0 +1,244 @@
+"""
+Streaming smoothing filters for landmark frames.
+
+Each filter keeps per-coordinate state for the (33, 3) xyz block in
+preallocated arrays and updates it in place, so filtering a frame costs the
+same whatever the session length and allocates no new arrays.
+
+Live, after PoseEngine.process_frame:
+
+    smoother = OneEuroFilter()
+    landmarks = LandmarkFrame.from_results(results)
+    if landmarks is not None:
+        exercise.update(smoother(landmarks, timestamp), timestamp)
+
+Batch, over a recorded session (e.g. SessionReplay.timestamps()/landmarks()):
+
+    smoothed = OneEuroFilter().apply(timestamps, landmarks)
+
+Missing landmarks (all-zero coordinates) leave the state untouched and stay
+missing in the output. Visibility is passed through unchanged.
+"""
+import math
+
+import numpy as np
+
+from .landmarks import NUM_LANDMARKS, LandmarkFrame, as_landmark_frame
+
+class LandmarkFilter:
+    """
+    Base class. `fps` sets the frame interval assumed when no timestamp
+    is given. Calling the filter returns a LandmarkFrame view of `out`
+    (an internal buffer, overwritten on the next call, unless given).
+    """
+    def __init__(self, fps=30.0):
+        self.default_dt = 1.0 / fps
+        shape = (NUM_LANDMARKS, 3)
+        self.value = np.zeros(shape, dtype=np.float32)
+        self._scratch = np.zeros(shape, dtype=np.float32)
+        self._present = np.zeros(NUM_LANDMARKS, dtype=bool)
+        self._new = np.zeros(NUM_LANDMARKS, dtype=bool)
+        self._active = np.zeros(NUM_LANDMARKS, dtype=bool)
+        self._seen = np.zeros(NUM_LANDMARKS, dtype=bool)
+        self._out = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+        self._last_time = None
+
+    def reset(self):
+        self._seen[:] = False
+        self._last_time = None
+
+    def _dt(self, timestamp):
+        if timestamp is None:
+            return self.default_dt
+        dt = self.default_dt if self._last_time is None else timestamp - self._last_time
+        self._last_time = timestamp
+        # Repeated or out-of-order timestamps fall back to the nominal rate
+        return dt if dt > 0 else self.default_dt
+
+    def _init_rows(self, x, rows):
+        """
+        Starts the state of landmarks seen for the first time at x.
+        """
+        np.copyto(self.value, x, where=rows[:, None])
+
+    def _update(self, x, dt, rows):
+        """
+        Advances the state towards measurement x for the given rows.
+        """
+        raise NotImplementedError
+
+    def __call__(self, landmarks, timestamp=None, out=None):
+        data = as_landmark_frame(landmarks).data
+        x = data[:, :3]
+        dt = self._dt(timestamp)
+
+        present = self._present
+        np.any(x, axis=1, out=present)
+        np.logical_not(self._seen, out=self._new)
+        np.logical_and(self._new, present, out=self._new)
+        np.logical_and(present, self._seen, out=self._active)
+
+        self._init_rows(x, self._new)
+        if self._active.any():
+            self._update(x, dt, self._active)
+        np.logical_or(self._seen, present, out=self._seen)
+
+        if out is None:
+            out = self._out
+        np.multiply(self.value, present[:, None], out=out[:, :3])
+        out[:, 3] = data[:, 3]
+        return LandmarkFrame(out)
+
+    def apply(self, timestamps, landmarks, out=None):
+        """
+        Filters a whole (T, 33, 4) session from a fresh state.
+        Returns a new (T, 33, 4) float32 array unless out is given.
+        """
+        landmarks = np.asarray(landmarks)
+        if out is None:
+            out = np.empty(landmarks.shape[:1] + (NUM_LANDMARKS, 4), dtype=np.float32)
+        self.reset()
+        for i in range(len(landmarks)):
+            self(landmarks[i], float(timestamps[i]), out=out[i])
+        return out
+
+class ExponentialFilter(LandmarkFilter):
+    """
+    First-order low-pass: value += alpha * (x - value).
+    alpha is the weight of the newest sample at the nominal frame rate and
+    is adjusted for irregular frame intervals.
+    """
+    def __init__(self, alpha=0.5, fps=30.0):
+        super().__init__(fps)
+        self.alpha = alpha
+        # Equivalent time constant, so alpha scales with dt
+        self._tau = self.default_dt * (1.0 - alpha) / alpha
+
+    def _update(self, x, dt, rows):
+        alpha = dt / (dt + self._tau)
+        np.subtract(x, self.value, out=self._scratch)
+        self._scratch *= alpha
+        self._scratch += self.value
+        np.copyto(self.value, self._scratch, where=rows[:, None])
+
+class OneEuroFilter(LandmarkFilter):
+    """
+    One Euro filter (Casiez et al., 2012): a low-pass whose cutoff rises with
+    speed, so slow drift is smoothed hard while fast movement stays responsive.
+    min_cutoff (Hz) sets smoothing at rest, beta how fast the cutoff rises with
+    speed, d_cutoff (Hz) the smoothing of the speed estimate.
+    """
+    def __init__(self, min_cutoff=1.0, beta=0.5, d_cutoff=1.0, fps=30.0):
+        super().__init__(fps)
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        shape = (NUM_LANDMARKS, 3)
+        self.speed = np.zeros(shape, dtype=np.float32)
+        self._cutoff = np.zeros(shape, dtype=np.float32)
+        self._next = np.zeros(shape, dtype=np.float32)
+
+    def _init_rows(self, x, rows):
+        super()._init_rows(x, rows)
+        np.copyto(self.speed, 0.0, where=rows[:, None])
+
+    def _update(self, x, dt, rows):
+        where = rows[:, None]
+        # Smoothed speed
+        np.subtract(x, self.value, out=self._scratch)
+        self._scratch /= dt
+        tau = 1.0 / (2.0 * math.pi * self.d_cutoff)
+        np.subtract(self._scratch, self.speed, out=self._scratch)
+        self._scratch *= dt / (dt + tau)
+        np.add(self.speed, self._scratch, out=self.speed, where=where)
+
+        # Per-coordinate cutoff and alpha = r / (r + 1), r = 2*pi*cutoff*dt
+        np.abs(self.speed, out=self._cutoff)
+        self._cutoff *= self.beta
+        self._cutoff += self.min_cutoff
+        self._cutoff *= 2.0 * math.pi * dt
+        np.add(self._cutoff, 1.0, out=self._scratch)
+        np.divide(self._cutoff, self._scratch, out=self._cutoff)
+
+        np.subtract(x, self.value, out=self._next)
+        self._next *= self._cutoff
+        np.add(self.value, self._next, out=self.value, where=where)
+
+class KalmanFilter(LandmarkFilter):
+    """
+    Constant-velocity Kalman filter run independently on every coordinate.
+    process_noise is the white acceleration spectral density and
+    measurement_noise the variance of a landmark coordinate, both in
+    normalised image units.
+    """
+    def __init__(self, process_noise=1.0, measurement_noise=1e-4, fps=30.0):
+        super().__init__(fps)
+        self.q = process_noise
+        self.r = measurement_noise
+        shape = (NUM_LANDMARKS, 3)
+        self.velocity = np.zeros(shape, dtype=np.float32)
+        # Covariance [[p00, p01], [p01, p11]] per coordinate
+        self.p00 = np.zeros(shape, dtype=np.float32)
+        self.p01 = np.zeros(shape, dtype=np.float32)
+        self.p11 = np.zeros(shape, dtype=np.float32)
+        self._gain0 = np.zeros(shape, dtype=np.float32)
+        self._gain1 = np.zeros(shape, dtype=np.float32)
+        self._tmp = np.zeros(shape, dtype=np.float32)
+        self._state = [np.zeros(shape, dtype=np.float32) for _ in range(5)]
+
+    def _init_rows(self, x, rows):
+        super()._init_rows(x, rows)
+        where = rows[:, None]
+        np.copyto(self.velocity, 0.0, where=where)
+        np.copyto(self.p00, self.r, where=where)
+        np.copyto(self.p01, 0.0, where=where)
+        # Start with a loose velocity prior
+        np.copyto(self.p11, self.r * 100.0, where=where)
+
+    def _update(self, x, dt, rows):
+        pos, vel, p00, p01, p11 = self._state
+        q = self.q
+        k0, k1, y = self._gain0, self._gain1, self._scratch
+
+        # Predict
+        np.multiply(self.velocity, dt, out=pos)
+        pos += self.value
+        np.copyto(vel, self.velocity)
+        np.multiply(self.p11, dt * dt, out=p00)
+        np.multiply(self.p01, 2.0 * dt, out=k0)
+        p00 += k0
+        p00 += self.p00
+        p00 += q * dt ** 3 / 3.0
+        np.multiply(self.p11, dt, out=p01)
+        p01 += self.p01
+        p01 += q * dt * dt / 2.0
+        np.add(self.p11, q * dt, out=p11)
+
+        # Update with the measured position
+        np.add(p00, self.r, out=y)
+        np.divide(p00, y, out=k0)
+        np.divide(p01, y, out=k1)
+        np.subtract(x, pos, out=y)
+        tmp = self._tmp
+        np.multiply(k0, y, out=tmp)
+        pos += tmp
+        np.multiply(k1, y, out=tmp)
+        vel += tmp
+        np.multiply(k1, p01, out=tmp)
+        p11 -= tmp
+        np.multiply(k0, p01, out=tmp)
+        p01 -= tmp
+        np.multiply(k0, p00, out=tmp)
+        p00 -= tmp
+
+        where = rows[:, None]
+        for target, source in zip((self.value, self.velocity, self.p00, self.p01, self.p11),
+                                  self._state):
+            np.copyto(target, source, where=where)
+
+# Filter classes by command-line name
+FILTERS = {
+    "exponential": ExponentialFilter,
+    "one_euro": OneEuroFilter,
+    "kalman": KalmanFilter,
+}
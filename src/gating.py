@@ -0,0 +1,65 @@
+import numpy as np
+
+class MotionGate:
+    """
+    Cheap frame-difference test used to skip pose inference on static frames.
+
+    Each frame is downscaled to a small grayscale thumbnail and compared with
+    the thumbnail of the last frame that was actually inferred (not the
+    previous frame, so slow drift still accumulates into a detectable change).
+    A full inference is forced at least every `max_skip` frames.
+    """
+    def __init__(self, threshold=2.0, max_skip=10, size=(64, 48)):
+        """
+        threshold: mean absolute gray-level difference (0-255) below which
+                   a frame counts as static.
+        max_skip: maximum consecutive frames to skip.
+        size: (width, height) of the comparison thumbnail.
+        """
+        self.threshold = threshold
+        self.max_skip = max_skip
+        self.size = size
+        self.last_score = 0.0
+        self.skipped = 0
+        self.total_skipped = 0
+
+        w, h = size
+        self._small = np.empty((h, w, 3), dtype=np.uint8)
+        self._gray = np.empty((h, w), dtype=np.uint8)
+        self._diff = np.empty((h, w), dtype=np.uint8)
+        self._reference = None
+
+    def reset(self):
+        self._reference = None
+        self.skipped = 0
+
+    def score(self, image):
+        """
+        Mean absolute difference between image and the reference thumbnail.
+        Leaves the new thumbnail in self._gray.
+        """
+        import cv2
+        cv2.resize(image, self.size, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        if self._reference is None:
+            return float("inf")
+        cv2.absdiff(self._gray, self._reference, dst=self._diff)
+        return cv2.mean(self._diff)[0]
+
+    def should_infer(self, image, force=False):
+        """
+        True if the frame needs a full inference (always when force is set).
+        When it does, the frame becomes the new reference.
+        """
+        self.last_score = self.score(image)
+        if not force and self.last_score < self.threshold and self.skipped < self.max_skip:
+            self.skipped += 1
+            self.total_skipped += 1
+            return False
+
+        if self._reference is None:
+            self._reference = self._gray.copy()
+        else:
+            self._reference[:] = self._gray
+        self.skipped = 0
+        return True
@@ -1,5 +1,59 @@
 import numpy as np
 
+# Landmark index triples (first, mid, end) for the joint angles the exercises use.
+# The angle is measured at the mid landmark.
+JOINT_ANGLES = {
+    "LEFT_KNEE": (23, 25, 27),
+    "RIGHT_KNEE": (24, 26, 28),
+    "LEFT_HIP": (11, 23, 25),
+    "RIGHT_HIP": (12, 24, 26),
+}
+
+# Left/right pairs whose midpoints anchor normalize_landmarks
+HIP_LANDMARKS = [23, 24]
+SHOULDER_LANDMARKS = [11, 12]
+
+def calculate_angles(a, b, c):
+    """
+    Vectorized version of calculate_angle.
+    a, b, c are arrays of shape (..., 2) or (..., 3) and broadcast against
+    each other. Only x and y are used, matching calculate_angle.
+    Returns an array of shape (...) with angles in degrees.
+    """
+    a = np.asarray(a)
+    b = np.asarray(b)
+    c = np.asarray(c)
+
+    radians = (np.arctan2(c[..., 1] - b[..., 1], c[..., 0] - b[..., 0])
+               - np.arctan2(a[..., 1] - b[..., 1], a[..., 0] - b[..., 0]))
+    angle = np.abs(np.degrees(radians))
+
+    return np.where(angle > 180.0, 360.0 - angle, angle)
+
+def batch_angles(points):
+    """
+    Calculates angles for a stack of point triples.
+    Input: array of shape (N, 3, 2) or (N, 3, 3), ordered (first, mid, end).
+    Returns: array of shape (N,) with angles in degrees.
+    """
+    points = np.asarray(points)
+    return calculate_angles(points[..., 0, :], points[..., 1, :], points[..., 2, :])
+
+def joint_angles(landmarks, joints=None):
+    """
+    Calculates several joint angles over a landmark array in one pass.
+    Input: array of shape (33, D) or (T, 33, D) with x, y in the first two columns.
+    joints: list of names from JOINT_ANGLES (default: all of them).
+    Returns: array of shape (len(joints),) or (T, len(joints)).
+    """
+    if joints is None:
+        joints = list(JOINT_ANGLES)
+    index = np.array([JOINT_ANGLES[name] for name in joints])
+
+    # (..., J, 3, 2) gather of the x, y columns for every requested triple
+    points = np.asarray(landmarks)[..., index, :2]
+    return batch_angles(points)
+
 def calculate_angle(a, b, c):
     """
     Calculates the angle between three points a, b, and c.
@@ -7,17 +61,7 @@ def calculate_angle(a, b, c):
     The angle is calculated at point b.
     Returns angle in degrees.
     """
-    a = np.array(a) # First
-    b = np.array(b) # Mid
-    c = np.array(c) # End
-    
-    radians = np.arctan2(c[1]-b[1], c[0]-b[0]) - np.arctan2(a[1]-b[1], a[0]-b[0])
-    angle = np.abs(radians*180.0/np.pi)
-    
-    if angle > 180.0:
-        angle = 360-angle
-        
-    return angle
+    return calculate_angles(a, b, c)[()]
 
 def get_landmark_coords(landmarks, landmark_index, width=1, height=1):
     """
@@ -42,12 +86,56 @@ def get_landmark_visibility(landmarks, landmark_index):
     except AttributeError:
         return 0.0
 
-def normalize_landmarks(landmarks):
+def normalize_landmarks(landmarks, rotate=False, out=None):
     """
     Centers the pose at the hip midpoint and normalizes scale.
-    Input: MediaPipe landmarks
-    Output: Normalized numpy array of shape (33, 3)
+    Input: MediaPipe landmarks, a LandmarkFrame, or an array of shape (33, D)
+    or (T, 33, D) with x, y, z in the first three columns.
+    Coordinates are divided by the torso length (hip midpoint to shoulder
+    midpoint, in x-y). With rotate=True the x-y plane is also rotated so the
+    torso points up (-y). Frames with a missing (all-zero) hip or shoulder
+    landmark, or a zero-length torso, are only centered.
+    Output: numpy array of shape (33, 3) or (T, 33, 3), written to out if given
     """
-    # Placeholder for advanced normalization
-    # For now, we often rely on angles which are scale invariant
-    pass
+    if hasattr(landmarks, "landmark"):
+        from .landmarks import LandmarkFrame
+        landmarks = LandmarkFrame.from_landmarks(landmarks)
+    data = np.asarray(getattr(landmarks, "data", landmarks))[..., :3]
+    if out is None:
+        out = np.empty(data.shape, dtype=np.result_type(data.dtype, np.float32))
+
+    hips = data[..., HIP_LANDMARKS, :].mean(axis=-2)
+    torso = data[..., SHOULDER_LANDMARKS, :].mean(axis=-2) - hips
+    length = np.hypot(torso[..., 0], torso[..., 1])
+    # All-zero coordinates mark a missing landmark (LandmarkFrame.is_missing)
+    present = data[..., HIP_LANDMARKS + SHOULDER_LANDMARKS, :].any(axis=-1).all(axis=-1)
+    has_torso = present & (length > 0)
+    scale = np.where(has_torso, length, 1.0)
+
+    if not rotate:
+        np.subtract(data, hips[..., None, :], out=out)
+        out /= scale[..., None, None].astype(out.dtype)
+        return out
+
+    if np.shares_memory(data, out):
+        data = data.copy()
+    # Rotation taking the torso vector (dx, dy) onto (0, -length), folded
+    # into the scale: x' = a*x - b*y, y' = b*x + a*y about the hip midpoint
+    a = np.where(has_torso, -torso[..., 1] / scale ** 2, 1.0)
+    b = np.where(has_torso, -torso[..., 0] / scale ** 2, 0.0)
+    x, y = data[..., 0], data[..., 1]
+    a_col = a[..., None].astype(out.dtype)
+    b_col = b[..., None].astype(out.dtype)
+    # The z column is scratch until it is written last
+    scratch = out[..., 2]
+    np.multiply(y, b_col, out=scratch)
+    np.multiply(x, a_col, out=out[..., 0])
+    out[..., 0] -= scratch
+    np.multiply(x, b_col, out=scratch)
+    np.multiply(y, a_col, out=out[..., 1])
+    out[..., 1] += scratch
+    out[..., 0] -= (a * hips[..., 0] - b * hips[..., 1])[..., None].astype(out.dtype)
+    out[..., 1] -= (b * hips[..., 0] + a * hips[..., 1])[..., None].astype(out.dtype)
+    np.subtract(data[..., 2], hips[..., 2, None], out=scratch)
+    scratch /= scale[..., None].astype(out.dtype)
+    return out
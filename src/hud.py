@@ -0,0 +1,156 @@
+"""
+Cached overlay rendering for the live demo.
+
+Text labels are rasterised once into small pre-composited patches (colour
+premultiplied by coverage, plus an inverse-alpha mask) keyed on their text
+and style. Each frame only blends the cached patches onto the image, so
+cv2.putText runs when a label changes instead of several times per label
+per frame. The header bar is an opaque patch keyed on its width, title and
+rep count and is copied straight into the frame.
+"""
+from collections import OrderedDict
+
+import numpy as np
+
+HEADER_HEIGHT = 80
+HEADER_COLOR = (245, 117, 16)
+WHITE = (255, 255, 255)
+
+class TextPatch:
+    """
+    A rendered label: premultiplied BGR `color`, `inverse` alpha (255 where
+    the frame shows through) and the offset of the patch's top-left corner
+    from the putText origin.
+    """
+    __slots__ = ("color", "inverse", "dx", "dy")
+
+    def __init__(self, color, inverse, dx, dy):
+        self.color = color
+        self.inverse = inverse
+        self.dx = dx
+        self.dy = dy
+
+def render_text(text, color, scale=0.7, thickness=2, outline=None):
+    """
+    Rasterises text (optionally over a thicker outline colour) into a TextPatch.
+    """
+    import cv2
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    outer = thickness + 2 if outline is not None else thickness
+    (tw, th), baseline = cv2.getTextSize(text, font, scale, outer)
+    pad = outer
+    h, w = th + baseline + 2 * pad, tw + 2 * pad
+    origin = (pad, pad + th)
+
+    patch = np.zeros((h, w, 3), dtype=np.uint8)
+    alpha = np.zeros((h, w), dtype=np.uint8)
+    layers = [(color, thickness)]
+    if outline is not None:
+        layers.insert(0, (outline, outer))
+    for layer_color, layer_thickness in layers:
+        # Each layer covers the ones below it, like successive putText calls
+        coverage = np.zeros((h, w), dtype=np.uint8)
+        cv2.putText(coverage, text, origin, font, scale, 255, layer_thickness, cv2.LINE_AA)
+        a = coverage[..., None].astype(np.float32) / 255.0
+        patch[...] = patch * (1.0 - a) + np.array(layer_color, dtype=np.float32) * a
+        np.maximum(alpha, coverage, out=alpha)
+
+    inverse = cv2.cvtColor(255 - alpha, cv2.COLOR_GRAY2BGR)
+    return TextPatch(patch, inverse, -pad, -(pad + th))
+
+def blend(image, patch, x, y):
+    """
+    Composites a TextPatch onto image with its putText origin at (x, y),
+    clipped to the image bounds.
+    """
+    import cv2
+
+    h, w = patch.color.shape[:2]
+    x0, y0 = x + patch.dx, y + patch.dy
+    ih, iw = image.shape[:2]
+    cx0, cy0 = max(x0, 0), max(y0, 0)
+    cx1, cy1 = min(x0 + w, iw), min(y0 + h, ih)
+    if cx0 >= cx1 or cy0 >= cy1:
+        return
+    roi = image[cy0:cy1, cx0:cx1]
+    px, py = cx0 - x0, cy0 - y0
+    inverse = patch.inverse[py:py + cy1 - cy0, px:px + cx1 - cx0]
+    color = patch.color[py:py + cy1 - cy0, px:px + cx1 - cx0]
+    # roi = roi * (1 - alpha) + premultiplied colour, in saturating uint8
+    cv2.multiply(roi, inverse, dst=roi, scale=1.0 / 255.0)
+    cv2.add(roi, color, dst=roi)
+
+class HudRenderer:
+    """
+    Draws the exercise overlay with cached patches.
+    max_patches bounds the text cache; the least recently used label is
+    dropped first (countdowns create a new label every second).
+    """
+    def __init__(self, max_patches=256):
+        self.max_patches = max_patches
+        self._patches = OrderedDict()
+        self._header = None
+        self._header_key = None
+        self.rendered = 0   # patches rasterised so far, for tests/benchmarks
+
+    def patch(self, text, color, scale=0.7, thickness=2, outline=None):
+        key = (text, color, scale, thickness, outline)
+        patch = self._patches.get(key)
+        if patch is None:
+            patch = self._patches[key] = render_text(text, color, scale, thickness, outline)
+            self.rendered += 1
+            if len(self._patches) > self.max_patches:
+                self._patches.popitem(last=False)
+        else:
+            self._patches.move_to_end(key)
+        return patch
+
+    def text(self, image, text, origin, color, scale=0.7, thickness=2, outline=None):
+        blend(image, self.patch(text, color, scale, thickness, outline), *origin)
+
+    def header(self, image, title, reps):
+        """
+        Copies the header bar (title and rep count) over the top of the image.
+        """
+        h, w = image.shape[:2]
+        height = min(HEADER_HEIGHT, h)
+        key = (w, height, title, reps)
+        if key != self._header_key:
+            import cv2
+            font = cv2.FONT_HERSHEY_SIMPLEX
+            bar = np.empty((height, w, 3), dtype=np.uint8)
+            bar[...] = HEADER_COLOR
+            cv2.putText(bar, title, (10, 30), font, 0.8, WHITE, 2, cv2.LINE_AA)
+            cv2.putText(bar, f"Reps: {reps}", (w - 120, 50), font, 1, WHITE, 2, cv2.LINE_AA)
+            self._header, self._header_key = bar, key
+            self.rendered += 1
+        image[:height] = self._header
+
+    def draw_exercise(self, image, title, snapshot):
+        """
+        Demo overlay. snapshot is (state, feedback, reps, angle, side, auto_side)
+        or None when no pose was detected.
+        """
+        if snapshot is None:
+            self.text(image, "No Pose Detected", (10, 50), (0, 0, 255), scale=1)
+            return image
+
+        state, feedback, reps, angle, side, auto_side = snapshot
+        h = image.shape[0]
+        self.header(image, title, reps)
+
+        # Labels with a white outline for readability
+        self.text(image, f"State: {state}", (10, 110),
+                  (0, 255, 0) if state != "SETUP" else (0, 165, 255), outline=WHITE)
+        self.text(image, f"Angle: {int(angle)}", (10, 140), (255, 255, 0), outline=WHITE)
+        side_color = (0, 255, 255) if auto_side else (0, 0, 255)
+        mode_str = "Auto" if auto_side else "Manual"
+        self.text(image, f"Side: {side} ({mode_str})", (10, 170), side_color, outline=WHITE)
+
+        # Feedback (Large and Central if Setup)
+        if state == "SETUP":
+            self.text(image, feedback, (20, h // 2), (0, 0, 255), scale=1)
+            self.text(image, "Press 's' to swap side", (20, h - 30), (200, 200, 200))
+        else:
+            self.text(image, feedback, (10, 210), (255, 0, 0), outline=WHITE)
+        return image
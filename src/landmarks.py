@@ -0,0 +1,77 @@
+import numpy as np
+
+NUM_LANDMARKS = 33
+
+# Columns of a LandmarkFrame row
+X, Y, Z, VISIBILITY = 0, 1, 2, 3
+
+class LandmarkFrame:
+    """
+    One frame of pose landmarks stored as a contiguous float32 (33, 4) array
+    of x, y, z, visibility. Accessors return views into that array, so a frame
+    can wrap a slice of a larger recording or batch without copying.
+    """
+    __slots__ = ("data",)
+
+    def __init__(self, data=None):
+        if data is None:
+            data = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+        self.data = np.asarray(data, dtype=np.float32)
+
+    @classmethod
+    def from_landmarks(cls, landmarks, out=None):
+        """
+        Builds a frame from a MediaPipe NormalizedLandmarkList.
+        Landmarks without a visibility field get 0.0. Objects without
+        a .landmark list give an all-zero frame.
+        If out is given (a float32 (33, 4) array) it is filled in place.
+        """
+        if out is None:
+            out = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+        try:
+            points = landmarks.landmark
+        except AttributeError:
+            out[:] = 0.0
+            return cls(out)
+
+        out[:] = [(lm.x, lm.y, lm.z, getattr(lm, "visibility", 0.0)) for lm in points]
+        return cls(out)
+
+    @classmethod
+    def from_results(cls, results, out=None):
+        """
+        Builds a frame from a PoseEngine.process_frame result.
+        Returns None if no pose was detected.
+        """
+        if not results.pose_landmarks:
+            return None
+        return cls.from_landmarks(results.pose_landmarks, out=out)
+
+    @property
+    def xyz(self):
+        """(33, 3) view of the coordinates."""
+        return self.data[:, :3]
+
+    @property
+    def visibility(self):
+        """(33,) view of the visibility scores."""
+        return self.data[:, VISIBILITY]
+
+    def coords(self, index):
+        """(3,) view of the x, y, z coordinates of one landmark."""
+        return self.data[index, :3]
+
+    def is_missing(self, index):
+        """True if the landmark coordinates are all zero (not provided)."""
+        return not self.data[index, :3].any()
+
+def as_landmark_frame(landmarks):
+    """
+    Returns landmarks as a LandmarkFrame, converting MediaPipe landmark
+    lists and raw (33, 4) arrays. Frames are returned unchanged.
+    """
+    if isinstance(landmarks, LandmarkFrame):
+        return landmarks
+    if isinstance(landmarks, np.ndarray):
+        return LandmarkFrame(landmarks)
+    return LandmarkFrame.from_landmarks(landmarks)
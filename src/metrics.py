@@ -0,0 +1,124 @@
+"""
+Low-overhead latency metrics for the pose pipeline.
+
+Components take an optional Metrics instance (metrics=None by default) and
+only read the clock when one is attached, so instrumentation can stay in
+place on every deployment. Stage names are dotted, e.g. "engine.inference".
+"""
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+class RollingHistogram:
+    """
+    Latency distribution over the most recent `window` samples, kept in a
+    preallocated ring buffer. Totals (count, sum) cover the whole lifetime.
+    """
+    def __init__(self, window=1024):
+        self._values = np.zeros(window, dtype=np.float64)
+        self._index = 0
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self._values[self._index] = value
+        self._index += 1
+        if self._index == len(self._values):
+            self._index = 0
+        self.count += 1
+        self.sum += value
+
+    def window(self):
+        """
+        Samples currently in the window (unordered copy).
+        """
+        return self._values[:min(self.count, len(self._values))].copy()
+
+    def snapshot(self):
+        values = self.window()
+        snapshot = {"count": self.count, "sum": self.sum}
+        if len(values):
+            for q, v in zip(QUANTILES, np.quantile(values, QUANTILES)):
+                snapshot[f"p{round(q * 100)}"] = float(v)
+            snapshot["max"] = float(values.max())
+            snapshot["mean"] = float(values.mean())
+        return snapshot
+
+class Metrics:
+    """
+    Registry of named RollingHistograms with JSON and Prometheus export.
+    Safe to share between threads (e.g. a pipeline's inference and render
+    stages): recording and export hold one lock.
+    """
+    def __init__(self, window=1024, prefix="myphysio"):
+        self.window = window
+        self.prefix = prefix
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name):
+        with self._lock:
+            return self._histogram(name)
+
+    def _histogram(self, name):
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms[name] = RollingHistogram(self.window)
+        return hist
+
+    def observe(self, name, seconds):
+        """
+        Records one duration (seconds) for a stage.
+        """
+        with self._lock:
+            self._histogram(name).observe(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            stages = {name: hist.snapshot() for name, hist in sorted(self.histograms.items())}
+        return {"timestamp": time.time(), "stages": stages}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        """
+        Prometheus text exposition: one summary metric with a stage label.
+        Quantiles cover the rolling window; _sum and _count are lifetime totals.
+        """
+        metric = f"{self.prefix}_stage_seconds"
+        lines = [
+            f"# HELP {metric} Pipeline stage latency in seconds.",
+            f"# TYPE {metric} summary",
+        ]
+        with self._lock:
+            stages = [(name, hist.window(), hist.sum, hist.count)
+                      for name, hist in sorted(self.histograms.items())]
+        for name, values, total, count in stages:
+            if len(values):
+                for q, v in zip(QUANTILES, np.quantile(values, QUANTILES)):
+                    lines.append(f'{metric}{{stage="{name}",quantile="{q}"}} {v:.9f}')
+            lines.append(f'{metric}_sum{{stage="{name}"}} {total:.9f}')
+            lines.append(f'{metric}_count{{stage="{name}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path):
+        _write_atomic(path, self.to_json())
+
+    def write_prometheus(self, path):
+        """
+        Writes the text format, e.g. for node_exporter's textfile collector.
+        """
+        _write_atomic(path, self.to_prometheus())
+
+def _write_atomic(path, text):
+    # Scrapers must never see a half-written file
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
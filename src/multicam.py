@@ -0,0 +1,345 @@
+"""
+Synchronised multi-camera capture with per-view pose inference.
+
+A single side-on camera often hides the far leg, so the active side has to
+be guessed from visibility. MultiCameraRunner reads several cameras or
+video files, groups their frames by timestamp, runs one PoseEngine per view
+in parallel and fuses the per-view landmarks into one LandmarkFrame for the
+Exercise classes:
+
+    views = [CameraView.open(0), CameraView.open(2)]
+    engines = [pool.checkout() for _ in views]
+    runner = MultiCameraRunner(engines, views, process=evaluate)
+    for frames, results, payload in runner:
+        ...
+
+Views run in threads rather than processes: MediaPipe releases the GIL
+while a graph processes a frame, so the views' inferences overlap and a set
+takes about as long as its slowest view, without copying frames between
+processes.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .landmarks import LandmarkFrame, NUM_LANDMARKS, VISIBILITY
+from .pipeline import DropOldestQueue, StageTimer
+
+# End-of-stream marker on the inferred queue
+_STOP = object()
+
+# Landmarks fused as a unit when views are not registered to each other:
+# each group comes from a single view, so the joint angles within it stay
+# those of one camera (mixing coordinates across cameras distorts them)
+FUSION_GROUPS = [
+    list(range(0, 11)),              # face
+    [11, 23, 25, 27, 29, 31],        # left shoulder, hip, knee, ankle, heel, foot
+    [12, 24, 26, 28, 30, 32],        # right shoulder, hip, knee, ankle, heel, foot
+    [13, 15, 17, 19, 21],            # left arm
+    [14, 16, 18, 20, 22],            # right arm
+]
+
+def fuse_landmarks(frames, transforms=None, out=None):
+    """
+    Fuses per-view LandmarkFrames (None for views without a pose) into one.
+    Returns None when no view has a pose.
+
+    Without transforms each FUSION_GROUPS group is taken from the view that
+    sees it best (highest summed visibility). transforms, one 2x3 affine
+    matrix per view (None = identity), map each view's normalized x, y into
+    a common reference; the views are then averaged per landmark, weighted
+    by visibility. Fused visibility is the chance that at least one view
+    sees the landmark.
+    """
+    present = [i for i, frame in enumerate(frames) if frame is not None]
+    if not present:
+        return None
+    if out is None:
+        out = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+    if len(present) == 1 and (transforms is None or transforms[present[0]] is None):
+        out[:] = frames[present[0]].data
+        return LandmarkFrame(out)
+
+    stack = np.stack([frames[i].data for i in present])
+    vis = stack[:, :, VISIBILITY]
+
+    if transforms is None:
+        for group in FUSION_GROUPS:
+            best = vis[:, group].sum(axis=1).argmax()
+            out[group, :3] = stack[best, group, :3]
+    else:
+        for k, i in enumerate(present):
+            if transforms[i] is not None:
+                matrix = np.asarray(transforms[i], dtype=np.float32)
+                stack[k, :, :2] = stack[k, :, :2] @ matrix[:, :2].T + matrix[:, 2]
+        weights = vis + 1e-6
+        out[:, :3] = (stack[:, :, :3] * weights[..., None]).sum(axis=0) / weights.sum(axis=0)[:, None]
+
+    out[:, VISIBILITY] = 1.0 - np.prod(1.0 - vis, axis=0)
+    return LandmarkFrame(out)
+
+class CameraView:
+    """
+    One camera or video file: anything with a cv2.VideoCapture-style read().
+    media_time: timestamp frames with the container position (files)
+                instead of the wall clock at capture (live cameras).
+    realtime: drop the oldest buffered frame when inference falls behind
+              (live cameras); otherwise capture waits, so every frame of a
+              file is used.
+    """
+    def __init__(self, capture, media_time=False, realtime=True, buffer=4):
+        self.capture = capture
+        self.media_time = media_time
+        self.realtime = realtime
+        self.buffer = buffer
+        self.frames = deque()
+        self.ended = False
+        self.dropped = 0
+
+    @classmethod
+    def open(cls, source, **options):
+        """
+        Opens a device index (live) or a file path (media time, no drops).
+        """
+        import cv2
+
+        capture = cv2.VideoCapture(source)
+        if not capture.isOpened():
+            raise IOError(f"Cannot open video source: {source}")
+        if isinstance(source, str):
+            options.setdefault("media_time", True)
+            options.setdefault("realtime", False)
+        return cls(capture, **options)
+
+    def read(self):
+        """
+        Returns (timestamp, frame), or None at the end of the stream.
+        """
+        ok, frame = self.capture.read()
+        if not ok:
+            return None
+        if self.media_time:
+            import cv2
+            return self.capture.get(cv2.CAP_PROP_POS_MSEC) / 1000.0, frame
+        return time.perf_counter(), frame
+
+    def release(self):
+        release = getattr(self.capture, "release", None)
+        if release is not None:
+            release()
+
+class MultiCameraRunner:
+    """
+    Runs capture, per-view inference and fusion for several views.
+
+    One capture thread per view buffers timestamped frames. A sync thread
+    takes the latest of the views' oldest buffered timestamps as the
+    reference (or a lagging view's, when it is more than `tolerance` behind),
+    picks each view's frame nearest to it (views with nothing within
+    `tolerance` seconds sit the set out), runs engines[i].process_frame on
+    view i in parallel, fuses the landmarks and calls the optional
+    `process(frames, results, fused, reference)` while holding
+    `runner.lock`; reference is the set's timestamp, for exercise timers.
+    The default tolerance is half a frame at 30 fps. A frame may be dropped
+    when another frame of its view is closer to the reference, so views
+    faster than the slowest one contribute only their best-aligned frames.
+    Iterating yields (frames, results, payload) per set; frames and results
+    are lists in view order, with None for views left out of the set.
+    The run ends when every view has ended.
+    """
+    def __init__(self, engines, views, process=None, transforms=None, tolerance=1.0 / 60,
+                 queue_size=2):
+        if len(engines) != len(views):
+            raise ValueError("need one engine per view")
+        self.engines = engines
+        self.views = views
+        self.process = process
+        self.transforms = transforms
+        self.tolerance = tolerance
+        self.lock = threading.Lock()
+        self.inferred = DropOldestQueue(queue_size)
+        self.timings = {
+            "sync": StageTimer(),
+            "inference": StageTimer(),
+            "process": StageTimer(),
+            "render": StageTimer(),
+            "latency": StageTimer(),
+        }
+        self.skipped = [0] * len(views)   # sets each view sat out
+        self._ready = threading.Condition()
+        self._stop = threading.Event()
+        self._threads = []
+        self._executor = None
+
+    def start(self):
+        self._stop.clear()
+        self._executor = ThreadPoolExecutor(max_workers=len(self.views),
+                                            thread_name_prefix="view")
+        self._threads = [threading.Thread(target=self._capture_loop, args=(view,),
+                                          name=f"capture-{i}", daemon=True)
+                         for i, view in enumerate(self.views)]
+        self._threads.append(threading.Thread(target=self._sync_loop, name="sync", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        with self._ready:
+            self._ready.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _capture_loop(self, view):
+        ready = self._ready
+        try:
+            while not self._stop.is_set():
+                item = view.read()
+                if item is None:
+                    break
+                with ready:
+                    if not view.realtime:
+                        while len(view.frames) >= view.buffer and not self._stop.is_set():
+                            ready.wait()
+                    elif len(view.frames) >= view.buffer:
+                        view.frames.popleft()
+                        view.dropped += 1
+                    view.frames.append(item)
+                    ready.notify_all()
+        finally:
+            with ready:
+                view.ended = True
+                ready.notify_all()
+
+    def next_set(self):
+        """
+        Blocks until the next aligned set is available.
+        Returns (reference timestamp, [(timestamp, frame) or None per view])
+        or None when all views have ended (or the runner is stopping).
+        """
+        views = self.views
+        ready = self._ready
+        with ready:
+            # Every view still running has a frame buffered
+            if not self._wait(lambda: all(view.frames for view in views if not view.ended)):
+                return None
+            live = [view for view in views if view.frames]
+            if not live:
+                return None
+
+            heads = [view.frames[0][0] for view in live]
+            reference = max(heads)
+            if min(heads) < reference - self.tolerance:
+                # A view is behind (the others skipped frames): give its frame
+                # a set of its own rather than dropping it
+                reference = min(heads)
+
+            # Wait until each view has a frame at or past the reference, so
+            # the nearest one is known; older frames are discarded meanwhile
+            # so a full buffer doesn't stall its capture thread
+            while True:
+                for view in live:
+                    frames = view.frames
+                    while len(frames) > 1 and \
+                            abs(frames[1][0] - reference) <= abs(frames[0][0] - reference):
+                        frames.popleft()
+                if all(view.ended or view.frames[-1][0] >= reference for view in live):
+                    break
+                ready.notify_all()
+                if not self._wait(lambda: False, once=True):
+                    return None
+
+            chosen = []
+            for i, view in enumerate(views):
+                frames = view.frames
+                if frames and abs(frames[0][0] - reference) <= self.tolerance:
+                    chosen.append(frames.popleft())
+                else:
+                    chosen.append(None)
+                    self.skipped[i] += 1
+            ready.notify_all()
+        return reference, chosen
+
+    def _wait(self, predicate, once=False):
+        # Called holding self._ready; False if the runner is stopping
+        while not predicate():
+            if self._stop.is_set():
+                return False
+            self._ready.wait()
+            if once:
+                break
+        return not self._stop.is_set()
+
+    def _infer(self, index, frame):
+        return self.engines[index].process_frame(frame)
+
+    def _sync_loop(self):
+        sync = self.timings["sync"]
+        inference = self.timings["inference"]
+        process = self.timings["process"]
+        executor = self._executor
+        try:
+            while True:
+                t0 = time.perf_counter()
+                item = self.next_set()
+                if item is None:
+                    break
+                reference, chosen = item
+                t1 = time.perf_counter()
+                sync.add(t1 - t0)
+
+                frames = [c[1] if c is not None else None for c in chosen]
+                futures = [executor.submit(self._infer, i, frame) if frame is not None else None
+                           for i, frame in enumerate(frames)]
+                results = [f.result() if f is not None else None for f in futures]
+                t2 = time.perf_counter()
+                inference.add(t2 - t1)
+
+                fused = fuse_landmarks([LandmarkFrame.from_results(r) if r is not None else None
+                                        for r in results], self.transforms)
+                payload = None
+                if self.process is not None:
+                    with self.lock:
+                        payload = self.process(frames, results, fused, reference)
+                    process.add(time.perf_counter() - t2)
+                self.inferred.put((frames, results, payload, t1))
+        finally:
+            self.inferred.put(_STOP)
+
+    def __iter__(self):
+        render = self.timings["render"]
+        latency = self.timings["latency"]
+        self.start()
+        try:
+            while True:
+                item = self.inferred.get()
+                if item is _STOP:
+                    break
+                frames, results, payload, synced_at = item
+
+                t0 = time.perf_counter()
+                yield frames, results, payload
+                t1 = time.perf_counter()
+                render.add(t1 - t0)
+                latency.add(t1 - synced_at)
+        finally:
+            self.stop()
+
+    def report(self):
+        """
+        Per-stage timing summaries plus dropped frame counts; "skipped"
+        lists the sets each view sat out. Works with format_report.
+        """
+        report = {name: timer.summary() for name, timer in self.timings.items()}
+        report["dropped"] = {
+            "capture": sum(view.dropped for view in self.views),
+            "inference": self.inferred.dropped,
+            "skipped": list(self.skipped),
+        }
+        return report
@@ -0,0 +1,115 @@
+"""
+Runs several exercises against one landmark stream.
+
+    evaluator = MultiExerciseEvaluator({
+        "quadriceps_set": QuadricepsSet(),
+        "heel_slide": HeelSlide(),
+    })
+    for timestamp, landmarks in stream:
+        results = evaluator.update(landmarks, timestamp)  # name -> (state, feedback, reps)
+
+Every joint angle any exercise needs is computed for both sides in a single
+batch_angles call per frame, along with both legs' visibility for side
+detection; each exercise then steps its state machine on its columns of
+those shared arrays. Per-frame feature cost depends on the set of distinct
+joints, not on the number of exercises.
+"""
+import time
+
+import numpy as np
+
+from .exercises import LEG_LANDMARKS, ProtocolExercise
+from .geometry import JOINT_ANGLES, batch_angles
+from .landmarks import as_landmark_frame
+
+# Rows of (hip, knee, ankle) indices, left then right
+_LEGS = np.array([LEG_LANDMARKS["LEFT"], LEG_LANDMARKS["RIGHT"]], dtype=np.intp)
+
+class MultiExerciseEvaluator:
+    """
+    exercises: dict name -> Exercise, or a list (named by exercise.name).
+    Exercises not built on a protocol spec fall back to their own update().
+    Exercises with metrics get their "exercise.transitions" timing as in
+    update(); the shared feature pass is observed once per frame as
+    "exercise.extract" and "exercise.angles" in each distinct Metrics.
+    """
+    def __init__(self, exercises=None):
+        self.exercises = {}
+        self.joints = []
+        self.angles = None
+        self.visibility = None
+        self._index = np.empty((0, 3), dtype=np.intp)
+        self._columns = {}
+        self._metrics = []
+        if isinstance(exercises, dict):
+            for name, exercise in exercises.items():
+                self.add(name, exercise)
+        else:
+            for exercise in exercises or ():
+                self.add(exercise.name, exercise)
+
+    def add(self, name, exercise):
+        if name in self.exercises:
+            raise ValueError(f"duplicate exercise name {name!r}")
+        self.exercises[name] = exercise
+        self._rebuild()
+
+    def remove(self, name):
+        del self.exercises[name]
+        self._rebuild()
+
+    def _rebuild(self):
+        # Union of joints for both sides, in first-seen order
+        joints = []
+        for exercise in self.exercises.values():
+            if isinstance(exercise, ProtocolExercise):
+                for side_joints in exercise.protocol.joints.values():
+                    joints.extend(j for j in side_joints if j not in joints)
+        self.joints = joints
+        self._index = np.array([JOINT_ANGLES[j] for j in joints], dtype=np.intp).reshape(-1, 3)
+        # Per exercise and side: columns of the shared angle array
+        self._columns = {
+            name: {side: np.array([joints.index(j) for j in side_joints], dtype=np.intp)
+                   for side, side_joints in exercise.protocol.joints.items()}
+            for name, exercise in self.exercises.items()
+            if isinstance(exercise, ProtocolExercise)
+        }
+        # Distinct Metrics of the exercises stepped on the shared features
+        shared = {id(e.metrics): e.metrics for e in self.exercises.values()
+                  if isinstance(e, ProtocolExercise) and e.metrics is not None}
+        self._metrics = list(shared.values())
+
+    def features(self, landmarks):
+        """
+        Shared per-frame features: angles, (len(self.joints),) in
+        self.joints order, and (left, right) summed leg visibility.
+        """
+        data = landmarks.data
+        return batch_angles(data[self._index, :2]), data[_LEGS, 3].sum(axis=1)
+
+    def update(self, landmarks, timestamp=None):
+        """
+        Steps every exercise on one frame.
+        Returns: dict name -> (state, feedback, reps)
+        """
+        t0 = time.perf_counter()
+        landmarks = as_landmark_frame(landmarks)
+        t1 = time.perf_counter()
+        self.angles, self.visibility = angles, visibility = self.features(landmarks)
+        t2 = time.perf_counter()
+        for metrics in self._metrics:
+            metrics.observe("exercise.extract", t1 - t0)
+            metrics.observe("exercise.angles", t2 - t1)
+
+        results = {}
+        for name, exercise in self.exercises.items():
+            columns = self._columns.get(name)
+            if columns is None:
+                results[name] = exercise.update(landmarks, timestamp)
+                continue
+            results[name] = exercise.advance(landmarks, angles[columns[exercise.side]],
+                                             exercise.now(timestamp), visibility)
+        return results
+
+    def reps(self):
+        return {name: exercise.reps for name, exercise in self.exercises.items()}
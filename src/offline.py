@@ -0,0 +1,254 @@
+"""
+Vectorized offline evaluation of whole sessions.
+
+Instead of stepping an Exercise state machine frame by frame, every
+threshold condition is evaluated over the full (T,) angle trace at once and
+turned into a "next frame where this holds" index array. The evaluator then
+jumps straight from one state transition to the next, so Python work is
+proportional to the number of transitions rather than the number of frames,
+and results match the frame-by-frame classes in src/exercises.py exactly.
+
+The rules come from the same declarative specs as the live classes (see
+src/protocol.py), with params resolved and timers as ("timer", seconds).
+"""
+import numpy as np
+
+from .exercises import EXERCISES
+from .geometry import joint_angles
+from .landmarks import NUM_LANDMARKS
+from .protocol import OPS, SIDE_LANDMARKS
+
+def machine(exercise_name, **params):
+    """
+    Transition rules for an exercise, from the same compiled protocol the
+    live class uses (see src/protocol.py). Rules that only set feedback
+    don't move the state, so they are folded into the conditions of the
+    rules after them. Timers must be the whole condition or a direct part of
+    an "all"; specs nesting them elsewhere (e.g. in "any" or "not") raise
+    ValueError. Returns (protocol, {state: [(condition, target, reps)]}).
+    """
+    protocol = EXERCISES[exercise_name].compile(**params)
+    states = {}
+    for name, state in protocol.states.items():
+        rules = []
+        stays = []
+        for rule in state.rules:
+            if rule.target is None:
+                stays.append(rule.condition)
+                continue
+            cond = rule.condition
+            nested = _nested_timer(cond)
+            if nested is not None:
+                raise ValueError(f"{protocol.name}: timer inside {nested!r} in the {name} -> "
+                                 f"{rule.target} rule is not supported offline")
+            if stays:
+                if any(_has_timer(c) for c in stays):
+                    raise ValueError(f"{protocol.name}: timed feedback rule before a "
+                                     f"transition in {name} is not supported offline")
+                cond = _all(cond, ("not", ("any",) + tuple(stays)))
+            rules.append((cond, rule.target, rule.reps))
+        states[name] = rules
+    return protocol, states
+
+def _has_timer(cond):
+    if cond[0] == "timer":
+        return True
+    return cond[0] in ("all", "any", "not") and any(_has_timer(c) for c in cond[1:])
+
+def _nested_timer(cond):
+    # Kind of the sub-condition hiding a timer from _Compiler, or None
+    for part in cond[1:] if cond[0] == "all" else (cond,):
+        if part[0] in ("all", "any", "not") and _has_timer(part):
+            return part[0]
+    return None
+
+def _all(*conds):
+    flat = []
+    for cond in conds:
+        flat.extend(cond[1:] if cond[0] == "all" else (cond,))
+    return ("all",) + tuple(flat)
+
+class OfflineResult:
+    """
+    Outcome of evaluating one session.
+      reps: completed repetitions
+      state: state after the last frame
+      transitions: list of (frame, from_state, to_state)
+      rep_frames / rep_times: frame index and timestamp of each rep
+      holds: list of (enter_time, exit_time or None) for HOLD visits
+    """
+    def __init__(self, timestamps, transitions, reps, rep_frames):
+        self.timestamps = timestamps
+        self.transitions = transitions
+        self.reps = reps
+        self.rep_frames = np.array(rep_frames, dtype=np.intp)
+        self.rep_times = timestamps[self.rep_frames] if len(rep_frames) else np.empty(0)
+        self.state = transitions[-1][2] if transitions else "SETUP"
+
+    @property
+    def holds(self):
+        holds = []
+        for i, (frame, _, to_state) in enumerate(self.transitions):
+            if to_state == "HOLD":
+                end = self.transitions[i + 1][0] if i + 1 < len(self.transitions) else None
+                holds.append((self.timestamps[frame],
+                              None if end is None else self.timestamps[end]))
+        return holds
+
+    def states(self):
+        """
+        (T,) array of the state after each frame's update.
+        """
+        names = ["SETUP"] + [to for _, _, to in self.transitions]
+        bounds = [0] + [frame for frame, _, _ in self.transitions] + [len(self.timestamps)]
+        return np.repeat(np.array(names, dtype=object), np.diff(bounds))
+
+def _next_true(mask):
+    """
+    Index array n with n[k] = first j >= k where mask[j], or len(mask).
+    Has one extra trailing entry so n[len(mask)] is valid.
+    """
+    n = len(mask)
+    index = np.where(mask, np.arange(n), n)
+    out = np.empty(n + 1, dtype=np.intp)
+    out[:n] = np.minimum.accumulate(index[::-1])[::-1]
+    out[n] = n
+    return out
+
+def _timer_index(t, entry, start, seconds):
+    """
+    First frame j >= start with t[j] - t[entry] >= seconds (len(t) if none).
+    Uses the same subtraction as the live classes so float rounding agrees.
+    """
+    n = len(t)
+    j = max(int(np.searchsorted(t, t[entry] + seconds, side="left")), start)
+    while j > start and t[j - 1] - t[entry] >= seconds:
+        j -= 1
+    while j < n and t[j] - t[entry] < seconds:
+        j += 1
+    return j
+
+class _Compiler:
+    """
+    Splits conditions into (threshold next-true array, timer seconds).
+    """
+    def __init__(self, angles, n):
+        self.angles = angles
+        self.n = n
+        self._cache = {}
+
+    def mask(self, cond):
+        kind = cond[0]
+        if kind == "all":
+            parts = [self.mask(c) for c in cond[1:] if c[0] != "timer"]
+            return np.logical_and.reduce(parts) if parts else np.ones(self.n, dtype=bool)
+        if kind == "any":
+            return np.logical_or.reduce([self.mask(c) for c in cond[1:]])
+        if kind == "not":
+            return ~self.mask(cond[1])
+        if kind == "always":
+            return np.ones(self.n, dtype=bool)
+        name, op, value = cond
+        return OPS[op](self.angles[name], value)
+
+    def compile(self, cond):
+        if cond not in self._cache:
+            timers = [c[1] for c in ([cond] if cond[0] != "all" else cond[1:]) if c[0] == "timer"]
+            timer = timers[0] if timers else None
+            needs_mask = cond[0] != "timer" and not (
+                cond[0] == "all" and all(c[0] == "timer" for c in cond[1:]))
+            self._cache[cond] = (_next_true(self.mask(cond)) if needs_mask else None, timer)
+        return self._cache[cond]
+
+def evaluate(exercise_name, timestamps, angles, valid=None, **params):
+    """
+    Evaluates a whole session.
+    timestamps: (T,) seconds, non-decreasing.
+    angles: dict of (T,) arrays, e.g. {"knee": ..., "hip": ...}.
+    valid: optional (T,) bool, False where required landmarks are missing.
+    params: overrides for the exercise's spec params, e.g. hold_duration=10.0.
+    Returns an OfflineResult.
+    """
+    protocol, states = machine(exercise_name, **params)
+    t = np.asarray(timestamps, dtype=np.float64)
+    n = len(t)
+    compiler = _Compiler(angles, n)
+
+    setup = compiler.mask(("all",) + tuple(c for c, test, _ in protocol.setup if test))
+    if valid is not None:
+        setup = setup & np.asarray(valid, dtype=bool)
+    next_valid = _next_true(setup)
+    next_invalid = _next_true(~setup)
+
+    transitions = []
+    rep_frames = []
+    reps = 0
+
+    # SETUP: the pose must stay valid for setup_duration within one valid run
+    k = 0
+    entry = None
+    while k < n:
+        i = next_valid[k]
+        if i >= n:
+            break
+        run_end = next_invalid[i]
+        j = _timer_index(t, i, i, protocol.setup_duration)
+        if j < run_end:
+            entry = j
+            break
+        k = run_end
+
+    if entry is None:
+        return OfflineResult(t, transitions, reps, rep_frames)
+
+    state = "START"
+    transitions.append((entry, "SETUP", state))
+    k = entry + 1
+    while k < n:
+        best = n
+        choice = None
+        for cond, target, rep in states[state]:
+            next_true, timer = compiler.compile(cond)
+            start = k if timer is None else _timer_index(t, entry, k, timer)
+            frame = start if next_true is None else next_true[min(start, n)]
+            # Earlier rules win ties, like the if/elif chains
+            if frame < best:
+                best, choice = frame, (target, rep)
+        if choice is None:
+            break
+
+        target, rep = choice
+        transitions.append((best, state, target))
+        if rep:
+            reps += rep
+            rep_frames.append(best)
+        state = target
+        entry = best
+        k = best + 1
+
+    return OfflineResult(t, transitions, reps, rep_frames)
+
+def session_angles(exercise_name, landmarks, side="RIGHT"):
+    """
+    Computes the angle traces and landmark validity mask an exercise needs
+    from a (T, 33, 4) landmark array. Returns (angles dict, valid mask).
+    """
+    protocol = EXERCISES[exercise_name].compile()
+    landmarks = np.asarray(landmarks)
+    if landmarks.shape[1:] != (NUM_LANDMARKS, 4) and landmarks.shape[1:] != (NUM_LANDMARKS, 3):
+        raise ValueError(f"expected (T, 33, 4) landmarks, got {landmarks.shape}")
+
+    traces = joint_angles(landmarks, protocol.joints[side])
+    angles = {name: traces[:, i] for i, name in enumerate(protocol.angles)}
+
+    index = [SIDE_LANDMARKS[side][name] for name in protocol.visible]
+    valid = landmarks[:, index, :3].any(axis=2).all(axis=1)
+    return angles, valid
+
+def evaluate_landmarks(exercise_name, timestamps, landmarks, side="RIGHT", **params):
+    """
+    evaluate() straight from a (T, 33, 4) landmark array, e.g.
+    SessionReplay.landmarks(). The side is fixed for the whole session.
+    """
+    angles, valid = session_angles(exercise_name, landmarks, side)
+    return evaluate(exercise_name, timestamps, angles, valid, **params)
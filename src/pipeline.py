@@ -0,0 +1,192 @@
+import queue
+import threading
+import time
+
+_STOP = object()
+
+class DropOldestQueue:
+    """
+    Bounded queue whose put() never blocks: when full, the oldest item
+    is discarded to make room, so consumers always see the freshest data.
+    """
+    def __init__(self, maxsize=2):
+        self._queue = queue.Queue(maxsize)
+        self.dropped = 0
+
+    def put(self, item):
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        """
+        Removes and returns the oldest item. Raises queue.Empty on timeout.
+        """
+        return self._queue.get(timeout=timeout)
+
+class StageTimer:
+    """
+    Accumulates wall-clock durations (seconds) for one pipeline stage.
+    """
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def summary(self):
+        mean = self.total / self.count if self.count else 0.0
+        return {
+            "count": self.count,
+            "mean_ms": mean * 1000.0,
+            "max_ms": self.max * 1000.0,
+            "last_ms": self.last * 1000.0,
+        }
+
+class PipelinedRunner:
+    """
+    Runs capture, pose inference and rendering as overlapping stages.
+
+    A capture thread reads frames from `capture` (anything with a
+    cv2.VideoCapture-style read()), an inference thread runs
+    engine.process_frame and the optional `process(frame, results)`
+    callback, and the caller renders by iterating over the runner:
+
+        for frame, results, payload in runner:
+            ...draw and display...
+
+    Queues between stages are bounded and drop the oldest frame when full,
+    so latency stays bounded when inference falls behind the camera.
+    `process` runs while holding `runner.lock`; take the same lock when
+    mutating shared state (e.g. an Exercise) from the render thread.
+    """
+    def __init__(self, engine, capture, process=None, queue_size=2):
+        self.engine = engine
+        self.capture = capture
+        self.process = process
+        self.lock = threading.Lock()
+
+        self.captured = DropOldestQueue(queue_size)
+        self.inferred = DropOldestQueue(queue_size)
+
+        self.timings = {
+            "capture": StageTimer(),
+            "inference": StageTimer(),
+            "process": StageTimer(),
+            "render": StageTimer(),
+            "latency": StageTimer(),
+        }
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="inference", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _capture_loop(self):
+        timer = self.timings["capture"]
+        try:
+            while not self._stop.is_set():
+                t0 = time.perf_counter()
+                ret, frame = self.capture.read()
+                t1 = time.perf_counter()
+                if not ret:
+                    break
+                timer.add(t1 - t0)
+                self.captured.put((frame, t1))
+        finally:
+            self.captured.put(_STOP)
+
+    def _inference_loop(self):
+        inference = self.timings["inference"]
+        process = self.timings["process"]
+        try:
+            while True:
+                item = self.captured.get()
+                if item is _STOP:
+                    break
+                frame, captured_at = item
+
+                t0 = time.perf_counter()
+                results = self.engine.process_frame(frame)
+                t1 = time.perf_counter()
+                inference.add(t1 - t0)
+
+                payload = None
+                if self.process is not None:
+                    with self.lock:
+                        payload = self.process(frame, results)
+                    process.add(time.perf_counter() - t1)
+
+                self.inferred.put((frame, results, payload, captured_at))
+        finally:
+            self.inferred.put(_STOP)
+
+    def __iter__(self):
+        render = self.timings["render"]
+        latency = self.timings["latency"]
+        self.start()
+        try:
+            while True:
+                item = self.inferred.get()
+                if item is _STOP:
+                    break
+                frame, results, payload, captured_at = item
+
+                t0 = time.perf_counter()
+                yield frame, results, payload
+                t1 = time.perf_counter()
+                render.add(t1 - t0)
+                latency.add(t1 - captured_at)
+        finally:
+            self.stop()
+
+    def report(self):
+        """
+        Returns per-stage timing summaries plus dropped frame counts.
+        """
+        report = {name: timer.summary() for name, timer in self.timings.items()}
+        report["dropped"] = {
+            "capture": self.captured.dropped,
+            "inference": self.inferred.dropped,
+        }
+        return report
+
+def format_report(report):
+    """
+    Formats PipelinedRunner.report() as printable lines.
+    """
+    lines = []
+    for name, stats in report.items():
+        if name == "dropped":
+            continue
+        lines.append(f"{name:>10}: n={stats['count']:<6} mean={stats['mean_ms']:.1f}ms "
+                     f"max={stats['max_ms']:.1f}ms")
+    dropped = report["dropped"]
+    lines.append(f"   dropped: capture={dropped['capture']} inference={dropped['inference']}")
+    return "\n".join(lines)
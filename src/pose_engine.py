@@ -1,42 +1,331 @@
-import mediapipe as mp
-import cv2
+import threading
+import time
+from contextlib import contextmanager
+
 import numpy as np
 
 class PoseEngine:
-    def __init__(self, static_image_mode=False, model_complexity=1, smooth_landmarks=True):
+    def __init__(self, static_image_mode=False, model_complexity=1, smooth_landmarks=True,
+                 metrics=None, motion_gate=None, adaptive=None, roi=None):
+        # MediaPipe and OpenCV load here rather than at import, so tools that
+        # only score recorded landmarks never pay for them
+        import cv2
+        import mediapipe as mp
+        self._cv2 = cv2
         self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(
-            static_image_mode=static_image_mode,
+        self.static_image_mode = static_image_mode
+        self.smooth_landmarks = smooth_landmarks
+        self.model_complexity = model_complexity
+        # Complexity the engine was built with; adaptive control may move away from it
+        self.configured_complexity = model_complexity
+        self.pose = self._build_graph(model_complexity)
+        # Graphs by model_complexity, built on demand by the adaptive controller
+        self._graphs = {model_complexity: self.pose}
+        self.mp_drawing = mp.solutions.drawing_utils
+        # Built once rather than per draw_landmarks call
+        self.landmark_spec = self.mp_drawing.DrawingSpec(color=(245,117,66), thickness=2, circle_radius=2)
+        self.connection_spec = self.mp_drawing.DrawingSpec(color=(245,66,230), thickness=2, circle_radius=2)
+        self._last_results = None
+        # Reusable scratch images, keyed by purpose, reallocated on size change
+        self._buffers = {}
+        self.attach(metrics, motion_gate, adaptive, roi)
+
+    def attach(self, metrics=None, motion_gate=None, adaptive=None, roi=None):
+        """
+        Sets the optional per-session components:
+        metrics: src.metrics.Metrics; stage timings are skipped when None
+        motion_gate: src.gating.MotionGate; static frames reuse the last results
+        adaptive: src.adaptive.AdaptiveController; trades complexity and
+                  input resolution against a target frame rate
+        roi: src.roi.RoiTracker; runs inference on a crop around the
+             previous frame's pose
+        """
+        self.metrics = metrics
+        self.motion_gate = motion_gate
+        self.adaptive = adaptive
+        self.roi = roi
+        if adaptive is not None:
+            adaptive.start_at(self.configured_complexity)
+            self._set_complexity(adaptive.complexity)
+
+    def _build_graph(self, model_complexity):
+        return self.mp_pose.Pose(
+            static_image_mode=self.static_image_mode,
             model_complexity=model_complexity,
-            smooth_landmarks=smooth_landmarks,
+            smooth_landmarks=self.smooth_landmarks,
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5
         )
-        self.mp_drawing = mp.solutions.drawing_utils
+
+    def _set_complexity(self, model_complexity):
+        if model_complexity == self.model_complexity:
+            return
+        graph = self._graphs.get(model_complexity)
+        if graph is None:
+            graph = self._graphs[model_complexity] = self._build_graph(model_complexity)
+        else:
+            graph.reset()
+        self.pose = graph
+        self.model_complexity = model_complexity
 
     def process_frame(self, image):
         """
         Processes an image frame and returns the pose landmarks.
+        With a motion gate, frames that barely differ from the last inferred
+        one return the previous results instead of running the model.
+        With an ROI tracker, only the region around the last pose is
+        analysed; landmarks are still normalized to the full image.
         """
-        # Convert BGR to RGB
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        metrics = self.metrics
+        if metrics is not None:
+            t0 = time.perf_counter()
+
+        gate = self.motion_gate
+        if gate is not None:
+            last = self._last_results
+            # Only reuse results that contain a pose, so a patient stepping
+            # into a static scene is picked up immediately.
+            infer = gate.should_infer(image, force=last is None or not last.pose_landmarks)
+            if metrics is not None:
+                t1 = time.perf_counter()
+                metrics.observe("engine.gate", t1 - t0)
+                t0 = t1
+            if not infer:
+                return last
+
+        cv2 = self._cv2
+        adaptive = self.adaptive
+        if adaptive is not None:
+            t_start = time.perf_counter()
+        scale = adaptive.scale if adaptive is not None else 1.0
+
+        roi = self.roi
+        if roi is not None:
+            full_shape = image.shape
+            box = roi.region(full_shape)
+            if roi.changed and not self.static_image_mode:
+                # MediaPipe's tracking and smoothing are in the old region's coordinates
+                self.pose.reset()
+            if box is not None:
+                x0, y0, x1, y1 = box
+                image = image[y0:y1, x0:x1]
+                scale *= roi.scale(image.shape)
+
+        if scale < 1.0:
+            # Uniform downscale: normalized landmarks still map onto the
+            # original frame (or crop) unchanged.
+            h, w = image.shape[:2]
+            size = (max(round(w * scale), 1), max(round(h * scale), 1))
+            image = cv2.resize(image, size, dst=self._buffer("scaled", (size[1], size[0], 3)),
+                               interpolation=cv2.INTER_AREA)
+
+        # Convert BGR to RGB into a buffer reused across frames
+        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=self._buffer("rgb", image.shape))
         image_rgb.flags.writeable = False # Improve performance
+
+        if metrics is not None:
+            t1 = time.perf_counter()
+            metrics.observe("engine.convert", t1 - t0)
         
         results = self.pose.process(image_rgb)
+
+        if metrics is not None:
+            metrics.observe("engine.inference", time.perf_counter() - t1)
         
         image_rgb.flags.writeable = True
+        if roi is not None:
+            roi.update(results, box, full_shape)
+        self._last_results = results
+
+        if adaptive is not None and adaptive.observe(time.perf_counter() - t_start):
+            try:
+                self._set_complexity(adaptive.complexity)
+            except Exception as error:
+                # Building a graph may need a model download; keep the current one
+                adaptive.fail(error)
         return results
 
+    def _buffer(self, name, shape):
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != shape:
+            buffer = self._buffers[name] = np.empty(shape, dtype=np.uint8)
+        return buffer
+
+    def reset(self):
+        """
+        Clears tracking state so the next frame starts a new video/session.
+        """
+        self.pose.reset()
+        self._last_results = None
+        if self.motion_gate is not None:
+            self.motion_gate.reset()
+        if self.roi is not None:
+            self.roi.reset()
+
+    def warm_up(self, size=(256, 256)):
+        """
+        Resets tracking state, then runs one blank frame through the graph.
+        MediaPipe restarts its graph lazily on the first frame after a reset,
+        which costs several normal frames; the blank frame takes that hit
+        now. It contains no pose, so the next real frame still starts fresh.
+        """
+        self.reset()
+        image = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+        image.flags.writeable = False
+        self.pose.process(image)
+
+    def close(self):
+        """
+        Releases every MediaPipe graph the engine built. Safe to call twice.
+        """
+        for graph in self._graphs.values():
+            graph.close()
+        self._graphs = {}
+        self.pose = None
+
     def draw_landmarks(self, image, results):
         """
         Draws the pose landmarks on the image.
         """
+        metrics = self.metrics
+        if metrics is not None:
+            t0 = time.perf_counter()
+
         if results.pose_landmarks:
             self.mp_drawing.draw_landmarks(
                 image,
                 results.pose_landmarks,
                 self.mp_pose.POSE_CONNECTIONS,
-                self.mp_drawing.DrawingSpec(color=(245,117,66), thickness=2, circle_radius=2),
-                self.mp_drawing.DrawingSpec(color=(245,66,230), thickness=2, circle_radius=2)
+                self.landmark_spec,
+                self.connection_spec
             )
+
+        if metrics is not None:
+            metrics.observe("engine.draw", time.perf_counter() - t0)
         return image
+
+class PoseEnginePool:
+    """
+    Keeps warmed PoseEngines for reuse across sessions, keyed by graph
+    configuration (static_image_mode, model_complexity, smooth_landmarks).
+
+        with PoseEnginePool() as pool:
+            pool.prewarm()
+            with pool.engine(metrics=metrics) as engine:
+                ...
+
+    Checked-in engines get their per-session components detached, their
+    complexity restored and their tracking state reset and re-warmed, so the
+    next session's first frame runs at full speed. At most `max_idle`
+    engines per configuration are kept; extras and, on close(), all idle
+    engines are closed. Engines still checked out when the pool closes are
+    closed when they come back. discard() closes a checked-out engine
+    without checking it in.
+    """
+    def __init__(self, factory=None, max_idle=2):
+        self.factory = factory or PoseEngine
+        self.max_idle = max_idle
+        self.created = 0
+        self._idle = {}
+        # Idle slots held by engines being reset and re-warmed, per configuration
+        self._reserved = {}
+        self._checked_out = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def checkout(self, static_image_mode=False, model_complexity=1, smooth_landmarks=True,
+                 metrics=None, motion_gate=None, adaptive=None, roi=None):
+        key = (static_image_mode, model_complexity, smooth_landmarks)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("engine pool is closed")
+            idle = self._idle.get(key)
+            engine = idle.pop() if idle else None
+
+        if engine is None:
+            # Built outside the lock: graph construction takes a while
+            engine = self.factory(static_image_mode=static_image_mode,
+                                  model_complexity=model_complexity,
+                                  smooth_landmarks=smooth_landmarks)
+            engine.warm_up()
+            with self._lock:
+                self.created += 1
+
+        with self._lock:
+            self._checked_out[id(engine)] = key
+        engine.attach(metrics, motion_gate, adaptive, roi)
+        return engine
+
+    def checkin(self, engine):
+        with self._lock:
+            key = self._checked_out.pop(id(engine))
+            idle = self._idle.setdefault(key, [])
+            reserved = self._reserved.get(key, 0)
+            keep = not self._closed and len(idle) + reserved < self.max_idle
+            if keep:
+                # Hold the slot while re-warming outside the lock
+                self._reserved[key] = reserved + 1
+        if not keep:
+            engine.close()
+            return
+
+        try:
+            engine.attach()
+            engine._set_complexity(key[1])
+            engine.warm_up()
+        except BaseException:
+            with self._lock:
+                self._reserved[key] -= 1
+            engine.close()
+            raise
+        with self._lock:
+            self._reserved[key] -= 1
+            if not self._closed:
+                idle.append(engine)
+                return
+        engine.close()
+
+    def discard(self, engine):
+        """
+        Closes a checked-out engine instead of returning it to the pool.
+        """
+        with self._lock:
+            self._checked_out.pop(id(engine), None)
+        engine.close()
+
+    @contextmanager
+    def engine(self, **config):
+        """
+        Checks out an engine for the duration of a with block.
+        """
+        engine = self.checkout(**config)
+        try:
+            yield engine
+        finally:
+            self.checkin(engine)
+
+    def prewarm(self, count=1, **config):
+        """
+        Builds and warms `count` engines for a configuration ahead of use.
+        """
+        engines = [self.checkout(**config) for _ in range(count)]
+        for engine in engines:
+            self.checkin(engine)
+
+    def idle(self):
+        with self._lock:
+            return sum(len(engines) for engines in self._idle.values())
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            engines = [engine for idle in self._idle.values() for engine in idle]
+            self._idle = {}
+        for engine in engines:
+            engine.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,176 @@
+"""
+Declarative exercise protocols.
+
+An exercise is described as data (a dict) and compiled into a transition
+table that src.exercises.ProtocolExercise evaluates each frame:
+
+    {
+        "name": "Heel Slide",
+        "angles": ("knee",),          # joint angles measured each frame
+        "primary": "knee",            # reported as current_angle
+        "params": {...},              # thresholds / durations, overridable
+        "derived": {"bent": ("straight", -10.0)},  # optional, see below
+        "setup": [(check, message), ...],
+        "setup_duration": "setup_duration",
+        "start_feedback": "Go: Slide heel.",
+        "states": {
+            "START": {"duration": None, "rules": [(condition, target, reps, feedback), ...]},
+            ...
+        },
+    }
+
+Conditions are tuples; numbers may be given directly or as a params key:
+    ("knee", ">", "straight")      angle threshold (ops: < <= > >=)
+    ("all", cond, ...) / ("any", cond, ...) / ("not", cond)
+    ("timer",)                     time in state >= the state's duration
+    ("always",)
+Setup checks are conditions or ("visible", landmark names).
+A param left as None in "params" is derived from another: with the
+"derived" entry above, bent follows straight - 10 unless set explicitly.
+
+Rules are tried in order and the first whose condition holds applies. A
+rule with target None only sets feedback. Feedback templates may use
+{side}, {remaining} (whole seconds left of the state's duration) and
+{elapsed}; they are re-formatted only when those values change.
+"""
+import operator
+import string
+
+import numpy as np
+
+from .geometry import JOINT_ANGLES
+
+OPS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+# Landmark indices per side for names used in protocols
+SIDE_LANDMARKS = {
+    "LEFT": {"shoulder": 11, "hip": 23, "knee": 25, "ankle": 27},
+    "RIGHT": {"shoulder": 12, "hip": 24, "knee": 26, "ankle": 28},
+}
+
+# Protocol angle names -> src.geometry.JOINT_ANGLES names per side
+JOINTS = {
+    "LEFT": {"knee": "LEFT_KNEE", "hip": "LEFT_HIP"},
+    "RIGHT": {"knee": "RIGHT_KNEE", "hip": "RIGHT_HIP"},
+}
+
+SETUP_HOLD_FEEDBACK = "Hold {side}... {remaining}"
+SETUP_FAIL_FEEDBACK = "Setup ({side}): {message}"
+
+_ALWAYS = ("always",)
+
+def _template_fields(template):
+    if template is None:
+        return frozenset()
+    return frozenset(field for _, field, _, _ in string.Formatter().parse(template) if field)
+
+class Rule:
+    """
+    One compiled row of a state's transition table.
+    condition: the condition with params resolved and timers as ("timer", seconds)
+    test: callable(angles, elapsed) -> bool
+    """
+    __slots__ = ("condition", "test", "target", "reps", "feedback", "fields")
+
+    def __init__(self, condition, test, target, reps, feedback):
+        self.condition = condition
+        self.test = test
+        self.target = target
+        self.reps = reps
+        self.feedback = feedback
+        self.fields = _template_fields(feedback)
+
+class State:
+    __slots__ = ("name", "duration", "rules")
+
+    def __init__(self, name, duration, rules):
+        self.name = name
+        self.duration = duration
+        self.rules = rules
+
+class Protocol:
+    """
+    A spec compiled against a set of params.
+    """
+    def __init__(self, spec, params):
+        self.spec = spec
+        self.params = params
+        self.name = spec["name"]
+        self.angles = tuple(spec["angles"])
+        self.primary = self.angles.index(spec.get("primary", self.angles[0]))
+        self.setup_duration = self.resolve(spec["setup_duration"])
+        self.start_feedback = spec["start_feedback"]
+        self.joints = {side: [names[a] for a in self.angles] for side, names in JOINTS.items()}
+        # (J, 3) landmark triples per side, for batch_angles
+        self.joint_index = {side: np.array([JOINT_ANGLES[j] for j in joints])
+                            for side, joints in self.joints.items()}
+
+        # (resolved check, test or visible landmark names, message)
+        self.setup = []
+        self.visible = []
+        for check, message in spec["setup"]:
+            if check[0] == "visible":
+                self.visible.extend(check[1])
+                self.setup.append((check, None, message))
+            else:
+                resolved = self._resolve_condition(check, None)
+                self.setup.append((resolved, self._compile(resolved), message))
+
+        self.states = {}
+        for name, state in spec["states"].items():
+            duration = self.resolve(state.get("duration"))
+            rules = []
+            for condition, target, reps, feedback in state["rules"]:
+                resolved = self._resolve_condition(condition, duration)
+                rules.append(Rule(resolved, self._compile(resolved), target, reps, feedback))
+            self.states[name] = State(name, duration, tuple(rules))
+
+        for state in self.states.values():
+            for rule in state.rules:
+                if rule.target is not None and rule.target not in self.states:
+                    raise ValueError(f"{self.name}: unknown state {rule.target!r} in {state.name}")
+
+    def resolve(self, value):
+        if isinstance(value, str):
+            return self.params[value]
+        return value
+
+    def _resolve_condition(self, cond, duration):
+        kind = cond[0]
+        if kind in ("all", "any"):
+            return (kind,) + tuple(self._resolve_condition(c, duration) for c in cond[1:])
+        if kind == "not":
+            return (kind, self._resolve_condition(cond[1], duration))
+        if kind == "timer":
+            if duration is None:
+                raise ValueError(f"{self.name}: timer used in a state without a duration")
+            return ("timer", duration)
+        if kind == "always":
+            return _ALWAYS
+        name, op, value = cond
+        if name not in self.angles:
+            raise ValueError(f"{self.name}: condition on unmeasured angle {name!r}")
+        if op not in OPS:
+            raise ValueError(f"{self.name}: unknown operator {op!r}")
+        return (name, op, float(self.resolve(value)))
+
+    def _compile(self, cond):
+        kind = cond[0]
+        if kind == "all":
+            tests = tuple(self._compile(c) for c in cond[1:])
+            return lambda angles, elapsed: all(t(angles, elapsed) for t in tests)
+        if kind == "any":
+            tests = tuple(self._compile(c) for c in cond[1:])
+            return lambda angles, elapsed: any(t(angles, elapsed) for t in tests)
+        if kind == "not":
+            test = self._compile(cond[1])
+            return lambda angles, elapsed: not test(angles, elapsed)
+        if kind == "timer":
+            seconds = cond[1]
+            return lambda angles, elapsed: elapsed >= seconds
+        if kind == "always":
+            return lambda angles, elapsed: True
+        name, op, value = cond
+        index = self.angles.index(name)
+        compare = OPS[op]
+        return lambda angles, elapsed: compare(angles[index], value)
@@ -0,0 +1,171 @@
+"""
+Binary recording and memory-mapped replay of landmark streams.
+
+File layout (little-endian, every block a multiple of 8 bytes so the
+arrays can be viewed straight out of the mmap):
+
+    header  16 bytes   b"MPLM", uint16 version, uint16 landmarks,
+                       uint16 columns, 6 bytes padding
+    chunk*  16 bytes   b"CHNK", uint32 frame count n, 8 bytes padding
+            8n bytes   float64 timestamps
+            528n bytes float32 (n, 33, 4) landmark frames
+
+Chunks are appended as they fill, so a recording interrupted mid-session
+is readable up to its last complete chunk.
+"""
+import struct
+
+import numpy as np
+
+from .landmarks import NUM_LANDMARKS, LandmarkFrame
+
+MAGIC = b"MPLM"
+CHUNK_MAGIC = b"CHNK"
+VERSION = 1
+COLUMNS = 4
+
+_HEADER = struct.Struct("<4sHHH6x")
+_CHUNK_HEADER = struct.Struct("<4sI8x")
+FRAME_BYTES = NUM_LANDMARKS * COLUMNS * 4
+
+class SessionRecorder:
+    """
+    Appends (timestamp, landmark frame) pairs to a recording file.
+    Frames are buffered in a preallocated chunk and written when it fills.
+
+        with SessionRecorder("session.lmk") as recorder:
+            recorder.append(timestamp, landmarks)
+    """
+    def __init__(self, path, chunk_frames=256):
+        self.path = path
+        self.chunk_frames = chunk_frames
+        self.frames_written = 0
+        self._timestamps = np.empty(chunk_frames, dtype="<f8")
+        self._data = np.empty((chunk_frames, NUM_LANDMARKS, COLUMNS), dtype="<f4")
+        self._count = 0
+        self._file = open(path, "wb")
+        self._file.write(_HEADER.pack(MAGIC, VERSION, NUM_LANDMARKS, COLUMNS))
+
+    def append(self, timestamp, landmarks):
+        """
+        Buffers one frame. landmarks is a LandmarkFrame or (33, 4) array.
+        """
+        if isinstance(landmarks, LandmarkFrame):
+            landmarks = landmarks.data
+        self._timestamps[self._count] = timestamp
+        self._data[self._count] = landmarks
+        self._count += 1
+        if self._count == self.chunk_frames:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes buffered frames as a chunk.
+        """
+        n = self._count
+        if n == 0:
+            return
+        self._file.write(_CHUNK_HEADER.pack(CHUNK_MAGIC, n))
+        self._file.write(self._timestamps[:n].tobytes())
+        self._file.write(self._data[:n].tobytes())
+        self._file.flush()
+        self.frames_written += n
+        self._count = 0
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+class SessionReplay:
+    """
+    Memory-mapped view of a recording. Timestamps and frames are read
+    straight from the mapped file; iterating yields (timestamp, LandmarkFrame)
+    pairs whose arrays are views into the mmap, not copies.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._buffer = np.memmap(path, dtype=np.uint8, mode="r")
+
+        if len(self._buffer) < _HEADER.size:
+            raise ValueError(f"{path}: not a landmark recording")
+        magic, version, landmarks, columns = _HEADER.unpack(self._buffer[:_HEADER.size].tobytes())
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a landmark recording")
+        if version != VERSION or landmarks != NUM_LANDMARKS or columns != COLUMNS:
+            raise ValueError(f"{path}: unsupported recording format "
+                             f"(version {version}, {landmarks}x{columns})")
+
+        # (timestamps, frames) views per chunk
+        self.chunks = []
+        offset = _HEADER.size
+        size = len(self._buffer)
+        while offset + _CHUNK_HEADER.size <= size:
+            magic, n = _CHUNK_HEADER.unpack(
+                self._buffer[offset:offset + _CHUNK_HEADER.size].tobytes())
+            start = offset + _CHUNK_HEADER.size
+            end = start + n * (8 + FRAME_BYTES)
+            if magic != CHUNK_MAGIC or end > size:
+                break  # truncated tail from an interrupted recording
+            timestamps = self._buffer[start:start + 8 * n].view("<f8")
+            frames = self._buffer[start + 8 * n:end].view("<f4").reshape(n, NUM_LANDMARKS, COLUMNS)
+            self.chunks.append((timestamps, frames))
+            offset = end
+
+        self._starts = np.cumsum([0] + [len(ts) for ts, _ in self.chunks])
+
+    def __len__(self):
+        return int(self._starts[-1])
+
+    def __iter__(self):
+        for timestamps, frames in self.chunks:
+            for i in range(len(timestamps)):
+                yield timestamps[i], LandmarkFrame(frames[i])
+
+    def __getitem__(self, index):
+        """
+        Returns (timestamp, LandmarkFrame) for one frame index.
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        chunk = int(np.searchsorted(self._starts, index, side="right")) - 1
+        timestamps, frames = self.chunks[chunk]
+        i = index - self._starts[chunk]
+        return timestamps[i], LandmarkFrame(frames[i])
+
+    def timestamps(self):
+        """
+        All timestamps as one (T,) array (a view when there is one chunk).
+        """
+        if len(self.chunks) == 1:
+            return self.chunks[0][0]
+        return np.concatenate([ts for ts, _ in self.chunks]) if self.chunks else np.empty(0)
+
+    def landmarks(self):
+        """
+        All frames as one (T, 33, 4) array (a view when there is one chunk).
+        """
+        if len(self.chunks) == 1:
+            return self.chunks[0][1]
+        if not self.chunks:
+            return np.empty((0, NUM_LANDMARKS, COLUMNS), dtype=np.float32)
+        return np.concatenate([frames for _, frames in self.chunks])
+
+    def play(self, exercise):
+        """
+        Feeds every recorded frame to exercise.update using the recorded
+        timestamps. Returns the final (state, feedback, reps).
+        """
+        result = exercise.state, exercise.feedback, exercise.reps
+        for timestamp, frame in self:
+            result = exercise.update(frame, float(timestamp))
+        return result
@@ -0,0 +1,154 @@
+"""
+Region-of-interest tracking for PoseEngine.
+
+The patient often fills a small part of a high-resolution camera image,
+yet every frame was converted and handed to MediaPipe at full size. With a
+RoiTracker attached, the engine crops (as a view) the padded bounding box of
+the previous frame's landmarks, downsizes the crop so its longer side is at
+most `max_side` and maps the landmarks back to full-frame normalized
+coordinates, so callers see no difference.
+
+The box covers the whole body rather than just the joints the exercises
+score: MediaPipe's detector needs the head and shoulders to find the pose
+again. It is only moved when the body nears its edge or has shrunk well
+inside it, so MediaPipe's own tracking and smoothing, which work in crop
+coordinates, see a stable image most of the time. When no pose is found or
+the landmarks become unreliable, the next frame runs on the full image.
+
+Whenever the region changes (a move, or a switch between crop and full
+image) the engine resets the MediaPipe graph, since its tracked region and
+landmark smoothing refer to the previous input's coordinates. That frame
+pays for a fresh detection and starts unsmoothed; keeping the graph would
+instead risk one or more frames tracked from a stale region. The hysteresis
+above keeps such resets rare.
+"""
+import numpy as np
+
+class RoiTracker:
+    """
+    padding: margin added on each side of the landmark bounding box, as a
+             fraction of its size.
+    margin: how close (fraction of the box size) the landmarks may get to
+            the box edge before the box is recomputed.
+    max_side: crops are downsized so their longer side is at most this.
+    min_visibility: mean landmark visibility below which tracking counts
+                    as lost.
+    min_size: smallest crop side in pixels.
+    """
+    def __init__(self, padding=0.3, margin=0.05, max_side=512, min_visibility=0.5, min_size=96):
+        self.padding = padding
+        self.margin = margin
+        self.max_side = max_side
+        self.min_visibility = min_visibility
+        self.min_size = min_size
+        self.box = None      # (x0, y0, x1, y1) pixels for the next frame, None = full frame
+        self.cropped = 0     # frames run on a crop
+        self.full = 0        # frames run on the full image
+        self.lost = 0        # times tracking fell back to the full image
+        self.moved = 0       # times the box was recomputed
+        self.changed = False # region differs from the previous frame's
+        self._shape = None
+        self._last_region = None
+        self._points = np.empty((33, 4))
+
+    def reset(self):
+        self.box = None
+        self.changed = False
+        self._shape = None
+        self._last_region = None
+
+    def region(self, shape):
+        """
+        Pixel box (x0, y0, x1, y1) to run the next frame on, or None for the
+        full image.
+        """
+        if self.box is not None and shape[:2] != self._shape:
+            # Camera resolution changed; the box no longer applies
+            self.box = None
+        if self.box is None:
+            self.full += 1
+        else:
+            self.cropped += 1
+        self.changed = self.box != self._last_region
+        self._last_region = self.box
+        return self.box
+
+    def scale(self, shape):
+        """
+        Downscale factor for a crop of the given shape.
+        """
+        return min(1.0, self.max_side / max(shape[0], shape[1]))
+
+    def update(self, results, box, shape):
+        """
+        Maps results from a crop at `box` back to full-frame normalized
+        coordinates (in place) and chooses the box for the next frame.
+        shape: shape of the full image.
+        """
+        pose = results.pose_landmarks if results is not None else None
+        if not pose:
+            self._lose()
+            return results
+
+        h, w = shape[:2]
+        points = self._points
+        landmarks = pose.landmark
+        for i, lm in enumerate(landmarks):
+            points[i] = (lm.x, lm.y, lm.z, lm.visibility)
+
+        if box is not None:
+            x0, y0, x1, y1 = box
+            cw, ch = x1 - x0, y1 - y0
+            points[:, 0] = (x0 + points[:, 0] * cw) / w
+            points[:, 1] = (y0 + points[:, 1] * ch) / h
+            # z shares the x scale
+            points[:, 2] *= cw / w
+            for lm, (x, y, z, _) in zip(landmarks, points):
+                lm.x = x
+                lm.y = y
+                lm.z = z
+
+        if points[:, 3].mean() < self.min_visibility:
+            self._lose()
+            return results
+
+        self._shape = shape[:2]
+        self._track(points[:, 0] * w, points[:, 1] * h, w, h)
+        return results
+
+    def _lose(self):
+        if self.box is not None:
+            self.lost += 1
+        self.box = None
+
+    def _track(self, xs, ys, w, h):
+        # Landmarks MediaPipe places outside the image are clamped to it
+        lx0, lx1 = np.clip((xs.min(), xs.max()), 0, w)
+        ly0, ly1 = np.clip((ys.min(), ys.max()), 0, h)
+        bw, bh = lx1 - lx0, ly1 - ly0
+
+        box = self.box
+        if box is not None:
+            x0, y0, x1, y1 = box
+            mx, my = self.margin * (x1 - x0), self.margin * (y1 - y0)
+            inside = (lx0 >= x0 + mx or x0 == 0) and (lx1 <= x1 - mx or x1 == w) \
+                and (ly0 >= y0 + my or y0 == 0) and (ly1 <= y1 - my or y1 == h)
+            # Keep the box until the body has shrunk to well under the padded size
+            loose = (x1 - x0) * (y1 - y0) > 2.0 * self._padded_area(bw, bh, w, h)
+            if inside and not loose:
+                return
+
+        px = max(bw * self.padding, (self.min_size - bw) / 2.0)
+        py = max(bh * self.padding, (self.min_size - bh) / 2.0)
+        x0, x1 = int(max(lx0 - px, 0)), int(min(np.ceil(lx1 + px), w))
+        y0, y1 = int(max(ly0 - py, 0)), int(min(np.ceil(ly1 + py), h))
+        if x1 <= x0 or y1 <= y0:
+            self._lose()
+            return
+        self.box = (x0, y0, x1, y1)
+        self.moved += 1
+
+    def _padded_area(self, bw, bh, w, h):
+        pw = max(bw * (1 + 2 * self.padding), self.min_size)
+        ph = max(bh * (1 + 2 * self.padding), self.min_size)
+        return min(pw, w) * min(ph, h)
@@ -0,0 +1,376 @@
+"""
+Local multi-patient pose server.
+
+    python -m src.server serve --port 8765 --workers 4
+    python -m src.server loadgen --port 8765 --sessions 8 --exercise heel_slide [--video clip.mp4]
+
+Clients open a session for one exercise and then stream frames; the server
+runs each frame on a free engine from a bounded PoseEngine pool and replies
+with the session's state, feedback and reps. Engines run in static image
+mode so any engine can serve any session's next frame.
+
+Wire format: every message is a 4-byte type and a uint32 body length
+(little-endian) followed by the body.
+
+    OPEN  JSON {"exercise": name}            -> RSLT {"session": id}
+    FRAM  float64 timestamp, uint16 height, uint16 width, uint8 encoding
+          (0 = raw BGR, 1 = JPEG), 3 pad bytes, then the image bytes
+                                             -> RSLT {"frame", "pose", "state",
+                                                      "feedback", "reps", "angle"}
+                                                or EROR {"frame", "error"} for a
+                                                malformed frame (session stays open)
+    CLOS  empty                              -> connection closed
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .exercises import EXERCISES
+from .landmarks import LandmarkFrame
+
+MESSAGE = struct.Struct("<4sI")
+FRAME_HEADER = struct.Struct("<dHHB3x")
+
+OPEN, FRAME, CLOSE, RESULT, ERROR = b"OPEN", b"FRAM", b"CLOS", b"RSLT", b"EROR"
+RAW, JPEG = 0, 1
+
+async def read_message(reader):
+    kind, length = MESSAGE.unpack(await reader.readexactly(MESSAGE.size))
+    body = await reader.readexactly(length) if length else b""
+    return kind, body
+
+def write_message(writer, kind, body=b""):
+    writer.write(MESSAGE.pack(kind, len(body)))
+    if body:
+        writer.write(body)
+
+def encode_image(image, jpeg=False, quality=90):
+    """
+    Returns (height, width, encoding, payload bytes) for a BGR image.
+    """
+    h, w = image.shape[:2]
+    if jpeg:
+        import cv2
+        ok, data = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise ValueError("JPEG encoding failed")
+        return h, w, JPEG, data.tobytes()
+    return h, w, RAW, np.ascontiguousarray(image).tobytes()
+
+def frame_message(timestamp, encoded):
+    h, w, encoding, payload = encoded
+    return FRAME_HEADER.pack(timestamp, h, w, encoding) + payload
+
+def decode_frame(body):
+    """
+    Returns (timestamp, BGR image) from a FRAM body. Raises ValueError
+    for a malformed body.
+    """
+    if len(body) < FRAME_HEADER.size:
+        raise ValueError(f"frame body of {len(body)} bytes is shorter than its header")
+    timestamp, h, w, encoding = FRAME_HEADER.unpack_from(body)
+    payload = memoryview(body)[FRAME_HEADER.size:]
+    if encoding == JPEG:
+        import cv2
+        image = cv2.imdecode(np.frombuffer(payload, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError("frame is not a decodable JPEG")
+    elif encoding == RAW:
+        if h == 0 or w == 0 or len(payload) != h * w * 3:
+            raise ValueError(f"raw {w}x{h} frame needs {h * w * 3} bytes, got {len(payload)}")
+        image = np.frombuffer(payload, dtype=np.uint8).reshape(h, w, 3)
+    else:
+        raise ValueError(f"unknown frame encoding {encoding}")
+    return timestamp, image
+
+class EnginePool:
+    """
+    Fixed set of PoseEngines shared by all sessions. Inference runs on a
+    thread per engine; callers wait for a free engine, so at most `size`
+    frames are in flight and the rest queue up in arrival order.
+    By default the engines are warmed static-mode engines checked out of a
+    src.pose_engine.PoseEnginePool and released on close().
+    """
+    def __init__(self, size, factory=None):
+        self.size = size
+        if factory is None:
+            from .pose_engine import PoseEnginePool
+            self._pose_pool = PoseEnginePool(max_idle=size)
+            self._engines = [self._pose_pool.checkout(static_image_mode=True) for _ in range(size)]
+        else:
+            self._pose_pool = None
+            self._engines = [factory() for _ in range(size)]
+        self._executor = ThreadPoolExecutor(size, thread_name_prefix="pose")
+        self._free = None
+
+    def _run(self, engine, body):
+        timestamp, image = decode_frame(body)
+        return timestamp, LandmarkFrame.from_results(engine.process_frame(image))
+
+    async def process(self, body):
+        """
+        Decodes a FRAM body and runs inference on a free engine.
+        Returns (timestamp, LandmarkFrame or None).
+        """
+        if self._free is None:
+            self._free = asyncio.Queue()
+            for engine in self._engines:
+                self._free.put_nowait(engine)
+
+        engine = await self._free.get()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._run, engine, body)
+        finally:
+            self._free.put_nowait(engine)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        if self._pose_pool is not None:
+            # Shutting down: close rather than check in, which would re-warm them
+            for engine in self._engines:
+                self._pose_pool.discard(engine)
+            self._pose_pool.close()
+
+class PoseServer:
+    """
+    Accepts client connections, one Exercise per session.
+    """
+    def __init__(self, pool):
+        self.pool = pool
+        self.active_sessions = 0
+        self.frames = 0
+        self._ids = itertools.count(1)
+
+    async def handle(self, reader, writer):
+        try:
+            kind, body = await read_message(reader)
+            if kind != OPEN:
+                raise ValueError(f"expected OPEN, got {kind!r}")
+            options = json.loads(body)
+            if not isinstance(options, dict):
+                raise ValueError("OPEN body must be a JSON object")
+            exercise = EXERCISES[options["exercise"]]()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        except (ValueError, KeyError) as e:
+            write_message(writer, ERROR, json.dumps({"error": str(e)}).encode())
+            await writer.drain()
+            writer.close()
+            return
+
+        session = next(self._ids)
+        self.active_sessions += 1
+        write_message(writer, RESULT, json.dumps({"session": session}).encode())
+        await writer.drain()
+
+        try:
+            for n in itertools.count():
+                kind, body = await read_message(reader)
+                if kind == CLOSE:
+                    break
+                if kind != FRAME:
+                    raise ValueError(f"unexpected message {kind!r}")
+
+                try:
+                    timestamp, landmarks = await self.pool.process(body)
+                except ValueError as e:
+                    # A bad frame is reported but doesn't end the session
+                    write_message(writer, ERROR, json.dumps({"frame": n, "error": str(e)}).encode())
+                    await writer.drain()
+                    continue
+                if landmarks is not None:
+                    exercise.update(landmarks, timestamp)
+                self.frames += 1
+
+                reply = {
+                    "frame": n,
+                    "pose": landmarks is not None,
+                    "state": exercise.state,
+                    "feedback": exercise.feedback,
+                    "reps": exercise.reps,
+                    "angle": float(exercise.current_angle),
+                }
+                write_message(writer, RESULT, json.dumps(reply).encode())
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # client went away
+        except ValueError as e:
+            write_message(writer, ERROR, json.dumps({"error": str(e)}).encode())
+        finally:
+            self.active_sessions -= 1
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=8765, unix_path=None):
+        if unix_path:
+            return await asyncio.start_unix_server(self.handle, path=unix_path)
+        return await asyncio.start_server(self.handle, host, port)
+
+async def open_connection(host="127.0.0.1", port=8765, unix_path=None):
+    if unix_path:
+        return await asyncio.open_unix_connection(unix_path)
+    return await asyncio.open_connection(host, port)
+
+class Client:
+    """
+    Minimal client for one session.
+    """
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.session = None
+
+    @classmethod
+    async def connect(cls, exercise, host="127.0.0.1", port=8765, unix_path=None):
+        client = cls(*await open_connection(host, port, unix_path))
+        write_message(client.writer, OPEN, json.dumps({"exercise": exercise}).encode())
+        client.session = (await client._reply())["session"]
+        return client
+
+    async def _reply(self):
+        await self.writer.drain()
+        kind, body = await read_message(self.reader)
+        reply = json.loads(body)
+        if kind == ERROR:
+            raise RuntimeError(reply["error"])
+        return reply
+
+    async def send(self, timestamp, encoded):
+        """
+        Sends one frame (from encode_image) and returns the server's reply.
+        """
+        write_message(self.writer, FRAME, frame_message(timestamp, encoded))
+        return await self._reply()
+
+    async def close(self):
+        write_message(self.writer, CLOSE)
+        await self.writer.drain()
+        self.writer.close()
+
+def load_frames(video=None, n_frames=100, size=(640, 480), jpeg=False):
+    """
+    Pre-encoded frames for the load generator: read from a recorded video
+    (looping if short) or synthetic noise frames when no video is given.
+    """
+    images = []
+    if video:
+        import cv2
+        cap = cv2.VideoCapture(video)
+        while len(images) < n_frames:
+            ret, frame = cap.read()
+            if not ret:
+                if not images:
+                    raise IOError(f"Cannot read frames from {video}")
+                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                continue
+            images.append(cv2.resize(frame, size))
+        cap.release()
+    else:
+        rng = np.random.default_rng(0)
+        w, h = size
+        images = [rng.integers(0, 256, (h, w, 3), dtype=np.uint8) for _ in range(n_frames)]
+    return [encode_image(image, jpeg) for image in images]
+
+async def run_load(frames, sessions=4, exercise="heel_slide", fps=30.0,
+                   host="127.0.0.1", port=8765, unix_path=None):
+    """
+    Runs `sessions` concurrent clients, each streaming `frames` paced at
+    `fps` (0 = as fast as possible). Returns a latency/throughput report.
+    """
+    latencies = []
+
+    async def session():
+        client = await Client.connect(exercise, host, port, unix_path)
+        start = time.perf_counter()
+        for i, encoded in enumerate(frames):
+            if fps:
+                delay = start + i / fps - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            t0 = time.perf_counter()
+            await client.send(i / (fps or 30.0), encoded)
+            latencies.append(time.perf_counter() - t0)
+        await client.close()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    durations = await asyncio.gather(*[session() for _ in range(sessions)])
+    elapsed = time.perf_counter() - start
+
+    lat = np.array(latencies) * 1000.0
+    session_fps = len(frames) / max(durations)
+    # Sessions that keep up with the target rate, normalised per core. Unpaced
+    # runs estimate capacity from total throughput at 30 fps per session.
+    if fps:
+        sustained = sessions * min(1.0, session_fps / fps)
+    else:
+        sustained = len(latencies) / elapsed / 30.0
+    return {
+        "sessions": sessions,
+        "frames": len(latencies),
+        "elapsed_s": elapsed,
+        "throughput_fps": len(latencies) / elapsed,
+        "session_fps": session_fps,
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p99_ms": float(np.percentile(lat, 99)),
+        "max_ms": float(lat.max()),
+        "cpu_count": os.cpu_count(),
+        "sessions_per_core": sustained / os.cpu_count(),
+    }
+
+async def _serve(args):
+    pool = EnginePool(args.workers)
+    server = PoseServer(pool)
+    listener = await server.start(args.host, args.port, args.unix)
+    where = args.unix or f"{args.host}:{args.port}"
+    print(f"Serving on {where} with {args.workers} engines.")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        pool.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Multi-patient pose server and load generator.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("serve", "loadgen"):
+        p = sub.add_parser(name)
+        p.add_argument("--host", default="127.0.0.1")
+        p.add_argument("--port", type=int, default=8765)
+        p.add_argument("--unix", help="Unix socket path instead of TCP")
+        if name == "serve":
+            p.add_argument("--workers", type=int, default=os.cpu_count(), help="PoseEngine pool size")
+        else:
+            p.add_argument("--sessions", type=int, default=4)
+            p.add_argument("--exercise", default="heel_slide", choices=sorted(EXERCISES))
+            p.add_argument("--video", help="Recorded video to stream (default: synthetic frames)")
+            p.add_argument("--frames", type=int, default=150, help="Frames per session")
+            p.add_argument("--fps", type=float, default=30.0, help="Per-session rate, 0 = unpaced")
+            p.add_argument("--width", type=int, default=640)
+            p.add_argument("--height", type=int, default=480)
+            p.add_argument("--jpeg", action="store_true", help="Send JPEG instead of raw frames")
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        try:
+            asyncio.run(_serve(args))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    frames = load_frames(args.video, args.frames, (args.width, args.height), args.jpeg)
+    report = asyncio.run(run_load(frames, args.sessions, args.exercise, args.fps,
+                                  args.host, args.port, args.unix))
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
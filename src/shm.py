@@ -0,0 +1,213 @@
+"""
+Zero-copy frame transport between a capture process and pose workers.
+
+Frames live in a ring of preallocated slots in multiprocessing.shared_memory.
+Only slot indices travel through the queues: the parent writes a frame into
+a free slot and queues its index, a worker runs PoseEngine on a view of the
+slot and writes the landmarks back into the slot's landmark row, and the
+parent frees the slot once the consumer is done with it.
+"""
+import multiprocessing as mp
+import queue
+import time
+from collections import deque
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .landmarks import NUM_LANDMARKS, LandmarkFrame
+
+_ALIGN = 64
+
+class SharedFrameRing:
+    """
+    `slots` uint8 frames of `shape` plus one float32 (33, 4) landmark row
+    per slot, in a single shared memory block.
+    """
+    def __init__(self, slots, shape, name=None):
+        self.slots = slots
+        self.shape = tuple(shape)
+        frame_bytes = slots * int(np.prod(self.shape))
+        landmark_offset = -(-frame_bytes // _ALIGN) * _ALIGN
+        size = landmark_offset + slots * NUM_LANDMARKS * 4 * 4
+
+        self._owner = name is None
+        if self._owner:
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=self._shm.buf)
+        self.landmarks = np.ndarray((slots, NUM_LANDMARKS, 4), dtype=np.float32,
+                                    buffer=self._shm.buf, offset=landmark_offset)
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    @classmethod
+    def attach(cls, name, slots, shape):
+        """
+        Maps an existing ring created by another process.
+        """
+        return cls(slots, shape, name=name)
+
+    def close(self):
+        # Drop the array views before unmapping
+        self.frames = self.landmarks = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+def _worker(ring_name, slots, shape, ready, done, engine_kwargs):
+    from .pose_engine import PoseEngine
+
+    ring = SharedFrameRing.attach(ring_name, slots, shape)
+    try:
+        engine = PoseEngine(**engine_kwargs)
+    except Exception:
+        ring.close()
+        raise
+    try:
+        while True:
+            slot = ready.get()
+            if slot is None:
+                break
+            results = engine.process_frame(ring.frames[slot])
+            # Landmarks go straight into the slot's shared row
+            has_pose = LandmarkFrame.from_results(results, out=ring.landmarks[slot]) is not None
+            done.put((slot, has_pose))
+    finally:
+        engine.close()
+        ring.close()
+
+class MultiProcessPoseRunner:
+    """
+    Runs PoseEngine in `workers` processes fed from a shared frame ring.
+
+        with MultiProcessPoseRunner(workers=4, shape=(480, 640, 3)) as runner:
+            for timestamp, image, landmarks in runner.run(frames):
+                ...
+
+    `frames` is an iterable of (timestamp, BGR image) or a capture object
+    with read(image) (e.g. cv2.VideoCapture), which then decodes straight
+    into the shared slots. Results come back in input order; `image` and
+    `landmarks` are views into shared memory that stay valid until the
+    consumer asks for the next item. Workers use static image mode by
+    default because consecutive frames may land on different workers.
+    If a worker dies, run() stops the runner and raises RuntimeError;
+    `poll` is how often (seconds) it checks while waiting for results.
+    """
+    def __init__(self, workers=2, shape=(480, 640, 3), slots=None, engine_kwargs=None, poll=0.5):
+        self.workers = workers
+        self.poll = poll
+        self.shape = tuple(shape)
+        self.slots = slots or workers * 2
+        self.engine_kwargs = {"static_image_mode": True}
+        self.engine_kwargs.update(engine_kwargs or {})
+        self.ring = None
+        self._processes = []
+
+    def start(self):
+        ctx = mp.get_context("spawn")
+        self.ring = SharedFrameRing(self.slots, self.shape)
+        self._ready = ctx.Queue()
+        self._done = ctx.Queue()
+        self._processes = [
+            ctx.Process(target=_worker, daemon=True,
+                        args=(self.ring.name, self.slots, self.shape,
+                              self._ready, self._done, self.engine_kwargs))
+            for _ in range(self.workers)
+        ]
+        for process in self._processes:
+            process.start()
+
+    def stop(self):
+        for _ in self._processes:
+            self._ready.put(None)
+        for process in self._processes:
+            process.join(5.0)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _fill(self, source, slot):
+        """
+        Writes the next source frame into slot. Returns its timestamp,
+        or None when the source is exhausted.
+        """
+        if hasattr(source, "read"):
+            target = self.ring.frames[slot]
+            ret, image = source.read(target)
+            if not ret:
+                return None
+            if image.ctypes.data != target.ctypes.data:
+                # The capture allocated its own buffer (e.g. size mismatch)
+                target[...] = image
+            return time.monotonic()
+        try:
+            timestamp, image = next(source)
+        except StopIteration:
+            return None
+        self.ring.frames[slot][...] = image
+        return timestamp
+
+    def _next_done(self):
+        """
+        Next (slot, has_pose) from the workers. Workers only exit on the
+        stop sentinel, so one that is gone died mid-stream and its slot
+        will never complete.
+        """
+        while True:
+            try:
+                return self._done.get(timeout=self.poll)
+            except queue.Empty:
+                pass
+            dead = [p.exitcode for p in self._processes if not p.is_alive()]
+            if dead:
+                self.stop()
+                raise RuntimeError("pose worker exited with code %s" % dead[0])
+
+    def run(self, frames):
+        if not self._processes:
+            raise RuntimeError("runner not started")
+        source = frames if hasattr(frames, "read") else iter(frames)
+        free = deque(range(self.slots))
+        pending = deque()   # (slot, timestamp) in submission order
+        finished = {}       # slot -> has_pose, for out-of-order completions
+        exhausted = False
+
+        while True:
+            # Keep every free slot in flight
+            while free and not exhausted:
+                slot = free.popleft()
+                timestamp = self._fill(source, slot)
+                if timestamp is None:
+                    free.append(slot)
+                    exhausted = True
+                    break
+                pending.append((slot, timestamp))
+                self._ready.put(slot)
+
+            if not pending:
+                return
+
+            slot, timestamp = pending[0]
+            while slot not in finished:
+                done_slot, has_pose = self._next_done()
+                finished[done_slot] = has_pose
+            pending.popleft()
+
+            landmarks = LandmarkFrame(self.ring.landmarks[slot]) if finished.pop(slot) else None
+            yield timestamp, self.ring.frames[slot], landmarks
+            free.append(slot)
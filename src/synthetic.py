@@ -0,0 +1,100 @@
+"""
+Synthetic landmark streams for benchmarks and tests.
+
+Frames are (33, 4) float32 arrays in the LandmarkFrame layout. Only the
+shoulders, hips, knees and ankles are posed; other landmarks sit at a fixed
+point so nothing reads as missing.
+"""
+import numpy as np
+
+from .landmarks import NUM_LANDMARKS
+
+# shoulder, hip, knee, ankle per side
+SIDE_LANDMARKS = {"LEFT": (11, 23, 25, 27), "RIGHT": (12, 24, 26, 28)}
+
+SEGMENT_LENGTH = 0.2
+
+# Angle cycles (degrees / seconds) that produce reps for each exercise.
+# Each entry: knee cycle, hip cycle (None = 178) as
+# (first_angle, second_angle, first_hold, move, second_hold)
+EXERCISE_CYCLES = {
+    "quadriceps_set": ((178.0, 150.0, 9.0, 0.5, 2.0), None),
+    "straight_leg_raise": (None, (178.0, 150.0, 4.0, 0.5, 4.0)),
+    "heel_slide": ((178.0, 40.0, 4.0, 1.0, 1.0), None),
+    "wall_squat": ((178.0, 90.0, 4.0, 1.0, 6.0), None),
+    "knee_extension_rom": ((120.0, 178.0, 4.0, 1.0, 1.0), None),
+}
+
+def cycle_trajectory(timestamps, first, second, first_hold, move, second_hold):
+    """
+    Angle trajectory that holds `first`, moves to `second`, holds it and
+    moves back, repeating. Moves use a cosine ease.
+    Returns an array shaped like timestamps.
+    """
+    t = np.asarray(timestamps, dtype=np.float64)
+    period = first_hold + second_hold + 2 * move
+    phase = np.mod(t, period)
+
+    # 0 at `first`, 1 at `second`
+    blend = np.zeros_like(phase)
+    down = (phase >= first_hold) & (phase < first_hold + move)
+    blend[down] = 0.5 - 0.5 * np.cos(np.pi * (phase[down] - first_hold) / move)
+    held = (phase >= first_hold + move) & (phase < first_hold + move + second_hold)
+    blend[held] = 1.0
+    up = phase >= first_hold + move + second_hold
+    blend[up] = 0.5 + 0.5 * np.cos(np.pi * (phase[up] - first_hold - move - second_hold) / move)
+
+    return first + (second - first) * blend
+
+def leg_poses(knee_angles, hip_angles=None, side="RIGHT", visibility=0.9, other_visibility=0.2):
+    """
+    Builds frames whose `side` leg has the given knee and hip angles.
+    knee_angles/hip_angles: scalars or (T,) arrays in degrees (hip defaults to 178).
+    Returns a float32 array of shape (T, 33, 4), or (33, 4) for scalar input.
+    """
+    knee = np.asarray(knee_angles, dtype=np.float64)
+    hip = np.full_like(knee, 178.0) if hip_angles is None else np.asarray(hip_angles, dtype=np.float64)
+    knee, hip = np.broadcast_arrays(knee, hip)
+    scalar = knee.ndim == 0
+    knee = np.atleast_1d(knee)
+    hip = np.atleast_1d(hip)
+
+    frames = np.empty((len(knee), NUM_LANDMARKS, 4), dtype=np.float32)
+    frames[:, :, :3] = (0.5, 0.5, 0.0)
+    frames[:, :, 3] = 0.5
+
+    # Lying along +x with the shoulder towards -x; flexion lifts the leg (-y)
+    thigh = np.radians(180.0 - hip)
+    shank = thigh - np.radians(180.0 - knee)
+    hip_xy = np.array([0.4, 0.6])
+    knee_xy = hip_xy + SEGMENT_LENGTH * np.stack([np.cos(thigh), -np.sin(thigh)], axis=-1)
+    ankle_xy = knee_xy + SEGMENT_LENGTH * np.stack([np.cos(shank), -np.sin(shank)], axis=-1)
+    shoulder_xy = hip_xy - (SEGMENT_LENGTH * 1.5, 0.0)
+
+    for name, vis in ((side, visibility), ("LEFT" if side == "RIGHT" else "RIGHT", other_visibility)):
+        shoulder, hip_i, knee_i, ankle_i = SIDE_LANDMARKS[name]
+        frames[:, shoulder, :2] = shoulder_xy
+        frames[:, hip_i, :2] = hip_xy
+        frames[:, knee_i, :2] = knee_xy
+        frames[:, ankle_i, :2] = ankle_xy
+        frames[:, [shoulder, hip_i, knee_i, ankle_i], 3] = vis
+
+    return frames[0] if scalar else frames
+
+def synthetic_session(exercise_name, duration=60.0, fps=30.0, noise=0.0, seed=None, side="RIGHT"):
+    """
+    Synthetic landmark stream performing reps of the named exercise
+    (a key of src.exercises.EXERCISES).
+    noise: standard deviation of Gaussian jitter added to x, y.
+    Returns (timestamps (T,), landmarks (T, 33, 4) float32).
+    """
+    timestamps = np.arange(int(duration * fps)) / fps
+    knee_cycle, hip_cycle = EXERCISE_CYCLES[exercise_name]
+    knee = cycle_trajectory(timestamps, *knee_cycle) if knee_cycle else np.full_like(timestamps, 178.0)
+    hip = cycle_trajectory(timestamps, *hip_cycle) if hip_cycle else None
+
+    landmarks = leg_poses(knee, hip, side=side)
+    if noise:
+        rng = np.random.default_rng(seed)
+        landmarks[:, :, :2] += rng.normal(0.0, noise, landmarks[:, :, :2].shape).astype(np.float32)
+    return timestamps, landmarks
@@ -0,0 +1,104 @@
+"""
+Video file source for offline analysis.
+
+    with VideoSource("session.mp4", fps=15, start=30.0, end=95.0) as source:
+        for timestamp, frame in source:
+            ...
+
+Frames between analysis ticks are only grab()bed, never decoded into an
+image, so decode cost falls with the stride. Frames are picked by their
+container timestamps rather than by a fixed frame count, so any target rate
+works (e.g. 25 from 60 fps) and every yielded timestamp is the real
+presentation time of that frame, which keeps Exercise hold/relax timers
+correct at reduced rates. start/end seek to and stop at a time range.
+"""
+
+class VideoSource:
+    """
+    Iterates (timestamp seconds, BGR frame) over a video file.
+    fps: target analysis rate (None = every frame).
+    start, end: time range in seconds (None = from the beginning / to the end).
+    reuse: decode every frame into the same buffer (the consumer must be
+           done with a frame before asking for the next one).
+    """
+    def __init__(self, path, fps=None, start=None, end=None, reuse=False):
+        import cv2
+
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"Cannot open video: {path}")
+        self.native_fps = self.cap.get(cv2.CAP_PROP_FPS) or 0.0
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        self.fps = fps
+        self.start = start
+        self.end = end
+        self.reuse = reuse
+        self.position = -1  # index of the last grabbed frame
+        self.grabbed = 0    # frames read from the container
+        self.decoded = 0    # frames decoded to images
+        self._buffer = None
+
+    @property
+    def interval(self):
+        return 1.0 / self.fps if self.fps else 0.0
+
+    def _timestamp(self):
+        import cv2
+
+        # Some backends report no position; fall back to the nominal rate
+        msec = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+        if msec > 0 or self.position == 0 or not self.native_fps:
+            return msec / 1000.0
+        return self.position / self.native_fps
+
+    def _grab(self):
+        if not self.cap.grab():
+            return None
+        self.grabbed += 1
+        self.position += 1
+        return self._timestamp()
+
+    def _seek(self):
+        import cv2
+
+        if self.start:
+            self.cap.set(cv2.CAP_PROP_POS_MSEC, self.start * 1000.0)
+            # Container seeks may land before the requested time (keyframes)
+            self.position = int(round(self.cap.get(cv2.CAP_PROP_POS_FRAMES))) - 1
+
+    def __iter__(self):
+        self._seek()
+        interval = self.interval
+        due = self.start or 0.0
+        # Half-frame tolerance so timestamp jitter doesn't drop ticks
+        slack = 0.5 / (self.native_fps or 1000.0)
+        while True:
+            timestamp = self._grab()
+            if timestamp is None:
+                return
+            if self.end is not None and timestamp > self.end:
+                return
+            if timestamp + slack < due:
+                continue
+
+            ok, frame = self.cap.retrieve(self._buffer if self.reuse else None)
+            if not ok:
+                return
+            if self.reuse:
+                self._buffer = frame
+            self.decoded += 1
+            if interval:
+                # Next tick from the schedule, not this frame, so the rate holds
+                while due <= timestamp + slack:
+                    due += interval
+            yield timestamp, frame
+
+    def close(self):
+        self.cap.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+# Adjust path to find src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.adaptive import AdaptiveController
+
+LEVELS = [(0, 0.5), (0, 1.0), (1, 1.0), (2, 1.0)]
+
+class TestAdaptiveController(unittest.TestCase):
+    def test_steps_down_when_over_budget(self):
+        controller = AdaptiveController(target_fps=30, levels=LEVELS, window=5)
+        changes = [controller.observe(0.1) for _ in range(5)]
+        self.assertEqual(changes, [False] * 4 + [True])
+        self.assertEqual((controller.complexity, controller.scale), (1, 1.0))
+
+    def test_steps_up_with_headroom(self):
+        controller = AdaptiveController(target_fps=30, levels=LEVELS, level=0, window=5)
+        for _ in range(10):
+            controller.observe(0.001)
+        self.assertEqual(controller.level, 2)
+        self.assertEqual(controller.switches, 2)
+
+    def test_holds_within_band(self):
+        controller = AdaptiveController(target_fps=30, levels=LEVELS, level=1, window=5)
+        for _ in range(50):
+            controller.observe(0.025)  # between 0.6 and 1.0 of the 33 ms budget
+        self.assertEqual(controller.level, 1)
+
+    def test_switch_restarts_latency_average(self):
+        controller = AdaptiveController(target_fps=30, levels=LEVELS, window=5)
+        for _ in range(5):
+            controller.observe(0.1)
+        self.assertIsNone(controller.latency)
+        controller.observe(0.02)
+        self.assertEqual(controller.latency, 0.02)
+
+    def test_failed_switch_stays_and_skips_complexity(self):
+        controller = AdaptiveController(target_fps=30, levels=LEVELS, level=2, window=5)
+        for _ in range(5):
+            controller.observe(0.001)
+        self.assertEqual(controller.complexity, 2)
+        with self.assertLogs("src.adaptive", "WARNING"):
+            controller.fail(OSError("no network"))
+        self.assertEqual(controller.level, 2)
+        # Complexity 2 is not tried again
+        for _ in range(20):
+            self.assertFalse(controller.observe(0.001))
+        self.assertEqual(controller.level, 2)
+
+    def test_engine_keeps_graph_when_build_fails(self):
+        from src.pose_engine import PoseEngine
+        engine = PoseEngine()
+        controller = AdaptiveController(target_fps=30, levels=LEVELS, level=2, window=1)
+        engine.attach(adaptive=controller)
+
+        def unavailable(complexity):
+            raise OSError("model download failed")
+        engine._build_graph = unavailable
+        try:
+            with self.assertLogs("src.adaptive", "WARNING"):
+                engine.process_frame(np.zeros((64, 64, 3), dtype=np.uint8))
+            self.assertEqual(engine.model_complexity, 1)
+            self.assertEqual(controller.level, 2)
+        finally:
+            engine.close()
+
+    def test_start_at_configured_complexity(self):
+        controller = AdaptiveController(levels=LEVELS)
+        controller.start_at(1)
+        self.assertEqual(controller.level, 2)
+
+if __name__ == '__main__':
+    unittest.main()
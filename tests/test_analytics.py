@@ -0,0 +1,113 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+# Adjust path to find src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.analytics import RepAnalytics, RingBuffer, RunningStats, WindowExtremes
+from src.exercises import QuadricepsSet, HeelSlide
+from src.multiplex import MultiExerciseEvaluator
+from src.synthetic import synthetic_session
+
+class TestBuffersAndStats(unittest.TestCase):
+    def test_ring_buffer_wraps(self):
+        ring = RingBuffer(4)
+        for i in range(3):
+            ring.append(i)
+        np.testing.assert_array_equal(ring.values(), [0, 1, 2])
+        for i in range(3, 10):
+            ring.append(i)
+        self.assertEqual(len(ring), 4)
+        np.testing.assert_array_equal(ring.values(), [6, 7, 8, 9])
+        self.assertEqual(ring.last(), 9)
+        ring.clear()
+        with self.assertRaises(IndexError):
+            ring.last()
+
+    def test_running_stats_match_numpy(self):
+        values = np.random.default_rng(0).normal(120.0, 15.0, 1000)
+        stats = RunningStats()
+        for v in values:
+            stats.add(float(v))
+        stats.add(float("nan"))
+        self.assertEqual(stats.count, 1000)
+        self.assertAlmostEqual(stats.mean, values.mean(), places=9)
+        self.assertAlmostEqual(stats.variance, values.var(), places=6)
+        self.assertEqual((stats.min, stats.max), (values.min(), values.max()))
+
+    def test_window_extremes_match_brute_force(self):
+        rng = np.random.default_rng(1)
+        t = np.cumsum(rng.uniform(0.01, 0.05, 500))
+        values = rng.normal(0.0, 1.0, 500)
+        window = WindowExtremes(0.5)
+        for i in range(len(t)):
+            window.add(t[i], values[i])
+            inside = values[(t > t[i] - 0.5 - 1e-12) & (t <= t[i])]
+            self.assertEqual(window.min, inside.min())
+            self.assertEqual(window.max, inside.max())
+
+class TestRepAnalytics(unittest.TestCase):
+    def run_session(self, exercise, duration=120.0):
+        timestamps, landmarks = synthetic_session("heel_slide", duration=duration)
+        rows = []
+        for t, frame in zip(timestamps, landmarks):
+            exercise.update(frame, float(t))
+            rows.append((float(t), exercise.state, exercise.reps, exercise.current_angle))
+        return rows
+
+    def test_rep_summaries_match_full_history(self):
+        analytics = RepAnalytics()
+        exercise = HeelSlide(analytics=analytics)
+        rows = self.run_session(exercise)
+        self.assertGreater(exercise.reps, 2)
+        self.assertEqual(analytics.reps, exercise.reps)
+
+        t = np.array([r[0] for r in rows])
+        states = np.array([r[1] for r in rows])
+        reps = np.array([r[2] for r in rows])
+        angle = np.array([r[3] for r in rows])
+        active = np.flatnonzero(states != "SETUP")
+        # Frame where each rep is counted; it closes that rep
+        bounds = [active[0]] + list(np.flatnonzero(np.diff(reps)) + 1)
+
+        summaries = analytics.summaries.values()
+        self.assertEqual(len(summaries), exercise.reps)
+        for k, row in enumerate(summaries):
+            start, end = bounds[k] + (k > 0), bounds[k + 1]
+            segment = angle[start:end + 1]
+            self.assertEqual(row["rep"], k + 1)
+            self.assertAlmostEqual(row["end"], t[end])
+            self.assertAlmostEqual(row["min"], segment.min(), places=3)
+            self.assertAlmostEqual(row["max"], segment.max(), places=3)
+            self.assertAlmostEqual(row["std"], segment.std(), places=3)
+            held = states[start:end + 1] == "HOLD"
+            self.assertAlmostEqual(row["hold_std"], segment[held].std(), places=3)
+
+        summary = analytics.summary()
+        self.assertEqual(summary["range_of_motion"]["count"], exercise.reps)
+        self.assertGreater(summary["range_of_motion"]["mean"], 30.0)
+
+    def test_memory_is_bounded(self):
+        analytics = RepAnalytics(history=2, trace=50)
+        exercise = HeelSlide(analytics=analytics)
+        self.run_session(exercise, duration=240.0)
+        self.assertGreater(exercise.reps, 2)
+        self.assertEqual(len(analytics.summaries), 2)
+        self.assertEqual(analytics.last["rep"], exercise.reps)
+        self.assertEqual(len(analytics.recent), 50)
+        self.assertLessEqual(analytics.window_min, analytics.window_max)
+
+    def test_multiplexed_exercises_feed_analytics(self):
+        analytics = RepAnalytics()
+        exercise = HeelSlide(analytics=analytics)
+        evaluator = MultiExerciseEvaluator({"heel": exercise, "quads": QuadricepsSet()})
+        timestamps, landmarks = synthetic_session("heel_slide", duration=60.0)
+        for t, frame in zip(timestamps, landmarks):
+            evaluator.update(frame, float(t))
+        self.assertGreater(exercise.reps, 0)
+        self.assertEqual(analytics.reps, exercise.reps)
+
+if __name__ == '__main__':
+    unittest.main()
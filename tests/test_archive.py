@@ -0,0 +1,171 @@
+import unittest
+import os
+import sys
+import tempfile
+import multiprocessing as mp
+from unittest import mock
+import numpy as np
+
+# Adjust path to find src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.archive import SessionArchive
+from src.exercises import HeelSlide
+from src.offline import evaluate, session_angles
+from src.synthetic import synthetic_session
+
+def append_sessions(root, worker, count):
+    # Entries far larger than a write buffer, from several processes at once
+    archive = SessionArchive(root)
+    for i in range(count):
+        archive.add(f"p{worker}", "heel_slide", [0.0], ["SETUP"], [0], {"knee": [170.0]},
+                    note="x" * 200000)
+
+class TestSessionArchive(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        self.archive = SessionArchive(self.root, chunk_rows=256)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def add_heel_slide(self, patient, seed, recorded_at=0.0):
+        timestamps, landmarks = synthetic_session("heel_slide", duration=40.0, noise=0.002, seed=seed)
+        angles, valid = session_angles("heel_slide", landmarks)
+        result = evaluate("heel_slide", timestamps, angles, valid)
+        entry = self.archive.add_result(patient, "heel_slide", result, angles, side="RIGHT",
+                                        recorded_at=recorded_at)
+        return entry, timestamps, angles, result
+
+    def test_live_writer_matches_exercise(self):
+        timestamps, landmarks = synthetic_session("heel_slide", duration=40.0)
+        exercise = HeelSlide()
+        with self.archive.writer("p1", "heel_slide", side="RIGHT") as writer:
+            for t, frame in zip(timestamps, landmarks):
+                exercise.update(frame, float(t))
+                writer.record(exercise, float(t))
+
+        entry = self.archive.session(writer.id)
+        self.assertEqual(entry["reps"], exercise.reps)
+        self.assertGreater(exercise.reps, 0)
+        self.assertEqual(len(entry["rep_summaries"]), exercise.reps)
+        self.assertEqual(entry["frames"], len(timestamps))
+        self.assertEqual(len(entry["chunks"]), -(-len(timestamps) // 256))
+
+        rows = self.archive.read(writer.id)
+        np.testing.assert_array_equal(rows["timestamp"], timestamps)
+        self.assertEqual(entry["states"][rows["state"][-1]], exercise.state)
+        self.assertEqual(int(rows["reps"][-1]), exercise.reps)
+        # Deepest flexion of a rep is below the straight-leg angle
+        self.assertLess(entry["rep_summaries"][0]["min"], 120.0)
+
+    def test_bulk_session_round_trip(self):
+        entry, timestamps, angles, result = self.add_heel_slide("p1", seed=1)
+        rows = self.archive.read(entry["id"], columns=["knee", "state", "reps"])
+        np.testing.assert_allclose(rows["knee"], angles["knee"], rtol=1e-6)
+        states = np.array(entry["states"], dtype=object)[rows["state"]]
+        self.assertTrue((states == result.states()).all())
+        self.assertEqual(int(rows["reps"][-1]), result.reps)
+        np.testing.assert_allclose([r["time"] for r in entry["rep_summaries"]], result.rep_times)
+
+    def test_range_and_value_queries(self):
+        entry, timestamps, angles, _ = self.add_heel_slide("p1", seed=1)
+        rows = self.archive.read(entry["id"], columns=["timestamp", "knee"], start=10.0, end=20.0)
+        in_range = (timestamps >= 10.0) & (timestamps <= 20.0)
+        np.testing.assert_array_equal(rows["timestamp"], timestamps[in_range])
+
+        rows = self.archive.read(entry["id"], columns=["knee"], where=("knee", None, 100.0))
+        expected = angles["knee"][angles["knee"] <= 100.0].astype(np.float32)
+        np.testing.assert_array_equal(rows["knee"], expected)
+
+    def test_aggregates_use_zone_maps(self):
+        first, _, angles, _ = self.add_heel_slide("p1", seed=1, recorded_at=1000.0)
+        second, _, _, _ = self.add_heel_slide("p2", seed=2, recorded_at=2000.0)
+        self.archive.add("p1", "wall_squat", [0.0, 1.0], ["SETUP", "SETUP"], [0, 0],
+                         {"knee": [170.0, 171.0]}, recorded_at=1500.0)
+
+        # Whole-session aggregates never open the data files
+        os.rename(os.path.join(self.root, first["id"]), os.path.join(self.root, "moved"))
+        lows = self.archive.aggregate("knee", "min", exercise="heel_slide")
+        self.assertEqual(set(lows), {first["id"], second["id"]})
+        self.assertAlmostEqual(lows[first["id"]], float(np.float32(angles["knee"].min())), places=4)
+        mean = self.archive.aggregate("knee", "mean", exercise="heel_slide", patient="p1")
+        self.assertAlmostEqual(mean[first["id"]], angles["knee"].mean(), places=3)
+        os.rename(os.path.join(self.root, "moved"), os.path.join(self.root, first["id"]))
+
+        recent = self.archive.aggregate("knee", "max", exercise="heel_slide", since=1500.0)
+        self.assertEqual(list(recent), [second["id"]])
+
+        count = self.archive.aggregate("knee", "count", start=5.0, end=15.0, exercise="heel_slide")
+        self.assertEqual(count[first["id"]], 301)
+        with self.assertRaises(ValueError):
+            self.archive.aggregate("knee", "median")
+
+    def test_index_is_shared_and_incremental(self):
+        entry, _, _, _ = self.add_heel_slide("p1", seed=1)
+        other = SessionArchive(self.root)
+        self.assertEqual([e["id"] for e in other.sessions()], [entry["id"]])
+        second, _, _, _ = self.add_heel_slide("p2", seed=2)
+        self.assertEqual([e["patient"] for e in other.sessions()], ["p1", "p2"])
+
+        # Unfinished sessions are not indexed
+        writer = self.archive.writer("p3", "heel_slide")
+        writer.append(0.0, "SETUP", 0, 170.0)
+        self.assertEqual(len(other.sessions(patient="p3")), 0)
+        writer.close()
+        self.assertEqual(len(other.sessions(patient="p3")), 1)
+
+    def test_value_queries_skip_nan_rows(self):
+        archive = SessionArchive(self.root, chunk_rows=4)
+        knee = [100.0, np.nan, 120.0, 130.0, 95.0, np.nan, 60.0, 150.0]
+        entry = archive.add("p1", "heel_slide", np.arange(8.0), ["SETUP"] * 8, [0] * 8,
+                            {"knee": knee})
+        where = ("knee", 90.0, 180.0)
+        rows = archive.read(entry["id"], columns=["timestamp"], where=where)
+        # The first chunk's zone lies inside the range but holds a NaN row
+        np.testing.assert_array_equal(rows["timestamp"], [0.0, 2.0, 3.0, 4.0, 7.0])
+        count = archive.aggregate("timestamp", "count", where=where)
+        self.assertEqual(count[entry["id"]], 5)
+
+    def test_filter_column_decoded_once_per_chunk(self):
+        entry, _, _, _ = self.add_heel_slide("p1", seed=1)
+        where = ("knee", None, 100.0)
+        chunks = [chunk for chunk, _ in self.archive._chunks(entry, 5.0, 15.0, where)]
+        with mock.patch.object(SessionArchive, "_column", autospec=True,
+                               side_effect=SessionArchive._column) as column:
+            self.archive.read(entry["id"], columns=["timestamp", "knee"], start=5.0, end=15.0,
+                              where=where)
+        self.assertEqual(column.call_count, 2 * len(chunks))
+
+    def test_index_appends_from_many_processes(self):
+        context = mp.get_context("spawn")
+        processes = [context.Process(target=append_sessions, args=(self.root, i, 5))
+                     for i in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(60)
+        self.assertEqual([p.exitcode for p in processes], [0] * 4)
+        entries = SessionArchive(self.root).sessions()
+        self.assertEqual(len(entries), 20)
+        self.assertTrue(all(len(e["metadata"]["note"]) == 200000 for e in entries))
+
+    def test_failed_session_is_not_indexed(self):
+        with self.assertRaises(RuntimeError):
+            with self.archive.writer("p1", "heel_slide") as writer:
+                writer.append(0.0, "SETUP", 0, 170.0)
+                raise RuntimeError("capture lost")
+        self.assertTrue(writer.closed)
+        self.assertEqual(self.archive.sessions(), [])
+        self.assertTrue(os.path.exists(os.path.join(self.root, writer.id, "knee.z")))
+
+    def test_record_needs_a_single_angle(self):
+        with self.archive.writer("p1", "heel_slide", angles=("knee", "hip")) as writer:
+            with self.assertRaises(ValueError):
+                writer.record(HeelSlide(), 0.0)
+            writer.append(0.0, "SETUP", 0, (170.0, 160.0))
+        self.assertEqual(self.archive.read(writer.id)["hip"].tolist(), [160.0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import csv
+import os
+import sys
+import tempfile
+import numpy as np
+
+# Adjust path to find src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.archive import SessionArchive
+from src.batch import archive_trace, find_videos, output_names, write_trace
+
+class TestBatchHelpers(unittest.TestCase):
+    def test_find_videos_filters_and_sorts(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ["b.MP4", "a.avi", "notes.txt", "c.mov"]:
+                open(os.path.join(tmp, name), "w").close()
+            videos = [os.path.basename(p) for p in find_videos(tmp)]
+        self.assertEqual(videos, ["a.avi", "b.MP4", "c.mov"])
+
+    def test_output_names_avoid_collisions(self):
+        self.assertEqual(output_names(["in/s1.mp4", "in/s2.mp4"]), ["s1", "s2"])
+        names = output_names([os.path.join("in", "a", "s1.mp4"), os.path.join("in", "b", "s1.avi"),
+                              os.path.join("in", "b", "s2.avi")])
+        self.assertEqual(names, ["a_s1_mp4", "b_s1_avi", "s2"])
+        self.assertEqual(output_names(["x/p.mp4", "x/p.avi"]), ["p_mp4", "p_avi"])
+        # A derived name can match another video's stem
+        self.assertEqual(output_names(["d/p.mp4", "d/p.avi", "d/p_mp4.mov", "d/p_mp4_2.mov"]),
+                         ["p_mp4", "p_avi", "p_mp4_3", "p_mp4_2"])
+        self.assertEqual(output_names(["a/s.mp4", "b/s.mp4"]), ["a_s_mp4", "b_s_mp4"])
+
+    def test_write_trace(self):
+        trace = [(0, 0.0, False, 0.0, "SETUP", 0), (1, 0.033, True, 172.456, "START", 1)]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.csv")
+            write_trace(path, trace)
+            with open(path) as f:
+                rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ["frame", "timestamp", "pose", "angle", "state", "reps"])
+        self.assertEqual(rows[2], ["1", "0.033", "1", "172.46", "START", "1"])
+
+    def test_archive_trace(self):
+        trace = [(0, 0.0, False, 0.0, "SETUP", 0), (1, 0.033, True, 172.5, "START", 1)]
+        summary = {"video": "p7.mp4", "exercise": "quadriceps_set", "side": "LEFT"}
+        with tempfile.TemporaryDirectory() as tmp:
+            session_id = archive_trace(tmp, "p7", summary, trace)
+            archive = SessionArchive(tmp)
+            entry = archive.session(session_id)
+            rows = archive.read(session_id)
+        self.assertEqual((entry["patient"], entry["side"], entry["reps"]), ("p7", "LEFT", 1))
+        self.assertEqual(entry["metadata"], {"video": "p7.mp4"})
+        # No pose on the first frame: NaN rather than a stale angle
+        self.assertTrue(np.isnan(rows["knee"][0]))
+        self.assertAlmostEqual(float(rows["knee"][1]), 172.5, places=4)
+
+if __name__ == '__main__':
+    unittest.main()
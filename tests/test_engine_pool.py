@@ -0,0 +1,133 @@
+import unittest
+import sys
+import os
+import threading
+import time
+
+# Adjust path to find src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.pose_engine import PoseEnginePool
+
+class FakeEngine:
+    """
+    Records the lifecycle calls PoseEnginePool makes.
+    """
+    warm_delay = 0.0
+
+    def __init__(self, static_image_mode=False, model_complexity=1, smooth_landmarks=True):
+        self.config = (static_image_mode, model_complexity, smooth_landmarks)
+        self.model_complexity = model_complexity
+        self.warmups = 0
+        self.closed = False
+        self.metrics = None
+
+    def warm_up(self):
+        self.warmups += 1
+        time.sleep(self.warm_delay)
+
+    def attach(self, metrics=None, motion_gate=None, adaptive=None, roi=None):
+        self.metrics = metrics
+
+    def _set_complexity(self, model_complexity):
+        self.model_complexity = model_complexity
+
+    def close(self):
+        self.closed = True
+
+class TestPoseEnginePool(unittest.TestCase):
+    def test_reuses_warm_engine_per_configuration(self):
+        pool = PoseEnginePool(factory=FakeEngine)
+        pool.prewarm()
+        self.assertEqual((pool.created, pool.idle()), (1, 1))
+
+        with pool.engine() as first:
+            pass
+        with pool.engine() as second:
+            self.assertIs(second, first)
+        self.assertEqual(pool.created, 1)
+
+        with pool.engine(static_image_mode=True) as static:
+            self.assertIsNot(static, first)
+            self.assertEqual(static.config, (True, 1, True))
+        self.assertEqual(pool.created, 2)
+
+    def test_checkin_detaches_restores_and_rewarms(self):
+        pool = PoseEnginePool(factory=FakeEngine)
+        metrics = object()
+        engine = pool.checkout(metrics=metrics)
+        self.assertIs(engine.metrics, metrics)
+        self.assertEqual(engine.warmups, 1)
+
+        engine.model_complexity = 0  # e.g. stepped down by the adaptive controller
+        pool.checkin(engine)
+        self.assertIsNone(engine.metrics)
+        self.assertEqual(engine.model_complexity, 1)
+        self.assertEqual(engine.warmups, 2)
+
+    def test_engine_checked_in_after_error(self):
+        pool = PoseEnginePool(factory=FakeEngine)
+        with self.assertRaises(ValueError):
+            with pool.engine():
+                raise ValueError("session failed")
+        self.assertEqual(pool.idle(), 1)
+
+    def test_idle_limit_and_close(self):
+        pool = PoseEnginePool(factory=FakeEngine, max_idle=1)
+        a, b = pool.checkout(), pool.checkout()
+        pool.checkin(a)
+        pool.checkin(b)
+        self.assertTrue(b.closed)
+        self.assertEqual(pool.idle(), 1)
+
+        c = pool.checkout()
+        self.assertIs(c, a)
+        pool.close()
+        # Checked-out engines are closed when they come back
+        self.assertFalse(c.closed)
+        pool.checkin(c)
+        self.assertTrue(c.closed)
+        with self.assertRaises(RuntimeError):
+            pool.checkout()
+
+    def test_concurrent_checkouts_get_distinct_engines(self):
+        pool = PoseEnginePool(factory=FakeEngine, max_idle=4)
+        pool.prewarm(count=4)
+        engines = []
+        lock = threading.Lock()
+
+        def session():
+            engine = pool.checkout()
+            with lock:
+                engines.append(engine)
+
+        threads = [threading.Thread(target=session) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len({id(e) for e in engines}), 4)
+        self.assertEqual(pool.created, 4)
+
+    def test_concurrent_checkins_respect_idle_limit(self):
+        pool = PoseEnginePool(factory=FakeEngine, max_idle=1)
+        engines = [pool.checkout() for _ in range(4)]
+        for engine in engines:
+            engine.warm_delay = 0.05
+        threads = [threading.Thread(target=pool.checkin, args=(e,)) for e in engines]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(pool.idle(), 1)
+        self.assertEqual(sum(e.closed for e in engines), 3)
+
+    def test_discard_closes_without_rewarming(self):
+        pool = PoseEnginePool(factory=FakeEngine)
+        engine = pool.checkout()
+        pool.discard(engine)
+        self.assertTrue(engine.closed)
+        self.assertEqual((engine.warmups, pool.idle()), (1, 0))
+
+if __name__ == '__main__':
+    unittest.main()
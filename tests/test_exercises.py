@@ -1,6 +1,5 @@
 import unittest
 from unittest.mock import MagicMock
-from datetime import datetime, timedelta
 import sys
 import os
 
@@ -26,9 +25,20 @@ def create_mock_landmarks(coords_dict):
         landmarks[idx] = MockLandmark(x, y, z)
     return MockLandmarks(landmarks)
 
+class FakeClock:
+    def __init__(self, t=0.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+    def advance(self, seconds):
+        self.t += seconds
+
 class TestQuadricepsSet(unittest.TestCase):
     def test_state_transitions(self):
-        ex = QuadricepsSet()
+        clock = FakeClock()
+        ex = QuadricepsSet(clock=clock)
         
         # 1. Start with knee bent (bad form) -> State START
         # Hip 24, Knee 26, Ankle 28. Angle < 170.
@@ -36,18 +46,27 @@ class TestQuadricepsSet(unittest.TestCase):
         # Let's align on X axis: Hip(0,0), Knee(1,0), Ankle(2,0) is 180.
         # Knee(1,0.2) makes it bent.
         
-        # Straight leg: Hip(0,0), Knee(1,0), Ankle(2,0) -> 180 deg
-        lms_straight = create_mock_landmarks({24:(0,0,0), 26:(1,0,0), 28:(2,0,0)})
+        # Straight leg: Hip(0,1), Knee(1,1), Ankle(2,1) -> 180 deg
+        # (kept off the origin: all-zero landmarks count as not visible)
+        lms_straight = create_mock_landmarks({24:(0,1,0), 26:(1,1,0), 28:(2,1,0)})
+        
+        # 0. Hold the setup pose for the 3 second setup timer
+        state, fb, reps = ex.update(lms_straight)
+        self.assertEqual(state, "SETUP")
+        clock.advance(3.0)
+        state, fb, reps = ex.update(lms_straight)
+        self.assertEqual(state, "START")
+        
         state, fb, reps = ex.update(lms_straight)
         self.assertEqual(state, "HOLD")
         
         # 2. Hold for 4 seconds (less than 5)
-        ex.hold_start_time = datetime.now() - timedelta(seconds=4)
+        clock.advance(4)
         state, fb, reps = ex.update(lms_straight)
         self.assertEqual(state, "HOLD")
         
         # 3. Hold for 5+ seconds -> REACH RELAX
-        ex.hold_start_time = datetime.now() - timedelta(seconds=5.1)
+        clock.advance(1.1)
         state, fb, reps = ex.update(lms_straight)
         self.assertEqual(reps, 1)
         self.assertEqual(state, "RELAX")
@@ -55,18 +74,35 @@ class TestQuadricepsSet(unittest.TestCase):
         # 4. In Relax state, pass time. 2 seconds (less than 3)
         # Verify timer is set
         self.assertIsNotNone(ex.relax_start_time)
-        ex.relax_start_time = datetime.now() - timedelta(seconds=2)
+        clock.advance(2)
         state, fb, reps = ex.update(lms_straight)
         self.assertEqual(state, "RELAX")
         
         # 5. Pass 3+ seconds -> Back to START
-        ex.relax_start_time = datetime.now() - timedelta(seconds=3.1)
+        clock.advance(1.1)
         state, fb, reps = ex.update(lms_straight)
         self.assertEqual(state, "START")
 
+    def test_frame_timestamps(self):
+        # Timers follow per-frame timestamps, independent of the clock
+        ex = QuadricepsSet(clock=FakeClock())
+        lms_straight = create_mock_landmarks({24:(0,1,0), 26:(1,1,0), 28:(2,1,0)})
+        
+        for t in [100.0, 103.0, 103.1, 108.2]:
+            state, fb, reps = ex.update(lms_straight, timestamp=t)
+        self.assertEqual(state, "RELAX")
+        self.assertEqual(reps, 1)
+
+    def test_bent_threshold_follows_target(self):
+        self.assertEqual(QuadricepsSet().params["bent_knee_angle"], 160.0)
+        self.assertEqual(QuadricepsSet(target_knee_angle=175.0).params["bent_knee_angle"], 165.0)
+        explicit = QuadricepsSet(target_knee_angle=175.0, bent_knee_angle=150.0)
+        self.assertEqual(explicit.params["bent_knee_angle"], 150.0)
+
 class TestStraightLegRaise(unittest.TestCase):
     def test_transitions(self):
-        ex = StraightLegRaise()
+        clock = FakeClock()
+        ex = StraightLegRaise(clock=clock)
         
         # 1. Lift leg: Shoulder(0,0), Hip(0,1), Knee(0.2, 2) -> Hip Flexion
         # Simple Geometry: Vertical body.
@@ -89,18 +125,30 @@ class TestStraightLegRaise(unittest.TestCase):
         # Angle is 180 - 30 = 150. Correct for 30 deg flexion.
         
         lms_lifted = create_mock_landmarks({
-            12: (0,0,0), 
-            24: (1,0,0), 
-            26: (1.866, 0.5, 0),
-            28: (2.732, 1.0, 0) # Ankle keeping knee straight (colinear with HK)
+            12: (0,1,0), 
+            24: (1,1,0), 
+            26: (1.866, 1.5, 0),
+            28: (2.732, 2.0, 0) # Ankle keeping knee straight (colinear with HK)
+        })
+        
+        # Setup checks the lying pose, then the side is locked
+        lms_flat = create_mock_landmarks({
+            12: (0,1,0), 
+            24: (1,1,0), 
+            26: (2,1,0),
+            28: (3,1,0)
         })
+        ex.update(lms_flat)
+        clock.advance(3.0)
+        state, fb, reps = ex.update(lms_flat)
+        self.assertEqual(state, "START")
         
         state, fb, reps = ex.update(lms_lifted)
         # 150 deg hip means 30 deg flexion. Min is 15. Max is 45. Should hold.
         self.assertEqual(state, "HOLD")
         
         # Hold complete
-        ex.hold_start_time = datetime.now() - timedelta(seconds=3.1)
+        clock.advance(3.1)
         state, fb, reps = ex.update(lms_lifted)
         self.assertEqual(state, "RELAX")
         self.assertEqual(reps, 1)
@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+# Adjust path to find src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.filters import FILTERS, ExponentialFilter, OneEuroFilter
+from src.landmarks import LandmarkFrame
+from src.offline import evaluate_landmarks
+from src.synthetic import synthetic_session
+
+def leg_error(landmarks, clean):
+    return np.abs(landmarks[:, 23:29, :2] - clean[:, 23:29, :2]).mean()
+
+class TestFilters(unittest.TestCase):
+    def setUp(self):
+        self.timestamps, self.clean = synthetic_session("quadriceps_set", duration=60.0)
+        _, self.noisy = synthetic_session("quadriceps_set", duration=60.0, noise=0.01, seed=2)
+
+    def test_filters_reduce_jitter_and_recover_reps(self):
+        expected = evaluate_landmarks("quadriceps_set", self.timestamps, self.clean).reps
+        noisy_error = leg_error(self.noisy, self.clean)
+        for name, cls in FILTERS.items():
+            smoothed = cls().apply(self.timestamps, self.noisy)
+            self.assertEqual(smoothed.shape, self.noisy.shape, name)
+            self.assertLess(leg_error(smoothed, self.clean), noisy_error, name)
+            result = evaluate_landmarks("quadriceps_set", self.timestamps, smoothed)
+            self.assertEqual(result.reps, expected, name)
+
+    def test_constant_input_passes_through(self):
+        frame = self.clean[0]
+        for name, cls in FILTERS.items():
+            smoother = cls()
+            for i in range(10):
+                out = smoother(frame, i / 30.0)
+            np.testing.assert_allclose(out.data, frame, atol=1e-6, err_msg=name)
+
+    def test_live_reuses_buffer_and_keeps_visibility(self):
+        smoother = OneEuroFilter()
+        first = smoother(self.noisy[0], 0.0)
+        second = smoother(self.noisy[1], 1 / 30.0)
+        self.assertIsInstance(second, LandmarkFrame)
+        self.assertIs(first.data, second.data)
+        np.testing.assert_array_equal(second.visibility, self.noisy[1][:, 3])
+
+    def test_missing_landmarks_stay_missing_and_keep_state(self):
+        smoother = ExponentialFilter(alpha=0.5)
+        frame = self.clean[0].copy()
+        smoother(frame, 0.0)
+        held = smoother.value[26].copy()
+
+        dropped = frame.copy()
+        dropped[26, :3] = 0.0
+        out = smoother(dropped, 1 / 30.0)
+        self.assertTrue(out.is_missing(26))
+        np.testing.assert_array_equal(smoother.value[26], held)
+
+        # Back in view: smoothing continues from the held state
+        moved = frame.copy()
+        moved[26, 0] += 0.1
+        out = smoother(moved, 2 / 30.0)
+        self.assertAlmostEqual(float(out.data[26, 0]), float(frame[26, 0]) + 0.05, places=5)
+
+    def test_alpha_follows_frame_interval(self):
+        smoother = ExponentialFilter(alpha=0.5, fps=30.0)
+        frame = np.zeros((33, 4), dtype=np.float32)
+        frame[:, :3] = 1.0
+        smoother(frame, 0.0)
+        frame[:, 0] = 2.0
+        # Three nominal frames late: moves further than alpha would
+        out = smoother(frame, 0.1)
+        self.assertAlmostEqual(float(out.data[0, 0]), 1.75, places=5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+# Adjust path to find src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.gating import MotionGate
+
+def frame(value, size=(240, 320)):
+    return np.full(size + (3,), value, dtype=np.uint8)
+
+class TestMotionGate(unittest.TestCase):
+    def test_static_frames_are_skipped(self):
+        gate = MotionGate(threshold=2.0, max_skip=100)
+        self.assertTrue(gate.should_infer(frame(100)))
+        for _ in range(5):
+            self.assertFalse(gate.should_infer(frame(101)))
+        self.assertEqual(gate.total_skipped, 5)
+
+    def test_motion_triggers_inference(self):
+        gate = MotionGate(threshold=2.0)
+        gate.should_infer(frame(100))
+        moved = frame(100)
+        moved[:, :160] = 200
+        self.assertTrue(gate.should_infer(moved))
+
+    def test_forced_every_max_skip(self):
+        gate = MotionGate(threshold=2.0, max_skip=3)
+        decisions = [gate.should_infer(frame(100)) for _ in range(9)]
+        self.assertEqual(decisions, [True, False, False, False, True, False, False, False, True])
+
+    def test_slow_drift_accumulates(self):
+        # Each step is below threshold, but the drift from the reference is not
+        gate = MotionGate(threshold=2.0, max_skip=100)
+        decisions = [gate.should_infer(frame(100 + i)) for i in range(4)]
+        self.assertEqual(decisions, [True, False, True, False])
+
+    def test_force(self):
+        gate = MotionGate()
+        gate.should_infer(frame(100))
+        self.assertTrue(gate.should_infer(frame(100), force=True))
+        self.assertEqual(gate.skipped, 0)
+
+if __name__ == '__main__':
+    unittest.main()
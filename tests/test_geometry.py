@@ -1,5 +1,7 @@
 import unittest
-from src.geometry import calculate_angle
+import numpy as np
+from src.geometry import calculate_angle, batch_angles, joint_angles, normalize_landmarks
+from src.synthetic import synthetic_session
 
 class TestGeometry(unittest.TestCase):
     def test_angle_90(self):
@@ -17,5 +19,79 @@ class TestGeometry(unittest.TestCase):
         angle = calculate_angle([1,0], [0,0], [1,1])
         self.assertAlmostEqual(angle, 45.0)
 
+class TestBatchAngles(unittest.TestCase):
+    def test_batch_matches_scalar(self):
+        rng = np.random.default_rng(0)
+        points = rng.random((50, 3, 3))
+        angles = batch_angles(points)
+        self.assertEqual(angles.shape, (50,))
+        for triple, angle in zip(points, angles):
+            self.assertAlmostEqual(angle, calculate_angle(*triple))
+
+    def test_joint_angles_sequence(self):
+        # Right leg straight along the x axis, left knee bent at 90 degrees
+        frame = np.zeros((33, 3))
+        frame[24], frame[26], frame[28] = (0, 0, 0), (1, 0, 0), (2, 0, 0)
+        frame[23], frame[25], frame[27] = (0, 0, 0), (1, 0, 0), (1, 1, 0)
+        frames = np.stack([frame] * 4)
+
+        angles = joint_angles(frames, ["RIGHT_KNEE", "LEFT_KNEE"])
+        self.assertEqual(angles.shape, (4, 2))
+        np.testing.assert_allclose(angles[:, 0], 180.0)
+        np.testing.assert_allclose(angles[:, 1], 90.0)
+
+class TestNormalizeLandmarks(unittest.TestCase):
+    def setUp(self):
+        _, self.landmarks = synthetic_session("straight_leg_raise", duration=5.0)
+
+    def test_centered_and_unit_torso(self):
+        norm = normalize_landmarks(self.landmarks[0])
+        self.assertEqual(norm.shape, (33, 3))
+        np.testing.assert_allclose(norm[[23, 24]].mean(axis=0), 0.0, atol=1e-6)
+        torso = norm[[11, 12]].mean(axis=0)
+        self.assertAlmostEqual(float(np.hypot(torso[0], torso[1])), 1.0, places=5)
+
+    def test_invariant_to_camera_distance_and_position(self):
+        frame = self.landmarks[0].copy()
+        moved = frame.copy()
+        moved[:, :3] = frame[:, :3] * 0.5 + np.array([0.2, -0.1, 0.0], dtype=np.float32)
+        np.testing.assert_allclose(normalize_landmarks(moved), normalize_landmarks(frame), atol=1e-5)
+
+    def test_rotation_aligns_torso_and_keeps_angles(self):
+        frame = self.landmarks[0][:, :3].astype(np.float64)
+        theta = np.radians(30.0)
+        rotation = np.array([[np.cos(theta), -np.sin(theta)], [np.sin(theta), np.cos(theta)]])
+        tilted = frame.copy()
+        tilted[:, :2] = frame[:, :2] @ rotation.T
+
+        norm = normalize_landmarks(tilted, rotate=True)
+        torso = norm[[11, 12]].mean(axis=0)
+        np.testing.assert_allclose(torso[:2], [0.0, -1.0], atol=1e-9)
+        np.testing.assert_allclose(norm, normalize_landmarks(frame, rotate=True), atol=1e-9)
+        np.testing.assert_allclose(joint_angles(norm), joint_angles(frame), atol=1e-6)
+
+    def test_batch_matches_frames_and_writes_out(self):
+        out = np.empty(self.landmarks.shape[:2] + (3,), dtype=np.float32)
+        result = normalize_landmarks(self.landmarks, rotate=True, out=out)
+        self.assertIs(result, out)
+        for i in (0, 40, len(self.landmarks) - 1):
+            np.testing.assert_allclose(out[i], normalize_landmarks(self.landmarks[i], rotate=True),
+                                       atol=1e-6)
+
+    def test_missing_torso_only_centers(self):
+        frame = self.landmarks[0].copy()
+        # Undetected shoulders come through as all-zero rows
+        frame[[11, 12], :3] = 0.0
+        hips = frame[[23, 24], :3].mean(axis=0)
+        np.testing.assert_allclose(normalize_landmarks(frame, rotate=True), frame[:, :3] - hips,
+                                   atol=1e-6)
+
+        batch = self.landmarks[:3].copy()
+        batch[1, 24, :3] = 0.0
+        norm = normalize_landmarks(batch)
+        hips = batch[1, [23, 24], :3].mean(axis=0)
+        np.testing.assert_allclose(norm[1], batch[1, :, :3] - hips, atol=1e-6)
+        np.testing.assert_allclose(norm[0], normalize_landmarks(batch[0]), atol=1e-6)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import sys
+import os
+import numpy as np
+import cv2
+
+# Adjust path to find src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.hud import HudRenderer, blend, render_text
+
+SNAPSHOT = ("HOLD", "Holding... 3", 4, 171.2, "RIGHT", False)
+
+class TestHud(unittest.TestCase):
+    def test_matches_direct_puttext(self):
+        image = np.full((120, 300, 3), 100, dtype=np.uint8)
+        expected = image.copy()
+        cv2.putText(expected, "Reps: 3", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7,
+                    (255, 255, 255), 4, cv2.LINE_AA)
+        cv2.putText(expected, "Reps: 3", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7,
+                    (255, 0, 0), 2, cv2.LINE_AA)
+
+        blend(image, render_text("Reps: 3", (255, 0, 0), outline=(255, 255, 255)), 10, 60)
+        diff = np.abs(image.astype(int) - expected)
+        # Only anti-aliased edge pixels may differ
+        self.assertLess((diff > 16).mean(), 0.01)
+
+    def test_rerenders_only_on_change(self):
+        hud = HudRenderer()
+        image = np.zeros((480, 640, 3), dtype=np.uint8)
+        hud.draw_exercise(image, "Quadriceps Set", SNAPSHOT)
+        first = hud.rendered
+        self.assertGreater(first, 0)
+
+        for _ in range(5):
+            image[...] = 0
+            hud.draw_exercise(image, "Quadriceps Set", SNAPSHOT)
+        self.assertEqual(hud.rendered, first)
+
+        # New countdown value: only the feedback label is rasterised
+        hud.draw_exercise(image, "Quadriceps Set", SNAPSHOT[:1] + ("Holding... 2",) + SNAPSHOT[2:])
+        self.assertEqual(hud.rendered, first + 1)
+        # New rep count: only the header
+        hud.draw_exercise(image, "Quadriceps Set", SNAPSHOT[:2] + (5,) + SNAPSHOT[3:])
+        self.assertEqual(hud.rendered, first + 2)
+
+    def test_header_and_clipping(self):
+        hud = HudRenderer()
+        image = np.zeros((60, 200, 3), dtype=np.uint8)
+        hud.draw_exercise(image, "Wall Squat", ("SETUP", "Setup (RIGHT): Stand up straight.",
+                                                0, 120.0, "RIGHT", True))
+        # Header fills the (short) image and labels off the bottom are skipped
+        self.assertTrue((image[50, 5] == (245, 117, 16)).all())
+
+        blend(image, render_text("edge", (0, 0, 255)), -5, 3)
+        blend(image, render_text("gone", (0, 0, 255)), 500, 500)
+
+    def test_cache_is_bounded(self):
+        hud = HudRenderer(max_patches=3)
+        for i in range(10):
+            hud.patch(f"Holding... {i}", (255, 0, 0))
+        self.assertEqual(len(hud._patches), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+# Adjust path to find src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.landmarks import LandmarkFrame, as_landmark_frame
+
+class MockLandmark:
+    def __init__(self, x, y, z, visibility):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.visibility = visibility
+
+class MockLandmarks:
+    def __init__(self, landmark_list):
+        self.landmark = landmark_list
+
+class MockResults:
+    def __init__(self, pose_landmarks):
+        self.pose_landmarks = pose_landmarks
+
+class TestLandmarkFrame(unittest.TestCase):
+    def test_from_landmarks(self):
+        lms = MockLandmarks([MockLandmark(i, i + 0.5, -i, 0.25) for i in range(33)])
+        frame = LandmarkFrame.from_landmarks(lms)
+
+        self.assertEqual(frame.data.shape, (33, 4))
+        self.assertEqual(frame.data.dtype, np.float32)
+        np.testing.assert_allclose(frame.coords(26), [26, 26.5, -26])
+        self.assertAlmostEqual(frame.visibility[26], 0.25)
+
+    def test_views_share_memory(self):
+        frame = LandmarkFrame()
+        frame.coords(24)[:] = (1, 2, 3)
+        frame.visibility[24] = 0.5
+        np.testing.assert_allclose(frame.data[24], [1, 2, 3, 0.5])
+        self.assertTrue(np.shares_memory(frame.xyz, frame.data))
+
+    def test_wraps_batch_without_copy(self):
+        batch = np.zeros((10, 33, 4), dtype=np.float32)
+        frame = as_landmark_frame(batch[3])
+        frame.coords(0)[0] = 7.0
+        self.assertEqual(batch[3, 0, 0], 7.0)
+
+    def test_missing(self):
+        frame = LandmarkFrame()
+        frame.coords(25)[:] = (0.1, 0.2, 0.0)
+        self.assertTrue(frame.is_missing(23))
+        self.assertFalse(frame.is_missing(25))
+
+    def test_from_results_without_pose(self):
+        self.assertIsNone(LandmarkFrame.from_results(MockResults(None)))
+
+if __name__ == '__main__':
+    unittest.main()
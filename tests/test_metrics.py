@@ -0,0 +1,77 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+import threading
+
+# Adjust path to find src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.exercises import HeelSlide
+from src.metrics import Metrics, RollingHistogram
+from src.synthetic import leg_poses
+
+class TestRollingHistogram(unittest.TestCase):
+    def test_window_keeps_latest_samples(self):
+        hist = RollingHistogram(window=4)
+        for v in range(10):
+            hist.observe(float(v))
+        self.assertEqual(sorted(hist.window()), [6.0, 7.0, 8.0, 9.0])
+        self.assertEqual(hist.count, 10)
+        self.assertEqual(hist.sum, 45.0)
+        self.assertEqual(hist.snapshot()["max"], 9.0)
+
+class TestMetrics(unittest.TestCase):
+    def test_prometheus_text(self):
+        metrics = Metrics()
+        metrics.observe("engine.inference", 0.02)
+        metrics.observe("engine.inference", 0.04)
+        text = metrics.to_prometheus()
+
+        self.assertIn("# TYPE myphysio_stage_seconds summary", text)
+        self.assertIn('myphysio_stage_seconds_count{stage="engine.inference"} 2', text)
+        self.assertIn('myphysio_stage_seconds{stage="engine.inference",quantile="0.5"} 0.030000000', text)
+
+    def test_write_json(self):
+        metrics = Metrics()
+        metrics.observe("engine.draw", 0.001)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "metrics.json")
+            metrics.write_json(path)
+            with open(path) as f:
+                snapshot = json.load(f)
+        self.assertEqual(snapshot["stages"]["engine.draw"]["count"], 1)
+
+    def test_observe_from_many_threads(self):
+        metrics = Metrics(window=64)
+
+        def record(stage):
+            for _ in range(5000):
+                metrics.observe(stage, 0.001)
+                metrics.observe("shared", 0.001)
+
+        threads = [threading.Thread(target=record, args=(f"stage{i}",)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for _ in range(50):
+            metrics.to_prometheus()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(metrics.histograms["shared"].count, 20000)
+        self.assertAlmostEqual(metrics.histograms["shared"].sum, 20.0)
+        self.assertEqual(len(metrics.histograms["shared"].window()), 64)
+
+    def test_exercise_update_stages(self):
+        metrics = Metrics()
+        exercise = HeelSlide(metrics=metrics)
+        frame = leg_poses(178.0)
+        for t in range(5):
+            exercise.update(frame, float(t))
+
+        for stage in ["exercise.extract", "exercise.angles", "exercise.transitions"]:
+            self.assertEqual(metrics.histograms[stage].count, 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import unittest
+import sys
+import os
+import time
+from types import SimpleNamespace
+import numpy as np
+
+# Adjust path to find src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.landmarks import LandmarkFrame
+from src.multicam import CameraView, MultiCameraRunner, fuse_landmarks
+from src.pipeline import format_report
+
+LEFT_LEG = [23, 25, 27]
+RIGHT_LEG = [24, 26, 28]
+
+def frame_with(value, visible, hidden, vis=0.9):
+    data = np.full((33, 4), value, dtype=np.float32)
+    data[:, 3] = 0.5
+    data[visible, 3] = vis
+    data[hidden, 3] = 0.05
+    return LandmarkFrame(data)
+
+class ScriptedView(CameraView):
+    """
+    Replays (timestamp, frame) pairs, optionally pacing them like a camera.
+    """
+    def __init__(self, items, pace=0.0, **options):
+        super().__init__(None, **options)
+        self.items = list(items)
+        self.pace = pace
+
+    def read(self):
+        if self.pace:
+            time.sleep(self.pace)
+        return self.items.pop(0) if self.items else None
+
+class FakeEngine:
+    """
+    Reports a pose whose coordinates encode the frame it was given.
+    """
+    def __init__(self, value, delay=0.0):
+        self.value = value
+        self.delay = delay
+
+    def process_frame(self, frame):
+        if self.delay:
+            time.sleep(self.delay)
+        point = SimpleNamespace(x=self.value, y=frame, z=0.0, visibility=0.9)
+        return SimpleNamespace(pose_landmarks=SimpleNamespace(landmark=[point] * 33))
+
+class TestFuseLandmarks(unittest.TestCase):
+    def test_groups_come_from_the_best_view(self):
+        left_cam = frame_with(1.0, LEFT_LEG, RIGHT_LEG)
+        right_cam = frame_with(2.0, RIGHT_LEG, LEFT_LEG)
+        fused = fuse_landmarks([left_cam, right_cam])
+
+        np.testing.assert_allclose(fused.data[LEFT_LEG, 0], 1.0)
+        np.testing.assert_allclose(fused.data[RIGHT_LEG, 0], 2.0)
+        # Each leg is well seen by one of the views
+        self.assertTrue((fused.visibility[LEFT_LEG + RIGHT_LEG] > 0.9).all())
+
+    def test_registered_views_are_averaged_by_visibility(self):
+        a = frame_with(0.5, LEFT_LEG, RIGHT_LEG, vis=0.75)
+        b = frame_with(0.3, RIGHT_LEG, LEFT_LEG, vis=0.75)
+        # b's coordinates are offset by +0.2 in x from the reference view
+        shift = [[1, 0, 0.2], [0, 1, 0]]
+        fused = fuse_landmarks([a, b], transforms=[None, shift])
+
+        np.testing.assert_allclose(fused.data[:, 0], 0.5, atol=1e-6)
+        # y is untransformed, so the views disagree and visibility decides
+        expected = (0.5 * 0.75 + 0.3 * 0.05) / 0.8
+        self.assertAlmostEqual(float(fused.data[23, 1]), expected, places=4)
+
+    def test_missing_views(self):
+        self.assertIsNone(fuse_landmarks([None, None]))
+        only = frame_with(1.0, LEFT_LEG, RIGHT_LEG)
+        fused = fuse_landmarks([None, only])
+        np.testing.assert_array_equal(fused.data, only.data)
+        self.assertIsNot(fused.data, only.data)
+
+class TestMultiCameraRunner(unittest.TestCase):
+    def test_aligns_views_by_timestamp(self):
+        # 30 fps view and a 60 fps view starting 4 ms later
+        slow = ScriptedView([(i / 30.0, i) for i in range(10)], realtime=False)
+        fast = ScriptedView([(0.004 + i / 60.0, 100 + i) for i in range(20)], realtime=False)
+        runner = MultiCameraRunner([FakeEngine(1.0), FakeEngine(2.0)], [slow, fast],
+                                   process=lambda frames, results, fused, reference: (fused, reference),
+                                   queue_size=64)
+        sets = [(frames, payload) for frames, _, payload in runner]
+        # Each set is stamped with its reference timestamp
+        np.testing.assert_allclose([payload[1] for _, payload in sets[:10]],
+                                   [i / 30.0 for i in range(10)], atol=0.005)
+        sets = [(frames, payload[0]) for frames, payload in sets]
+
+        self.assertEqual([frames[0] for frames, _ in sets[:10]], list(range(10)))
+        # Nearest 60 fps frame to each 30 fps one
+        self.assertEqual([frames[1] for frames, _ in sets[:10]], [100 + 2 * i for i in range(10)])
+        self.assertIsInstance(sets[0][1], LandmarkFrame)
+        # The 60 fps file runs on alone after the 30 fps one ends
+        self.assertEqual([frames for frames, _ in sets[10:]], [[None, 119]])
+        self.assertEqual(runner.skipped, [1, 0])
+
+    def test_view_without_a_close_frame_sits_out(self):
+        a = ScriptedView([(i / 30.0, i) for i in range(10)], realtime=False)
+        # b drops out from 0.1 s to 0.3 s
+        b = ScriptedView([(i / 30.0, 10 + i) for i in (0, 1, 2, 9)], realtime=False)
+        runner = MultiCameraRunner([FakeEngine(1.0), FakeEngine(2.0)], [a, b], queue_size=64)
+        sets = [frames for frames, results, _ in runner]
+
+        self.assertEqual([frames[0] for frames in sets], list(range(10)))
+        self.assertEqual([frames[1] for frames in sets], [10, 11, 12] + [None] * 6 + [19])
+        self.assertEqual(runner.skipped, [0, 6])
+        self.assertIn("skipped", runner.report()["dropped"])
+        format_report(runner.report())
+
+    def test_views_run_in_parallel(self):
+        n_sets, delay = 6, 0.03
+        views = [ScriptedView([(i / 30.0, i) for i in range(n_sets)], realtime=False)
+                 for _ in range(3)]
+        engines = [FakeEngine(float(v), delay=delay) for v in range(3)]
+        runner = MultiCameraRunner(engines, views, queue_size=64)
+        start = time.perf_counter()
+        count = sum(1 for _ in runner)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(count, n_sets)
+        # Closer to one view's latency per set than to three
+        self.assertLess(elapsed, n_sets * delay * 2)
+
+    def test_stop_early(self):
+        views = [ScriptedView([(i / 30.0, i) for i in range(1000)], pace=0.001)
+                 for _ in range(2)]
+        runner = MultiCameraRunner([FakeEngine(1.0), FakeEngine(2.0)], views)
+        for i, _ in enumerate(runner):
+            if i == 3:
+                break
+        runner.stop()
+        self.assertEqual(runner._threads, [])
+
+    def test_needs_one_engine_per_view(self):
+        with self.assertRaises(ValueError):
+            MultiCameraRunner([FakeEngine(1.0)], [ScriptedView([]), ScriptedView([])])
+
+if __name__ == '__main__':
+    unittest.main()
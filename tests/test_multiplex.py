@@ -0,0 +1,98 @@
+import unittest
+import sys
+import os
+from unittest import mock
+import numpy as np
+
+# Adjust path to find src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import multiplex
+from src.exercises import EXERCISES, Exercise, HeelSlide, QuadricepsSet
+from src.landmarks import LandmarkFrame
+from src.metrics import Metrics
+from src.multiplex import MultiExerciseEvaluator
+from src.synthetic import synthetic_session
+
+class CountingExercise(Exercise):
+    def __init__(self):
+        super().__init__("Counter")
+        self.frames = 0
+
+    def measure(self, landmarks):
+        return None
+
+    def step(self, landmarks, angles, now):
+        self.frames += 1
+
+class TestMultiExerciseEvaluator(unittest.TestCase):
+    def test_matches_independent_exercises(self):
+        for session in ("heel_slide", "straight_leg_raise"):
+            timestamps, landmarks = synthetic_session(session, duration=45.0, noise=0.005, seed=1)
+            evaluator = MultiExerciseEvaluator({name: cls() for name, cls in EXERCISES.items()})
+            separate = {name: cls() for name, cls in EXERCISES.items()}
+
+            for t, lm in zip(timestamps, landmarks):
+                results = evaluator.update(lm, float(t))
+                for name, exercise in separate.items():
+                    self.assertEqual(results[name], exercise.update(lm, float(t)), name)
+
+            self.assertGreater(evaluator.reps()[session], 0)
+
+    def test_angles_computed_once_per_frame(self):
+        evaluator = MultiExerciseEvaluator([cls() for cls in EXERCISES.values()])
+        # Knee and hip, both sides, however many exercises need them
+        self.assertEqual(sorted(evaluator.joints),
+                         ["LEFT_HIP", "LEFT_KNEE", "RIGHT_HIP", "RIGHT_KNEE"])
+
+        timestamps, landmarks = synthetic_session("heel_slide", duration=5.0)
+        with mock.patch.object(multiplex, "batch_angles",
+                               wraps=multiplex.batch_angles) as batch:
+            for t, lm in zip(timestamps, landmarks):
+                evaluator.update(lm, float(t))
+        self.assertEqual(batch.call_count, len(timestamps))
+
+    def test_side_detection_uses_shared_visibility(self):
+        evaluator = MultiExerciseEvaluator([cls() for cls in EXERCISES.values()])
+        timestamps, landmarks = synthetic_session("heel_slide", duration=5.0)
+        with mock.patch.object(LandmarkFrame, "visibility", new_callable=mock.PropertyMock,
+                               side_effect=AssertionError("visibility read per exercise")):
+            for t, lm in zip(timestamps, landmarks):
+                evaluator.update(lm, float(t))
+        np.testing.assert_allclose(evaluator.visibility,
+                                   [landmarks[-1][[23, 25, 27], 3].sum(),
+                                    landmarks[-1][[24, 26, 28], 3].sum()], rtol=1e-6)
+
+    def test_records_stage_timings(self):
+        metrics = Metrics()
+        evaluator = MultiExerciseEvaluator({"heel": HeelSlide(metrics=metrics),
+                                            "quads": QuadricepsSet(metrics=metrics)})
+        timestamps, landmarks = synthetic_session("heel_slide", duration=2.0)
+        for t, lm in zip(timestamps, landmarks):
+            evaluator.update(lm, float(t))
+        stages = metrics.histograms
+        # Shared passes once per frame, transitions once per exercise and frame
+        self.assertEqual(stages["exercise.angles"].count, len(timestamps))
+        self.assertEqual(stages["exercise.extract"].count, len(timestamps))
+        self.assertEqual(stages["exercise.transitions"].count, 2 * len(timestamps))
+
+    def test_add_remove_and_fallback(self):
+        counter = CountingExercise()
+        evaluator = MultiExerciseEvaluator({"counter": counter})
+        self.assertEqual(evaluator.joints, [])
+        evaluator.add("heel_slide", HeelSlide())
+        self.assertEqual(len(evaluator.joints), 2)
+        with self.assertRaises(ValueError):
+            evaluator.add("heel_slide", HeelSlide())
+
+        timestamps, landmarks = synthetic_session("heel_slide", duration=2.0)
+        for t, lm in zip(timestamps, landmarks):
+            results = evaluator.update(lm, float(t))
+        self.assertEqual(counter.frames, len(timestamps))
+        self.assertEqual(set(results), {"counter", "heel_slide"})
+
+        evaluator.remove("heel_slide")
+        self.assertEqual(evaluator.joints, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import sys
+import os
+import numpy as np
+from unittest import mock
+
+# Adjust path to find src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.exercises import ALWAYS, EXERCISES, TIMER, QuadricepsSet
+from src.offline import evaluate, evaluate_landmarks, machine
+from src.synthetic import synthetic_session
+
+def run_live(exercise_class, timestamps, landmarks):
+    exercise = exercise_class()
+    states, rep_frames = [], []
+    for i, (t, lm) in enumerate(zip(timestamps, landmarks)):
+        before = exercise.reps
+        state, _, reps = exercise.update(lm, float(t))
+        states.append(state)
+        if reps != before:
+            rep_frames.append(i)
+    return exercise, states, rep_frames
+
+class TestOfflineParity(unittest.TestCase):
+    def assert_parity(self, name, timestamps, landmarks):
+        live, states, rep_frames = run_live(EXERCISES[name], timestamps, landmarks)
+        result = evaluate_landmarks(name, timestamps, landmarks, side=live.side)
+
+        self.assertEqual(result.reps, live.reps, name)
+        self.assertEqual(result.state, live.state, name)
+        self.assertEqual(list(result.rep_frames), rep_frames, name)
+        self.assertEqual(list(result.states()), states, name)
+
+    def test_parity_clean_sessions(self):
+        for name in EXERCISES:
+            timestamps, landmarks = synthetic_session(name, duration=90.0)
+            self.assert_parity(name, timestamps, landmarks)
+
+    def test_parity_noisy_sessions(self):
+        # Jitter makes angles flap across thresholds and restart holds
+        for seed, name in enumerate(EXERCISES):
+            timestamps, landmarks = synthetic_session(name, duration=90.0, noise=0.01, seed=seed)
+            self.assert_parity(name, timestamps, landmarks)
+
+    def test_parity_with_dropouts_and_jittery_clock(self):
+        rng = np.random.default_rng(7)
+        for name in EXERCISES:
+            timestamps, landmarks = synthetic_session(name, duration=90.0, noise=0.005, seed=3)
+            # Irregular frame spacing, as from a real camera
+            timestamps = np.cumsum(rng.uniform(0.02, 0.05, len(timestamps)))
+            # Hips and knees disappear for a few stretches
+            for start in rng.integers(0, len(landmarks) - 40, 5):
+                landmarks[start:start + 40, [23, 24, 25, 26], :3] = 0.0
+            self.assert_parity(name, timestamps, landmarks)
+
+class TestEvaluate(unittest.TestCase):
+    def test_knee_extension_from_angles(self):
+        t = np.arange(12, dtype=float)
+        knee = np.array([120, 120, 120, 120, 130, 178, 120, 178, 150, 178, 100, 176], dtype=float)
+        result = evaluate("knee_extension_rom", t, {"knee": knee})
+        # Setup completes at t=3, then three bend/extend cycles; the
+        # 150 -> 178 swing never dropped below 140 so it doesn't count
+        self.assertEqual(result.reps, 3)
+        self.assertEqual(list(result.rep_frames), [5, 7, 11])
+
+    def test_quadriceps_hold_durations(self):
+        t = np.arange(0, 20, 0.5)
+        knee = np.full(len(t), 178.0)
+        result = evaluate("quadriceps_set", t, {"knee": knee})
+        enter, leave = result.holds[0]
+        self.assertEqual(leave - enter, 5.0)
+        self.assertEqual(result.reps, 2)
+
+    def test_never_set_up(self):
+        t = np.arange(100) / 30.0
+        result = evaluate("wall_squat", t, {"knee": np.full(100, 120.0)})
+        self.assertEqual(result.state, "SETUP")
+        self.assertEqual(result.reps, 0)
+        self.assertEqual(set(result.states()), {"SETUP"})
+
+    def test_nested_timer_rejected_offline(self):
+        for wrap in [("any", TIMER, ("knee", "<", 100.0)), ("not", TIMER)]:
+            spec = dict(QuadricepsSet.spec, name=f"Timed {wrap[0]}")
+            spec["states"] = dict(spec["states"], RELAX={"duration": "relax_duration", "rules": [
+                (wrap, "START", 0, "Ready."),
+                (ALWAYS, None, 0, "Relaxing..."),
+            ]})
+            timed = type("Timed", (QuadricepsSet,), {"spec": spec})
+            # The live evaluator accepts the spec...
+            exercise = timed()
+            exercise.update(np.zeros((33, 4), dtype=np.float32), 0.0)
+            # ...offline names the rule it can't split into threshold and timer
+            with mock.patch.dict(EXERCISES, {"timed": timed}):
+                with self.assertRaisesRegex(ValueError, f"timer inside '{wrap[0]}' in the RELAX -> START"):
+                    machine("timed")
+
+if __name__ == '__main__':
+    unittest.main()
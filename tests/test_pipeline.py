@@ -0,0 +1,53 @@
+import unittest
+import sys
+import os
+
+# Adjust path to find src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.pipeline import DropOldestQueue, PipelinedRunner
+
+class FakeCapture:
+    def __init__(self, n_frames):
+        self.frames = list(range(n_frames))
+
+    def read(self):
+        if not self.frames:
+            return False, None
+        return True, self.frames.pop(0)
+
+class FakeEngine:
+    def process_frame(self, frame):
+        return frame * 10
+
+class TestDropOldestQueue(unittest.TestCase):
+    def test_drops_oldest_when_full(self):
+        q = DropOldestQueue(2)
+        for i in range(5):
+            q.put(i)
+        self.assertEqual(q.dropped, 3)
+        self.assertEqual(q.get(), 3)
+        self.assertEqual(q.get(), 4)
+
+class TestPipelinedRunner(unittest.TestCase):
+    def test_frames_flow_through_stages(self):
+        runner = PipelinedRunner(FakeEngine(), FakeCapture(20),
+                                 process=lambda frame, results: results + 1,
+                                 queue_size=32)
+        seen = [(frame, results, payload) for frame, results, payload in runner]
+
+        self.assertEqual(seen, [(i, i * 10, i * 10 + 1) for i in range(20)])
+        report = runner.report()
+        self.assertEqual(report["inference"]["count"], 20)
+        self.assertEqual(report["render"]["count"], 20)
+
+    def test_stop_early(self):
+        runner = PipelinedRunner(FakeEngine(), FakeCapture(1000), queue_size=2)
+        for i, _ in enumerate(runner):
+            if i == 3:
+                break
+        runner.stop()
+        self.assertEqual(runner._threads, [])
+
+if __name__ == '__main__':
+    unittest.main()
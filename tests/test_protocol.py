@@ -0,0 +1,76 @@
+import unittest
+import sys
+import os
+
+# Adjust path to find src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.exercises import EXERCISES, QuadricepsSet, WallSquat
+from src.landmarks import LandmarkFrame
+from src.offline import evaluate_landmarks
+from src.protocol import Protocol
+from src.synthetic import leg_poses, synthetic_session
+
+class TestProtocol(unittest.TestCase):
+    def test_params_resolve_into_table(self):
+        protocol = QuadricepsSet.compile(hold_duration=10.0)
+        hold = protocol.states["HOLD"]
+        self.assertEqual(hold.duration, 10.0)
+        self.assertEqual(hold.rules[1].condition, ("timer", 10.0))
+        self.assertEqual(protocol.states["START"].rules[0].condition, ("knee", ">", 170.0))
+
+    def test_compiled_once_per_params(self):
+        self.assertIs(QuadricepsSet().protocol, QuadricepsSet().protocol)
+        self.assertIsNot(QuadricepsSet().protocol, QuadricepsSet(hold_duration=2.0).protocol)
+
+    def test_unknown_param(self):
+        with self.assertRaises(TypeError):
+            QuadricepsSet(hold_time=2.0)
+
+    def test_invalid_specs(self):
+        spec = dict(QuadricepsSet.spec)
+        spec["states"] = {"START": {"rules": [(("knee", ">", 170.0), "NOWHERE", 0, None)]}}
+        with self.assertRaises(ValueError):
+            Protocol(spec, spec["params"])
+        spec["states"] = {"START": {"rules": [(("timer",), "START", 0, None)]}}
+        with self.assertRaises(ValueError):
+            Protocol(spec, spec["params"])
+        spec["states"] = {"START": {"rules": [(("hip", ">", 170.0), "START", 0, None)]}}
+        with self.assertRaises(ValueError):
+            Protocol(spec, spec["params"])
+
+    def test_feedback_formatted_only_on_change(self):
+        ex = WallSquat()
+        ex.update(leg_poses(178.0), 0.0)
+        ex.update(leg_poses(178.0), 3.0)
+        ex.update(leg_poses(150.0), 3.1)
+        ex.update(leg_poses(90.0), 3.2)
+        self.assertEqual(ex.state, "HOLD")
+
+        ex.update(leg_poses(90.0), 4.3)
+        feedback = ex.feedback
+        self.assertEqual(feedback, "Holding... 1")
+        ex.update(leg_poses(90.0), 4.9)
+        self.assertIs(ex.feedback, feedback)
+        ex.update(leg_poses(90.0), 5.3)
+        self.assertEqual(ex.feedback, "Holding... 2")
+
+    def test_overridden_params_live_and_offline(self):
+        timestamps, landmarks = synthetic_session("quadriceps_set", duration=60.0)
+        live = QuadricepsSet(hold_duration=8.0)
+        for t, lm in zip(timestamps, landmarks):
+            live.update(lm, float(t))
+
+        default = evaluate_landmarks("quadriceps_set", timestamps, landmarks)
+        longer = evaluate_landmarks("quadriceps_set", timestamps, landmarks, hold_duration=8.0)
+        self.assertEqual(longer.reps, live.reps)
+        self.assertLess(longer.reps, default.reps)
+
+    def test_every_exercise_measures_its_angles(self):
+        frame = LandmarkFrame(leg_poses(170.0, 175.0))
+        for name, cls in EXERCISES.items():
+            ex = cls()
+            self.assertEqual(len(ex.measure(frame)), len(ex.protocol.angles), name)
+
+if __name__ == '__main__':
+    unittest.main()
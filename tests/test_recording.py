@@ -0,0 +1,86 @@
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+
+# Adjust path to find src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.exercises import QuadricepsSet
+from src.landmarks import LandmarkFrame
+from src.recording import SessionRecorder, SessionReplay
+
+def straight_leg_frame(knee_y=1.0):
+    frame = LandmarkFrame()
+    frame.coords(24)[:] = (0, 1, 0)
+    frame.coords(26)[:] = (1, knee_y, 0)
+    frame.coords(28)[:] = (2, 1, 0)
+    frame.visibility[[24, 26, 28]] = 0.9
+    return frame
+
+class TestRecording(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "session.lmk")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_roundtrip_across_chunks(self):
+        rng = np.random.default_rng(1)
+        data = rng.random((10, 33, 4)).astype(np.float32)
+        with SessionRecorder(self.path, chunk_frames=4) as recorder:
+            for i, frame in enumerate(data):
+                recorder.append(i * 0.1, frame)
+
+        replay = SessionReplay(self.path)
+        self.assertEqual(len(replay), 10)
+        self.assertEqual(len(replay.chunks), 3)
+        np.testing.assert_array_equal(replay.landmarks(), data)
+        np.testing.assert_allclose(replay.timestamps(), np.arange(10) * 0.1)
+
+        timestamp, frame = replay[5]
+        self.assertAlmostEqual(timestamp, 0.5)
+        np.testing.assert_array_equal(frame.data, data[5])
+
+    def test_frames_are_views_into_mmap(self):
+        with SessionRecorder(self.path) as recorder:
+            recorder.append(0.0, straight_leg_frame())
+
+        replay = SessionReplay(self.path)
+        _, frame = next(iter(replay))
+        self.assertFalse(frame.data.flags.owndata)
+        self.assertTrue(np.shares_memory(frame.data, replay.chunks[0][1]))
+
+    def test_truncated_tail_is_ignored(self):
+        with SessionRecorder(self.path, chunk_frames=2) as recorder:
+            for i in range(4):
+                recorder.append(float(i), straight_leg_frame())
+        with open(self.path, "r+b") as f:
+            f.truncate(os.path.getsize(self.path) - 100)
+
+        self.assertEqual(len(SessionReplay(self.path)), 2)
+
+    def test_play_matches_live_updates(self):
+        frames = [(t * 0.1, straight_leg_frame()) for t in range(120)]
+
+        live = QuadricepsSet()
+        for timestamp, frame in frames:
+            expected = live.update(frame, timestamp)
+
+        with SessionRecorder(self.path) as recorder:
+            for timestamp, frame in frames:
+                recorder.append(timestamp, frame)
+
+        self.assertEqual(SessionReplay(self.path).play(QuadricepsSet()), expected)
+        self.assertEqual(expected[2], 1)
+
+    def test_rejects_other_files(self):
+        with open(self.path, "wb") as f:
+            f.write(b"not a recording at all")
+        with self.assertRaises(ValueError):
+            SessionReplay(self.path)
+
+if __name__ == '__main__':
+    unittest.main()
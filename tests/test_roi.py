@@ -0,0 +1,140 @@
+import unittest
+import sys
+import os
+from types import SimpleNamespace
+import numpy as np
+
+# Adjust path to find src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.roi import RoiTracker
+
+def make_results(points, visibility=0.9):
+    """
+    MediaPipe-like results with 33 landmarks spread over the (x0, y0, x1, y1)
+    normalized box `points`.
+    """
+    x0, y0, x1, y1 = points
+    xs = np.linspace(x0, x1, 33)
+    ys = np.linspace(y0, y1, 33)
+    landmark = [SimpleNamespace(x=x, y=y, z=0.1, visibility=visibility) for x, y in zip(xs, ys)]
+    return SimpleNamespace(pose_landmarks=SimpleNamespace(landmark=landmark))
+
+SHAPE = (1080, 1920, 3)
+
+class TestRoiTracker(unittest.TestCase):
+    def test_full_frame_until_pose_found(self):
+        roi = RoiTracker()
+        self.assertIsNone(roi.region(SHAPE))
+        roi.update(SimpleNamespace(pose_landmarks=None), None, SHAPE)
+        self.assertIsNone(roi.region(SHAPE))
+
+        roi.update(make_results((0.4, 0.3, 0.5, 0.8)), None, SHAPE)
+        x0, y0, x1, y1 = roi.region(SHAPE)
+        # Body spans 192x540 px; 30% padding each side, clipped to the image
+        self.assertEqual((x0, x1), (768 - 58, 960 + 58))
+        self.assertEqual((y0, y1), (324 - 162, 864 + 162))
+
+    def test_maps_crop_landmarks_to_full_frame(self):
+        roi = RoiTracker()
+        box = (480, 270, 1440, 810)
+        # Landmarks at the crop's centre and corner
+        results = make_results((0.5, 0.5, 1.0, 1.0))
+        roi.update(results, box, SHAPE)
+        first, last = results.pose_landmarks.landmark[0], results.pose_landmarks.landmark[-1]
+        self.assertAlmostEqual(first.x, 0.5)
+        self.assertAlmostEqual(first.y, 0.5)
+        self.assertAlmostEqual(last.x, 0.75)
+        self.assertAlmostEqual(last.y, 0.75)
+        self.assertAlmostEqual(first.z, 0.1 * 960 / 1920)
+
+    def test_box_is_stable_until_body_nears_edge(self):
+        roi = RoiTracker()
+        roi.update(make_results((0.4, 0.3, 0.5, 0.8)), None, SHAPE)
+        box = roi.region(SHAPE)
+        # Small movement inside the padded box keeps it
+        roi.update(make_results((0.41, 0.3, 0.51, 0.8)), None, SHAPE)
+        self.assertEqual(roi.region(SHAPE), box)
+        # Reaching the edge recentres it
+        roi.update(make_results((0.5, 0.3, 0.6, 0.8)), None, SHAPE)
+        self.assertNotEqual(roi.region(SHAPE), box)
+        self.assertTrue(roi.changed)
+        self.assertEqual(roi.moved, 2)
+
+    def test_shrinking_body_tightens_box(self):
+        roi = RoiTracker()
+        roi.update(make_results((0.2, 0.1, 0.8, 0.9)), None, SHAPE)
+        big = roi.region(SHAPE)
+        roi.update(make_results((0.45, 0.4, 0.5, 0.6)), None, SHAPE)
+        x0, y0, x1, y1 = roi.region(SHAPE)
+        self.assertLess((x1 - x0) * (y1 - y0), (big[2] - big[0]) * (big[3] - big[1]) / 4)
+
+    def test_falls_back_when_lost(self):
+        roi = RoiTracker()
+        roi.update(make_results((0.4, 0.3, 0.5, 0.8)), None, SHAPE)
+        box = roi.region(SHAPE)
+        roi.update(make_results((0.4, 0.3, 0.5, 0.8), visibility=0.1), box, SHAPE)
+        self.assertIsNone(roi.region(SHAPE))
+        self.assertEqual(roi.lost, 1)
+
+        roi.update(make_results((0.4, 0.3, 0.5, 0.8)), None, SHAPE)
+        roi.update(SimpleNamespace(pose_landmarks=None), roi.region(SHAPE), SHAPE)
+        self.assertIsNone(roi.region(SHAPE))
+        self.assertEqual(roi.lost, 2)
+
+    def test_resolution_change_drops_box(self):
+        roi = RoiTracker()
+        roi.update(make_results((0.4, 0.3, 0.5, 0.8)), None, SHAPE)
+        self.assertIsNone(roi.region((480, 640, 3)))
+
+class FakeGraph:
+    """
+    Stands in for the MediaPipe graph: records input sizes and reports a
+    pose filling the middle of whatever image it is given.
+    """
+    def __init__(self):
+        self.shapes = []
+        self.resets = 0
+
+    def process(self, image):
+        self.shapes.append(image.shape)
+        return make_results((0.3, 0.2, 0.7, 0.8))
+
+    def reset(self):
+        self.resets += 1
+
+    def close(self):
+        pass
+
+class TestEngineRoi(unittest.TestCase):
+    def test_engine_crops_downsizes_and_maps_back(self):
+        from src.pose_engine import PoseEngine
+        engine = PoseEngine()
+        engine.close()
+        engine.pose = graph = FakeGraph()
+        roi = RoiTracker(max_side=256)
+        engine.attach(roi=roi)
+
+        image = np.zeros(SHAPE, dtype=np.uint8)
+        first = engine.process_frame(image)
+        self.assertEqual(graph.shapes[0], SHAPE)
+        self.assertAlmostEqual(first.pose_landmarks.landmark[0].x, 0.3)
+
+        second = engine.process_frame(image)
+        self.assertLessEqual(max(graph.shapes[1][:2]), 256)
+        # Pose reported mid-crop maps back inside the first pose's region
+        x0, y0, x1, y1 = roi.box
+        lm = second.pose_landmarks.landmark[16]
+        self.assertAlmostEqual(lm.x, (x0 + 0.5 * (x1 - x0)) / SHAPE[1])
+        self.assertAlmostEqual(lm.y, (y0 + 0.5 * (y1 - y0)) / SHAPE[0])
+        self.assertEqual((roi.full, roi.cropped), (1, 1))
+        # Switching from the full image to the crop restarts MediaPipe's tracking
+        self.assertEqual(graph.resets, 1)
+        engine.process_frame(image)
+        self.assertEqual(graph.resets, 1)
+
+        engine.reset()
+        self.assertIsNone(roi.box)
+
+if __name__ == '__main__':
+    unittest.main()
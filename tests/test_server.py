@@ -0,0 +1,132 @@
+import unittest
+import asyncio
+import json
+import os
+import sys
+from types import SimpleNamespace
+import numpy as np
+
+# Adjust path to find src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.server import (ERROR, OPEN, Client, EnginePool, PoseServer, decode_frame, encode_image,
+                        frame_message, open_connection, read_message, write_message)
+from src.synthetic import leg_poses
+
+class MockLandmark:
+    def __init__(self, x, y, z, visibility):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.visibility = visibility
+
+class FakeEngine:
+    """
+    Returns a straight-leg pose for bright frames and no pose for dark ones.
+    """
+    def process_frame(self, image):
+        if image.mean() < 128:
+            return SimpleNamespace(pose_landmarks=None)
+        points = [MockLandmark(*row) for row in leg_poses(178.0)]
+        return SimpleNamespace(pose_landmarks=SimpleNamespace(landmark=points))
+
+class TestFrameEncoding(unittest.TestCase):
+    def test_raw_roundtrip(self):
+        image = np.arange(4 * 6 * 3, dtype=np.uint8).reshape(4, 6, 3)
+        timestamp, decoded = decode_frame(frame_message(1.5, encode_image(image)))
+        self.assertEqual(timestamp, 1.5)
+        np.testing.assert_array_equal(decoded, image)
+
+    def test_jpeg_roundtrip(self):
+        image = np.full((32, 48, 3), 200, dtype=np.uint8)
+        _, decoded = decode_frame(frame_message(0.0, encode_image(image, jpeg=True)))
+        self.assertEqual(decoded.shape, image.shape)
+
+    def test_malformed_frames_raise_value_error(self):
+        good = frame_message(0.0, encode_image(np.zeros((4, 6, 3), dtype=np.uint8)))
+        for body in (good[:5], good[:-1], good + b"\0", good[:16] + b"not a jpeg"):
+            with self.assertRaises(ValueError):
+                decode_frame(body)
+        with self.assertRaises(ValueError):
+            decode_frame(frame_message(0.0, (4, 6, 1, b"not a jpeg")))
+
+class TestPoseServer(unittest.TestCase):
+    def test_sessions_are_independent(self):
+        async def scenario():
+            pool = EnginePool(2, factory=FakeEngine)
+            server = PoseServer(pool)
+            listener = await server.start(port=0)
+            port = listener.sockets[0].getsockname()[1]
+
+            bright = encode_image(np.full((8, 8, 3), 255, dtype=np.uint8))
+            dark = encode_image(np.zeros((8, 8, 3), dtype=np.uint8))
+
+            a = await Client.connect("quadriceps_set", port=port)
+            b = await Client.connect("heel_slide", port=port)
+            replies_a = [await a.send(t * 0.5, bright) for t in range(8)]
+            replies_b = [await b.send(t * 0.5, dark) for t in range(3)]
+            await a.close()
+            await b.close()
+
+            listener.close()
+            await listener.wait_closed()
+            pool.close()
+            return a.session, b.session, replies_a, replies_b
+
+        session_a, session_b, replies_a, replies_b = asyncio.run(scenario())
+        self.assertNotEqual(session_a, session_b)
+        # Setup completes after 3 s of the straight-leg pose, then HOLD starts
+        self.assertEqual(replies_a[7]["state"], "HOLD")
+        self.assertTrue(all(r["pose"] for r in replies_a))
+        self.assertEqual([r["state"] for r in replies_b], ["SETUP"] * 3)
+        self.assertFalse(any(r["pose"] for r in replies_b))
+
+    def test_bad_frame_gets_error_reply(self):
+        async def scenario():
+            pool = EnginePool(1, factory=FakeEngine)
+            listener = await PoseServer(pool).start(port=0)
+            port = listener.sockets[0].getsockname()[1]
+            try:
+                client = await Client.connect("quadriceps_set", port=port)
+                bright = encode_image(np.full((8, 8, 3), 255, dtype=np.uint8))
+                with self.assertRaises(RuntimeError):
+                    await client.send(0.0, (8, 8, 0, b"short"))
+                # The session carries on
+                reply = await client.send(0.5, bright)
+                await client.close()
+                return reply
+            finally:
+                listener.close()
+                await listener.wait_closed()
+                pool.close()
+
+        reply = asyncio.run(scenario())
+        self.assertEqual(reply["frame"], 1)
+        self.assertTrue(reply["pose"])
+
+    def test_unknown_exercise(self):
+        async def scenario():
+            pool = EnginePool(1, factory=FakeEngine)
+            listener = await PoseServer(pool).start(port=0)
+            port = listener.sockets[0].getsockname()[1]
+            try:
+                with self.assertRaises(RuntimeError):
+                    await Client.connect("cartwheel", port=port)
+                # Valid JSON that isn't an object gets an error reply too
+                for body in (b"[]", b'"x"', b"3"):
+                    reader, writer = await open_connection(port=port)
+                    write_message(writer, OPEN, body)
+                    await writer.drain()
+                    kind, reply = await read_message(reader)
+                    self.assertEqual(kind, ERROR)
+                    self.assertIn("error", json.loads(reply))
+                    writer.close()
+            finally:
+                listener.close()
+                await listener.wait_closed()
+                pool.close()
+
+        asyncio.run(scenario())
+
+if __name__ == '__main__':
+    unittest.main()
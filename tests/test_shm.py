@@ -0,0 +1,60 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+# Adjust path to find src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.shm import MultiProcessPoseRunner, SharedFrameRing
+
+class TestSharedFrameRing(unittest.TestCase):
+    def test_attached_ring_shares_slots(self):
+        ring = SharedFrameRing(3, (6, 8, 3))
+        try:
+            other = SharedFrameRing.attach(ring.name, 3, (6, 8, 3))
+            ring.frames[1][...] = 77
+            other.landmarks[1, 26] = (0.1, 0.2, 0.3, 0.9)
+
+            self.assertTrue((other.frames[1] == 77).all())
+            self.assertEqual(other.frames[0].sum(), 0)
+            np.testing.assert_allclose(ring.landmarks[1, 26], (0.1, 0.2, 0.3, 0.9), rtol=1e-6)
+            other.close()
+        finally:
+            ring.close()
+
+    def test_landmarks_are_aligned(self):
+        # Odd frame sizes must not misalign the float32 landmark rows
+        ring = SharedFrameRing(2, (5, 7, 3))
+        try:
+            self.assertEqual(ring.landmarks.ctypes.data % 4, 0)
+            self.assertEqual(ring.landmarks.shape, (2, 33, 4))
+        finally:
+            ring.close()
+
+class TestMultiProcessPoseRunner(unittest.TestCase):
+    def test_results_come_back_in_order(self):
+        shape = (96, 128, 3)
+        frames = [(i / 30.0, np.full(shape, i * 20, dtype=np.uint8)) for i in range(5)]
+        with MultiProcessPoseRunner(workers=1, shape=shape, slots=2) as runner:
+            out = [(t, int(image[0, 0, 0]), landmarks) for t, image, landmarks in runner.run(frames)]
+        self.assertEqual([t for t, _, _ in out], [t for t, _ in frames])
+        self.assertEqual([v for _, v, _ in out], [i * 20 for i in range(5)])
+        # Flat images hold no pose
+        self.assertTrue(all(landmarks is None for _, _, landmarks in out))
+        self.assertIsNone(runner.ring)
+
+    def test_dead_worker_raises(self):
+        shape = (32, 32, 3)
+        frames = [(0.0, np.zeros(shape, dtype=np.uint8))]
+        runner = MultiProcessPoseRunner(workers=1, shape=shape, poll=0.1,
+                                        engine_kwargs={"model_complexity": 7})
+        runner.start()
+        with self.assertRaises(RuntimeError):
+            list(runner.run(frames))
+        # The runner shut itself down
+        self.assertEqual(runner._processes, [])
+        self.assertIsNone(runner.ring)
+
+if __name__ == '__main__':
+    unittest.main()
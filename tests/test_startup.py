@@ -0,0 +1,50 @@
+import unittest
+import json
+import os
+import subprocess
+import sys
+import warnings
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Fresh-interpreter import time expected for tools that never run the model.
+# Wall-clock time depends on the machine, so going over it only warns; the
+# `loaded` checks are what catch MediaPipe or OpenCV creeping back in.
+STARTUP_BUDGET_S = 0.6
+HEAVY_MODULES = ("cv2", "mediapipe")
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+for name in sys.argv[1:]:
+    __import__(name)
+elapsed = time.perf_counter() - t0
+print(json.dumps({"elapsed": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+def probe(*modules):
+    out = subprocess.run([sys.executable, "-c", PROBE] + list(modules), cwd=ROOT,
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out)
+
+def report(result):
+    if result["elapsed"] > STARTUP_BUDGET_S:
+        warnings.warn(f"imports took {result['elapsed']:.2f} s (expected under {STARTUP_BUDGET_S} s)")
+
+class TestStartup(unittest.TestCase):
+    def test_headless_modules_skip_mediapipe_and_opencv(self):
+        result = probe("src.exercises", "src.offline", "src.recording", "src.filters",
+                       "src.multiplex", "src.synthetic", "src.metrics", "src.archive",
+                       "src.analytics")
+        self.assertEqual(result["loaded"], [])
+        report(result)
+
+    def test_engine_and_tool_modules_import_lazily(self):
+        result = probe("src.pose_engine", "src.batch", "src.server", "src.shm",
+                       "src.gating", "src.hud", "src.pipeline", "src.adaptive", "src.video",
+                       "src.roi", "src.multicam")
+        self.assertEqual(result["loaded"], [])
+        report(result)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+# Adjust path to find src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.exercises import EXERCISES
+from src.geometry import joint_angles
+from src.synthetic import leg_poses, synthetic_session
+
+class TestSynthetic(unittest.TestCase):
+    def test_leg_poses_angles(self):
+        frames = leg_poses([170.0, 90.0, 40.0], [178.0, 150.0, 120.0], side="LEFT")
+        angles = joint_angles(frames, ["LEFT_KNEE", "LEFT_HIP"])
+        np.testing.assert_allclose(angles, [[170, 178], [90, 150], [40, 120]], atol=1e-3)
+
+    def test_sessions_produce_reps(self):
+        for name, exercise_class in EXERCISES.items():
+            timestamps, landmarks = synthetic_session(name, duration=30.0)
+            exercise = exercise_class()
+            for t, lm in zip(timestamps, landmarks):
+                exercise.update(lm, t)
+            self.assertGreater(exercise.reps, 0, name)
+            self.assertEqual(exercise.side, "RIGHT")
+
+if __name__ == '__main__':
+    unittest.main()
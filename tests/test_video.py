@@ -0,0 +1,76 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import numpy as np
+import cv2
+
+# Adjust path to find src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.video import VideoSource
+
+NATIVE_FPS = 60
+FRAMES = 120
+
+class TestVideoSource(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        cls.path = os.path.join(cls.tmp, "clip.avi")
+        writer = cv2.VideoWriter(cls.path, cv2.VideoWriter_fourcc(*"MJPG"), NATIVE_FPS, (64, 48))
+        if not writer.isOpened():
+            raise unittest.SkipTest("No video writer available")
+        for i in range(FRAMES):
+            writer.write(np.full((48, 64, 3), i * 2, dtype=np.uint8))
+        writer.release()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+
+    def test_every_frame_by_default(self):
+        with VideoSource(self.path) as source:
+            timestamps = [t for t, _ in source]
+        self.assertEqual(len(timestamps), FRAMES)
+        self.assertEqual(source.decoded, FRAMES)
+        self.assertAlmostEqual(timestamps[1] - timestamps[0], 1.0 / NATIVE_FPS, places=3)
+
+    def test_stride_skips_decoding(self):
+        with VideoSource(self.path, fps=15) as source:
+            items = [(t, frame[0, 0, 0]) for t, frame in source]
+        self.assertEqual(source.grabbed, FRAMES)
+        self.assertEqual(source.decoded, FRAMES // 4)
+        # Real presentation times, 1/15 s apart, and the matching frames
+        steps = np.diff([t for t, _ in items])
+        np.testing.assert_allclose(steps, 1.0 / 15, atol=1e-3)
+        # (frame i was filled with 2 * i; MJPG is lossy)
+        np.testing.assert_allclose([v / 2.0 for _, v in items[:3]], [0, 4, 8], atol=1)
+
+    def test_non_divisor_rate_keeps_average(self):
+        with VideoSource(self.path, fps=25) as source:
+            timestamps = [t for t, _ in source]
+        # 2 s of video at 25 fps; ticks land on the nearest frames
+        self.assertEqual(len(timestamps), 50)
+        self.assertAlmostEqual((timestamps[-1] - timestamps[0]) / 49, 1.0 / 25, places=3)
+
+    def test_time_range(self):
+        with VideoSource(self.path, start=0.5, end=1.0) as source:
+            timestamps = [t for t, _ in source]
+        self.assertAlmostEqual(timestamps[0], 0.5, places=2)
+        self.assertLessEqual(timestamps[-1], 1.0)
+        self.assertLess(source.grabbed, FRAMES)
+        self.assertEqual(source.position, int(round(timestamps[-1] * NATIVE_FPS)) + 1)
+
+    def test_reuse_shares_buffer(self):
+        with VideoSource(self.path, fps=30, reuse=True) as source:
+            ids = {id(frame) for _, frame in source}
+        self.assertEqual(len(ids), 1)
+
+    def test_missing_file(self):
+        with self.assertRaises(IOError):
+            VideoSource(os.path.join(self.tmp, "missing.avi"))
+
+if __name__ == '__main__':
+    unittest.main()